@@ -19,64 +19,51 @@ The above copyright notice and this permission notice shall be included in
 all copies or substantial portions of the Software.
 """
 
-from OpenGL import GL as gl
-import glfw
+import os
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+# learnopengl goes before OpenGL, it picks PyOpenGL's platform and flags
+from learnopengl.window import create_window
+
+from OpenGL import GL as gl
+
 # settings
 WIDTH, HEIGHT = 800, 600
 
 def main():
 
-    # glfw: intialize and configure
-    
-    print("Starting GLFW context, OpenGL 3.3")
-
-    glfw.init()
+    # window and OpenGL context creation: a GLFW window or a headless backend
 
-    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
-    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
-    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE) # No deprecated functions
-    glfw.window_hint(glfw.RESIZABLE, gl.GL_TRUE)
-
-    # checking if run on Mac OS X
-    if sys.platform == 'darwin':
-        glfwWindowHint(glfw.OPENGL_FORWARD_COMPAT, gl.GL_TRUE);
-
-    # glfw window creation
-    window = glfw.create_window(WIDTH, HEIGHT, 'LearnOpenGL', None, None)
-
-    if window is None:
-        glfw.terminate()
-        raise Exception("ERROR: Failed to create GLFW window")
+    print("Starting GLFW context, OpenGL 3.3")
 
-    glfw.make_context_current(window)
+    window = create_window(WIDTH, HEIGHT, 'LearnOpenGL')
 
-    glfw.set_key_callback(window, key_callback)
+    window.set_key_callback(key_callback)
 
-    width, height = glfw.get_framebuffer_size(window)
-    glfw.set_window_size_callback(window, window_size_callback)
+    width, height = window.get_framebuffer_size()
+    window.set_window_size_callback(window_size_callback)
 
     # render loop
-    while not glfw.window_should_close(window):
-        glfw.poll_events()
-
+    while window.next_frame():
         gl.glClearColor(0.2, 0.3, 0.3, 1.0)
         gl.glClear(gl.GL_COLOR_BUFFER_BIT)
 
-        glfw.swap_buffers(window)
+        window.swap_buffers()
 
-    # glfw: terminate, clearing all previously allocated GLFW resources
-    glfw.terminate()
+    # terminate, clearing all previously allocated window and context resources
+    window.terminate()
 
     return 0
 
 # process all input: query GLFW whether relevant keys are pressed/released this frame and react accordingly
 def key_callback(window, key, scancode, action, mods):
+    # only GLFW windows call this, so headless runs never load glfw
+    import glfw
     if key == glfw.KEY_ESCAPE and action == glfw.PRESS:
         glfw.set_window_should_close(window, True)
 
-#  glfw: whenever the window size changed (by OS or user resize) this callback function executes
+#  whenever the framebuffer size changed (by OS or user resize) this callback function executes, once per frame before drawing
 def window_size_callback(window, width, height):
     gl.glViewport(0, 0, width, height)
 
@@ -19,10 +19,15 @@ The above copyright notice and this permission notice shall be included in
 all copies or substantial portions of the Software.
 '''
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+# learnopengl goes before OpenGL, it picks PyOpenGL's platform and flags
+from learnopengl.window import create_window
+
 from OpenGL import GL as gl
-import glfw
 import numpy as np
-import sys
 
 # settings
 WIDTH, HEIGHT = 800, 600
@@ -47,7 +52,7 @@ void main()
 
 def main():
 
-    # declare draw method so it can be reused during resizing
+    # declare draw method, called by the render loop once per frame
     def draw():
         gl.glClearColor(0.2, 0.3, 0.3, 1.0)
         gl.glClear(gl.GL_COLOR_BUFFER_BIT)
@@ -58,39 +63,21 @@ def main():
         gl.glDrawElements(gl.GL_TRIANGLES, 3*indices.shape[0], gl.GL_UNSIGNED_INT, None)
         gl.glBindVertexArray(0)
 
-        glfw.swap_buffers(window)
+        window.swap_buffers()
         
     # declaring resize callback in main to allow access to variables
     def window_size_callback(window, width, height):
+        # called with the framebuffer size, at most once per frame, before draw()
         gl.glViewport(0, 0, width, height)
-        # calling draw to allow drawing while resizing
-        draw()
 
-    # glfw: initialize and configure
-    
-    glfw.init()
+    # window and OpenGL context creation: a GLFW window or a headless backend
 
-    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
-    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
-    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE) # No deprecated functions
-    glfw.window_hint(glfw.RESIZABLE, gl.GL_TRUE)
+    window = create_window(WIDTH, HEIGHT, 'LearnOpenGL')
 
-    # checking if run on Mac OS X
-    if sys.platform == 'darwin':
-        glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, gl.GL_TRUE)
+    window.set_key_callback(key_callback)
 
-    # glfw window creation
-    window = glfw.create_window(WIDTH, HEIGHT, 'LearnOpenGL', None, None)   # tutorial: (800, 600...
-    if window is None:
-        glfw.terminate()
-        raise Exception("ERROR: Failed to create GLFW window")
-
-    glfw.make_context_current(window)
-
-    glfw.set_key_callback(window, key_callback)
-
-    width, height = glfw.get_framebuffer_size(window)
-    glfw.set_window_size_callback(window, window_size_callback)
+    width, height = window.get_framebuffer_size()
+    window.set_window_size_callback(window_size_callback)
 
     # build and compile shader program
 
@@ -164,16 +151,16 @@ def main():
     gl.glPolygonMode(gl.GL_FRONT_AND_BACK, gl.GL_LINE)
 
     # render loop
-    while not glfw.window_should_close(window):
-        glfw.poll_events()
-
+    while window.next_frame():
         draw()
 
-    glfw.terminate()
+    window.terminate()
 
     return 0
 
 def key_callback(window, key, scancode, action, mods):
+    # only GLFW windows call this, so headless runs never load glfw
+    import glfw
     if key == glfw.KEY_ESCAPE and action == glfw.PRESS:
         glfw.set_window_should_close(window, True)
 
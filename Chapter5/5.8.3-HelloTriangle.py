@@ -19,10 +19,17 @@ The above copyright notice and this permission notice shall be included in
 all copies or substantial portions of the Software.
 '''
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+# learnopengl goes before OpenGL, it picks PyOpenGL's platform and flags
+from learnopengl import state
+from learnopengl.shader import ShaderProgram
+from learnopengl.window import create_window
+
 from OpenGL import GL as gl
-import glfw
 import numpy as np
-import sys
 
 # settings
 WIDTH, HEIGHT = 800, 600
@@ -54,94 +61,41 @@ void main()
 }
 """
 
-def shader(vs_src, frag_src):
-
-    # build and compile shader program
-
-    # vertex shader
-    vertexShader = gl.glCreateShader(gl.GL_VERTEX_SHADER)
-    gl.glShaderSource(vertexShader, vs_src)
-    gl.glCompileShader(vertexShader);
-    if not gl.glGetShaderiv(vertexShader, gl.GL_COMPILE_STATUS):
-        infoLog = gl.glGetShaderInfoLog(vertexShader).decode()
-        raise Exception("ERROR::SHADER::VERTEX::COMPILATION_FAILED\n" + infoLog)
-
-    # fragment shader
-    fragmentShader = gl.glCreateShader(gl.GL_FRAGMENT_SHADER)
-    gl.glShaderSource(fragmentShader, frag_src)
-    gl.glCompileShader(fragmentShader);
-    if not gl.glGetShaderiv(fragmentShader, gl.GL_COMPILE_STATUS):
-        infoLog = gl.glGetShaderInfoLog(fragmentShader).decode()
-        raise Exception("ERROR::SHADER::FRAGMENT::COMPILATION_FAILED\n" + infoLog)
-
-    # link shaders
-    shaderProgram = gl.glCreateProgram()
-    gl.glAttachShader(shaderProgram, vertexShader)
-    gl.glAttachShader(shaderProgram, fragmentShader)
-    gl.glLinkProgram(shaderProgram)
-    if not gl.glGetProgramiv(shaderProgram, gl.GL_LINK_STATUS):
-        infoLog = gl.glGetProgramInfoLog(shaderProgram).decode()
-        raise Exception("ERROR::SHADER::PROGRAM::LINKING_FAILED\n" + infoLog)
-    gl.glDeleteShader(vertexShader)
-    gl.glDeleteShader(fragmentShader)
-
-    return shaderProgram
-
-
 def main():
 
-    # declare draw method so it can be reused during resizing
+    # declare draw method, called by the render loop once per frame
     def draw():
         gl.glClearColor(0.2, 0.3, 0.3, 1.0)
         gl.glClear(gl.GL_COLOR_BUFFER_BIT)
 
-        gl.glUseProgram(shaderProgram1)
+        shaderProgram1.use()
 
-        gl.glBindVertexArray(VAO)
+        state.bind_vertex_array(VAO)
         gl.glDrawElements(gl.GL_TRIANGLES, 3*indices.shape[0], gl.GL_UNSIGNED_INT, None)
     
-        gl.glUseProgram(shaderProgram2)    
+        shaderProgram2.use()
 
-        gl.glBindVertexArray(VAO2)
+        state.bind_vertex_array(VAO2)
         gl.glDrawElements(gl.GL_TRIANGLES, 3*indices2.shape[0], gl.GL_UNSIGNED_INT, None)
-        gl.glBindVertexArray(0)
 
-        glfw.swap_buffers(window)
+        window.swap_buffers()
         
     # declaring resize callback in main to allow access to variables
     def window_size_callback(window, width, height):
+        # called with the framebuffer size, at most once per frame, before draw()
         gl.glViewport(0, 0, width, height)
-        # calling draw to allow drawing while resizing
-        draw()
-
-    # glfw: initialize and configure
-    
-    glfw.init()
-
-    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
-    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
-    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE) # No deprecated functions
-    glfw.window_hint(glfw.RESIZABLE, gl.GL_TRUE)
 
-    # checking if run on Mac OS X
-    if sys.platform == 'darwin':
-        glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, gl.GL_TRUE)
+    # window and OpenGL context creation: a GLFW window or a headless backend
 
-    # glfw window creation
-    window = glfw.create_window(WIDTH, HEIGHT, 'LearnOpenGL', None, None)   # tutorial: (800, 600...
-    if window is None:
-        glfw.terminate()
-        raise Exception("ERROR: Failed to create GLFW window")
+    window = create_window(WIDTH, HEIGHT, 'LearnOpenGL')
 
-    glfw.make_context_current(window)
+    window.set_key_callback(key_callback)
 
-    glfw.set_key_callback(window, key_callback)
+    width, height = window.get_framebuffer_size()
+    window.set_window_size_callback(window_size_callback)
 
-    width, height = glfw.get_framebuffer_size(window)
-    glfw.set_window_size_callback(window, window_size_callback)
-
-    shaderProgram1 = shader(vertexShaderSource, fragmentShaderSource)
-    shaderProgram2 = shader(vertexShaderSource, fragmentShaderSource2)
+    shaderProgram1 = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    shaderProgram2 = ShaderProgram(vertexShaderSource, fragmentShaderSource2)
 
     # set up vertex data (and buffer(s)) and configure vertex attributes
 
@@ -211,16 +165,16 @@ def main():
     # gl.glPolygonMode(gl.GL_FRONT_AND_BACK, gl.GL_LINE)
 
     # render loop
-    while not glfw.window_should_close(window):
-        glfw.poll_events()
-
+    while window.next_frame():
         draw()
 
-    glfw.terminate()
+    window.terminate()
 
     return 0
 
 def key_callback(window, key, scancode, action, mods):
+    # only GLFW windows call this, so headless runs never load glfw
+    import glfw
     if key == glfw.KEY_ESCAPE and action == glfw.PRESS:
         glfw.set_window_should_close(window, True)
 
@@ -19,10 +19,17 @@ The above copyright notice and this permission notice shall be included in
 all copies or substantial portions of the Software.
 '''
 
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+# learnopengl goes before OpenGL, it picks PyOpenGL's platform and flags
+from learnopengl.buffers import VAO, VBO, EBO
+from learnopengl.shader import ShaderProgram
+from learnopengl.window import create_window
+
 from OpenGL import GL as gl
-import glfw
 import numpy as np
-import sys
 
 # settings
 WIDTH, HEIGHT = 800, 600
@@ -49,132 +56,41 @@ void main()
 }
 """
 
-class VBO:
-    _buffer_type = gl.GL_ARRAY_BUFFER
-
-    def __init__(self, data):
-        self._vbo = gl.GLuint()
-        gl.glGenBuffers(1, self._vbo)
-        self.bind()
-        gl.glBufferData(self._buffer_type, data, gl.GL_STATIC_DRAW)
-
-    def __del__(self):
-        gl.glDeleteBuffers(1, self._vbo)
-
-    def bind(self):
-        gl.glBindBuffer(self._buffer_type, self._vbo)
-
-    def unbind(self):
-        gl.glBindBuffer(self._buffer_type, 0)
-
-class EBO(VBO):
-    _buffer_type = gl.GL_ELEMENT_ARRAY_BUFFER
-
-class VAO:
-    def __init__(self):
-        self._vao = gl.GLuint()
-        gl.glGenVertexArrays(1, self._vao)
-        self.bind()
-
-    def __del__(self):
-        gl.glDeleteVertexArrays(1, self._vao)
-
-    def bind(self):
-        gl.glBindVertexArray(self._vao)
-
-    def unbind(self):
-        gl.glBindVertexArray(0)
-
-def shader(vs_src, frag_src):
-
-    # build and compile shader program
-
-    # vertex shader
-    vertexShader = gl.glCreateShader(gl.GL_VERTEX_SHADER)
-    gl.glShaderSource(vertexShader, vs_src)
-    gl.glCompileShader(vertexShader);
-    if not gl.glGetShaderiv(vertexShader, gl.GL_COMPILE_STATUS):
-        infoLog = gl.glGetShaderInfoLog(vertexShader).decode()
-        raise Exception("ERROR::SHADER::VERTEX::COMPILATION_FAILED\n" + infoLog)
-
-    # fragment shader
-    fragmentShader = gl.glCreateShader(gl.GL_FRAGMENT_SHADER)
-    gl.glShaderSource(fragmentShader, frag_src)
-    gl.glCompileShader(fragmentShader);
-    if not gl.glGetShaderiv(fragmentShader, gl.GL_COMPILE_STATUS):
-        infoLog = gl.glGetShaderInfoLog(fragmentShader).decode()
-        raise Exception("ERROR::SHADER::FRAGMENT::COMPILATION_FAILED\n" + infoLog)
-
-    # link shaders
-    shaderProgram = gl.glCreateProgram()
-    gl.glAttachShader(shaderProgram, vertexShader)
-    gl.glAttachShader(shaderProgram, fragmentShader)
-    gl.glLinkProgram(shaderProgram)
-    if not gl.glGetProgramiv(shaderProgram, gl.GL_LINK_STATUS):
-        infoLog = gl.glGetProgramInfoLog(shaderProgram).decode()
-        raise Exception("ERROR::SHADER::PROGRAM::LINKING_FAILED\n" + infoLog)
-    gl.glDeleteShader(vertexShader)
-    gl.glDeleteShader(fragmentShader)
-
-    return shaderProgram
-
-
 def main():
 
-    # declare draw method so it can be reused during resizing
+    # declare draw method, called by the render loop once per frame
     def draw():
         gl.glClearColor(0.2, 0.3, 0.3, 1.0)
         gl.glClear(gl.GL_COLOR_BUFFER_BIT)
 
-        gl.glUseProgram(shaderProgram)
+        shaderProgram.use()
 
         vao.bind()
 
         # update shader uniform
-        timeValue = glfw.get_time()
+        timeValue = window.get_time()
         greenValue = np.sin(timeValue) / 2.0 + 0.5
-        vertexColorLocation = gl.glGetUniformLocation(shaderProgram, "ourColor")
-        gl.glUniform4f(vertexColorLocation, 0.0, greenValue, 0.0, 1.0)
+        shaderProgram.set("ourColor", 0.0, greenValue, 0.0, 1.0)
 
         gl.glDrawElements(gl.GL_TRIANGLES, 3*indices.shape[0], gl.GL_UNSIGNED_INT, None)
-    
-        vao.unbind()
 
-        glfw.swap_buffers(window)
+        window.swap_buffers()
         
     # declaring resize callback in main to allow access to variables
     def window_size_callback(window, width, height):
+        # called with the framebuffer size, at most once per frame, before draw()
         gl.glViewport(0, 0, width, height)
-        # calling draw to allow drawing while resizing
-        draw()
-
-    # glfw: initialize and configure
-    
-    glfw.init()
 
-    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
-    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
-    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE) # No deprecated functions
-    glfw.window_hint(glfw.RESIZABLE, gl.GL_TRUE)
+    # window and OpenGL context creation: a GLFW window or a headless backend
 
-    # checking if run on Mac OS X
-    if sys.platform == 'darwin':
-        glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, gl.GL_TRUE)
+    window = create_window(WIDTH, HEIGHT, 'LearnOpenGL')
 
-    # glfw window creation
-    window = glfw.create_window(WIDTH, HEIGHT, 'LearnOpenGL', None, None)   # tutorial: (800, 600...
-    if window is None:
-        glfw.terminate()
-        raise Exception("ERROR: Failed to create GLFW window")
+    window.set_key_callback(key_callback)
 
-    glfw.make_context_current(window)
+    width, height = window.get_framebuffer_size()
+    window.set_window_size_callback(window_size_callback)
 
-    glfw.set_key_callback(window, key_callback)
-
-    width, height = glfw.get_framebuffer_size(window)
-    glfw.set_window_size_callback(window, window_size_callback)
-
-    shaderProgram = shader(vertexShaderSource, fragmentShaderSource)
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
 
     # set up vertex data (and buffer(s)) and configure vertex attributes
 
@@ -210,17 +126,17 @@ def main():
     # gl.glPolygonMode(gl.GL_FRONT_AND_BACK, gl.GL_LINE)
 
     # render loop
-    while not glfw.window_should_close(window):
-        glfw.poll_events()
-
+    while window.next_frame():
         draw()
     
     del vbo, ebo, vao
-    glfw.terminate()
+    window.terminate()
 
     return 0
 
 def key_callback(window, key, scancode, action, mods):
+    # only GLFW windows call this, so headless runs never load glfw
+    import glfw
     if key == glfw.KEY_ESCAPE and action == glfw.PRESS:
         glfw.set_window_should_close(window, True)
 
@@ -0,0 +1,79 @@
+'''
+Drawing N triangles one call each against one glMultiDrawElementsBaseVertex
+
+    VAO per triangle   bind + glDrawElements per triangle, as in 5.8.2
+    arena, one by one  glDrawElementsBaseVertex per triangle from a MeshArena
+    batch              the arena's triangles in one Batch, one call per frame
+
+usage: python benchmarks/batch_draw.py [triangles] [frames]
+'''
+
+import common
+
+import sys
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.arena import Batch, MeshArena
+from learnopengl.buffers import EBO, VAO, VBO
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, 0.5, 0.2, 1.0);
+}
+"""
+
+indices = np.array([0, 1, 2], dtype=np.uint32)
+
+def main(count=10000, frames=50):
+    common.create_context()
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    shaderProgram.use()
+
+    rng = np.random.default_rng(0)
+    corners = np.array([[-0.01, -0.01, 0.0], [0.01, -0.01, 0.0], [0.0, 0.01, 0.0]], dtype=np.float32)
+    centres = rng.uniform(-1.0, 1.0, (count, 1, 3)).astype(np.float32)
+    centres[..., 2] = 0.0
+    triangles = corners + centres
+
+    separate = []
+    for vertices in triangles:
+        vao = VAO()
+        buffers = VBO(vertices), EBO(indices)
+        gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 12, None)
+        gl.glEnableVertexAttribArray(0)
+        separate.append((vao, buffers))
+
+    def draw_separate():
+        for vao, _ in separate:
+            vao.bind()
+            gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+
+    arena = MeshArena(np.dtype((np.float32, 3)), 3 * count, 3 * count)
+    batch = Batch(arena, [arena.add(vertices, indices) for vertices in triangles])
+
+    def draw_one_by_one():
+        for mesh in batch.meshes:
+            arena.draw(mesh)
+
+    print("{} triangles".format(count))
+    common.report("VAO per triangle", common.time_frames(draw_separate, frames))
+    common.report("arena, one by one", common.time_frames(draw_one_by_one, frames))
+    common.report("batch", common.time_frames(batch.draw, frames))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,42 @@
+'''
+Helpers shared by the benchmark scripts
+
+Benchmarks run without a window: the context comes from one of the headless
+backends in learnopengl/window.py, Mesa's surfaceless EGL platform unless
+LEARNOPENGL_BACKEND says otherwise, so they work on machines with no display
+(llvmpipe is enough).
+'''
+
+import os
+import sys
+
+# must be chosen before OpenGL is imported anywhere
+os.environ.setdefault('LEARNOPENGL_BACKEND', 'egl')
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import statistics
+import time
+
+from learnopengl.window import create_window
+
+from OpenGL import GL as gl
+
+def create_context(width=800, height=600):
+    '''Makes a headless OpenGL 3.3 core context current and returns its window'''
+    return create_window(width, height, 'benchmark')
+
+def time_frames(frame, frames):
+    '''Calls frame() frames times and returns the CPU time of each call in seconds'''
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        frame()
+        times.append(time.perf_counter() - start)
+    # flush so queued work does not bleed into the next measurement
+    gl.glFinish()
+    return times
+
+def report(name, times):
+    print("{:<28} mean {:8.2f} us   median {:8.2f} us   ({} frames)".format(
+        name, statistics.mean(times) * 1e6, statistics.median(times) * 1e6, len(times)))
@@ -0,0 +1,115 @@
+'''
+Where the CPU time of a 6.4 frame goes, and what profiling it costs
+
+Runs the draw() of 6.4-Shaders with a profiler scope around each stage
+    clear      glClearColor and glClear
+    bind       use the program and bind the vertex array
+    numpy      np.sin of the time for the colour
+    uniform    ShaderProgram.set
+    draw       glDrawElements
+inside one 'draw()' scope, while the window adds 'poll_events' and
+'swap_buffers'. The frame loop is timed three times: without scopes, with
+scopes and the profiler off, and with it on, followed by the cost of one
+empty scope. The profile of the last run is printed and written as JSON and
+as a Chrome trace.
+
+usage: python benchmarks/cpu_profile.py [frames] [output prefix]
+'''
+
+import common
+
+import json
+import sys
+import time
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl import profiler
+from learnopengl.buffers import EBO, VAO, VBO
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+};
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+uniform vec4 ourColor;
+void main()
+{
+    color = ourColor;
+}
+"""
+
+def main(frames=2000, output='cpu_profile'):
+    window = common.create_context()
+    window.frames = None
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    vao = VAO()
+    vbo = VBO(np.array([[0.5, -0.5, 0.0], [-0.5, -0.5, 0.0], [0.0, 0.5, 0.0]], dtype=np.float32))
+    ebo = EBO(np.array([[0, 1, 2]], dtype=np.int32))
+    gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 12, None)
+    gl.glEnableVertexAttribArray(0)
+
+    def draw():
+        gl.glClearColor(0.2, 0.3, 0.3, 1.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        shaderProgram.use()
+        vao.bind()
+        greenValue = np.sin(window.get_time()) / 2.0 + 0.5
+        shaderProgram.set("ourColor", 0.0, greenValue, 0.0, 1.0)
+        gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+
+    def profiled_draw():
+        scope = profiler.current.scope
+        with scope('draw()'):
+            with scope('clear'):
+                gl.glClearColor(0.2, 0.3, 0.3, 1.0)
+                gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+            with scope('bind'):
+                shaderProgram.use()
+                vao.bind()
+            with scope('numpy'):
+                greenValue = np.sin(window.get_time()) / 2.0 + 0.5
+            with scope('uniform'):
+                shaderProgram.set("ourColor", 0.0, greenValue, 0.0, 1.0)
+            with scope('draw'):
+                gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+
+    def loop(draw, enabled):
+        profiler.current.enabled = enabled
+        profiler.current.clear()
+        start = time.perf_counter()
+        for _ in range(frames):
+            window.next_frame()
+            draw()
+            window.swap_buffers()
+        return (time.perf_counter() - start) / frames
+
+    print("{} frames, CPU time per frame".format(frames))
+    for name, draw_function, enabled in [('no scopes', draw, False), ('profiler off', profiled_draw, False),
+                                          ('profiler on', profiled_draw, True)]:
+        print("{:<28} {:8.2f} us".format(name, loop(draw_function, enabled) * 1e6))
+    for enabled in (False, True):
+        scope = profiler.Profiler(enabled=enabled).scope
+        start = time.perf_counter()
+        for _ in range(100000):
+            with scope('empty'):
+                pass
+        print("{:<28} {:8.2f} us".format('one scope, ' + ('on' if enabled else 'off'),
+                                         (time.perf_counter() - start) / 100000 * 1e6))
+
+    print(json.dumps(profiler.current.summary(), indent=1))
+    profiler.current.write_json(output + '.json')
+    profiler.current.write_chrome_trace(output + '.trace.json')
+    print("wrote {0}.json and {0}.trace.json".format(output))
+
+if __name__ == "__main__":
+    main(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]])
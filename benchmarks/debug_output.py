@@ -0,0 +1,72 @@
+'''
+Cost of a KHR_debug layer on the draw path
+
+Times a frame of N glUniform1f and glDrawArrays calls, the calls a chapter
+script makes most, with
+    no layer      production mode, nothing checks the calls
+    layer         a DebugLayer at severity low, the driver checks and reports
+    synchronous   the same, reported from inside the failing call
+and then makes one failing call with the layer on, to show the message it
+turns into.
+
+usage: python benchmarks/debug_output.py [calls per frame] [frames]
+'''
+
+import common
+
+import logging
+import sys
+
+from OpenGL import GL as gl
+
+from learnopengl.buffers import VAO
+from learnopengl.debug import DebugLayer
+from learnopengl.shader import ShaderProgram
+
+VERTEX = """
+#version 330 core
+void main()
+{
+    gl_Position = vec4(0.0, 0.0, 0.0, 1.0);
+}
+"""
+
+FRAGMENT = """
+#version 330 core
+uniform float value;
+out vec4 FragColor;
+void main()
+{
+    FragColor = vec4(value);
+}
+"""
+
+def main(count=1000, frames=100):
+    window = common.create_context()
+    window.frames = None
+    program = ShaderProgram(VERTEX, FRAGMENT)
+    location = program.uniforms['value'].location
+    vao = VAO()
+
+    def frame():
+        for i in range(count):
+            gl.glUniform1f(location, i)
+            gl.glDrawArrays(gl.GL_POINTS, 0, 1)
+
+    print("{} uniform + draw calls per frame".format(count))
+    common.report('no layer', common.time_frames(frame, frames))
+    for name, synchronous in [('layer', False), ('synchronous', True)]:
+        window.debug = DebugLayer('low', synchronous=synchronous)
+        window.debug.enable()
+        common.report(name, common.time_frames(frame, frames))
+        window.debug.disable()
+
+    logging.basicConfig(format='%(levelname)s %(message)s')
+    window.debug = DebugLayer('low')
+    window.debug.enable()
+    gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 123456)
+    print(window.debug.stats())
+    window.terminate()
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
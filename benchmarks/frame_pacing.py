@@ -0,0 +1,96 @@
+'''
+Holding a frame rate: uncapped, capped with sleeps only, capped with sleep and spin
+
+Runs the 6.4 triangle for a few seconds under a Scheduler, its colour moved on
+by update() at a 60 Hz timestep and interpolated by render(), and prints the
+frame rate reached, frame interval percentiles, frames later than 1.5 frames,
+and the process CPU time as a share of one core.
+
+usage: python benchmarks/frame_pacing.py [seconds] [fps]
+'''
+
+import common
+
+import sys
+import threading
+import time
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.buffers import VAO, VBO
+from learnopengl.pacing import Scheduler
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+uniform vec4 ourColor;
+void main()
+{
+    color = ourColor;
+}
+"""
+
+def run(seconds, fps, spin):
+    window = common.create_context()
+    # headless windows close after 100 frames, run until the timer closes it instead
+    window.frames = None
+
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    vao = VAO()
+    vbo = VBO(np.array([0.5, -0.5, 0.0, -0.5, -0.5, 0.0, 0.0, 0.5, 0.0], dtype=np.float32))
+    gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 12, None)
+    gl.glEnableVertexAttribArray(0)
+
+    greenValues = [0.5, 0.5]    # at the last update and the one before
+
+    def update(dt):
+        greenValues[0] = greenValues[1]
+        greenValues[1] = np.sin(scheduler.time + dt) / 2.0 + 0.5
+
+    def render(alpha):
+        gl.glClearColor(0.2, 0.3, 0.3, 1.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        shaderProgram.use()
+        vao.bind()
+        greenValue = greenValues[0] + (greenValues[1] - greenValues[0]) * alpha
+        shaderProgram.set("ourColor", 0.0, greenValue, 0.0, 1.0)
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, 3)
+        window.swap_buffers()
+
+    scheduler = Scheduler(window, render, update, fps=fps)
+    if not spin:
+        scheduler.SPIN = 0.0
+    timer = threading.Timer(seconds, window.close)
+
+    start, start_cpu = time.perf_counter(), time.process_time()
+    timer.start()
+    scheduler.run()
+    cpu = (time.process_time() - start_cpu) / (time.perf_counter() - start)
+
+    del vbo, vao
+    window.terminate()
+    return scheduler.stats.summary(1.0 / fps if fps else None), cpu
+
+def main(seconds=3.0, fps=60):
+    seconds, fps = float(seconds), int(fps)
+    for name, cap, spin in [('uncapped', None, False),
+                            ('{} fps, sleep'.format(fps), fps, False),
+                            ('{} fps, sleep and spin'.format(fps), fps, True)]:
+        summary, cpu = run(seconds, cap, spin)
+        print("{:<24} {:8.1f} fps   p50 {:6.3f} ms   p99 {:6.3f} ms   late {:>4}   {:5.1f} % CPU".format(
+            name, summary['fps'], summary['interval_ms']['p50'], summary['interval_ms']['p99'],
+            summary.get('late', '-'), cpu * 100))
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,185 @@
+'''
+Frame times of every chapter script, run headless
+
+Each scene's main() runs on the headless backend for a fixed number of frames,
+twice. The first run is left alone and gives the p50/p95/p99 frame times. The
+second times every GL call made by the script and the learnopengl helpers, and
+splits each frame into
+    python  everything else: the script's draw(), numpy, the helper classes
+    gl      time spent inside OpenGL calls
+    swap    swap_buffers, which waits for the frame to finish on the headless backends
+The timing wrappers add their own cost to the python share of that run only.
+
+Results are written as JSON so runs can be compared.
+
+usage: python benchmarks/frame_times.py [--frames N] [--warmup N] [--output FILE] [scene ...]
+'''
+
+import common
+
+import argparse
+import contextlib
+import glob
+import importlib.util
+import json
+import os
+import sys
+import time
+
+from OpenGL import GL as gl
+import numpy as np
+
+import learnopengl
+from learnopengl import window as learnopengl_window
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+def scenes():
+    '''Chapter scripts by name, e.g. "6.4-Shaders", in chapter order'''
+    paths = glob.glob(os.path.join(ROOT, 'Chapter*', '*.py'))
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    key = lambda name: [int(part) for part in name.split('-')[0].split('.')]
+    return {name: path for name, path in sorted(zip(names, paths), key=lambda item: key(item[0]))}
+
+def load(name, path):
+    spec = importlib.util.spec_from_file_location('scene_' + name.replace('.', '_').replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class TimedGL:
+    '''Stands in for the OpenGL.GL module and adds up the time spent in its functions'''
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def __getattr__(self, name):
+        attr = getattr(gl, name)
+        if not (name.startswith('gl') and callable(attr)):
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self.elapsed += time.perf_counter() - start
+        setattr(self, name, timed)
+        return timed
+
+    def take(self):
+        elapsed, self.elapsed = self.elapsed, 0.0
+        return elapsed
+
+class FrameRecorder:
+    '''Hands the scene a headless window whose swap_buffers records when each frame ends'''
+
+    def __init__(self, frames, timed_gl=None):
+        self.frames = frames
+        self.timed_gl = timed_gl
+        self.ends, self.swaps, self.gl_times = [], [], []
+        self.renderer = None
+
+    def create_window(self, width, height, title, *args, **kwargs):
+        window = learnopengl_window.create_window(width, height, title, frames=self.frames)
+        self.renderer = gl.glGetString(gl.GL_RENDERER).decode()
+        swap_buffers = window.swap_buffers
+
+        def recorded_swap_buffers():
+            start = time.perf_counter()
+            swap_buffers()
+            end = time.perf_counter()
+            self.swaps.append(end - start)
+            self.ends.append(end)
+            if self.timed_gl is not None:
+                self.gl_times.append(self.timed_gl.take())
+
+        window.swap_buffers = recorded_swap_buffers
+        return window
+
+def run(name, path, frames, timed):
+    scene = load(name, path)
+    timed_gl = TimedGL() if timed else None
+    recorder = FrameRecorder(frames, timed_gl)
+    scene.create_window = recorder.create_window
+
+    # GL calls made by the helper classes count as GL time too, the window's own
+    # glFinish already counts as swap time
+    patched = [scene] + [module for module_name, module in sys.modules.items()
+                         if module_name.startswith('learnopengl.') and
+                         module not in (learnopengl_window, learnopengl.framebuffer) and
+                         getattr(module, 'gl', None) is gl]
+    if timed:
+        for module in patched:
+            module.gl = timed_gl
+    try:
+        # scenes print to stdout, keep it for the JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            scene.main()
+    finally:
+        if timed:
+            for module in patched:
+                module.gl = gl
+    return recorder
+
+def percentiles(times):
+    return {'mean': float(np.mean(times)) * 1e3,
+            'p50': float(np.percentile(times, 50)) * 1e3,
+            'p95': float(np.percentile(times, 95)) * 1e3,
+            'p99': float(np.percentile(times, 99)) * 1e3}
+
+def measure(name, path, frames, warmup):
+    # one frame more, a frame's time is from the end of the one before it
+    clean = run(name, path, 1 + warmup + frames, timed=False)
+    frame_times = np.diff(clean.ends)[warmup:]
+
+    timed = run(name, path, 1 + warmup + frames, timed=True)
+    timed_frames = np.diff(timed.ends)[warmup:]
+    gl_times = np.array(timed.gl_times[1:])[warmup:]
+    swaps = np.array(timed.swaps[1:])[warmup:]
+    python = timed_frames - gl_times - swaps
+    total = timed_frames.sum()
+
+    return {
+        'frames': int(frame_times.size),
+        'frame_ms': percentiles(frame_times),
+        'split_ms': {'python': float(python.mean()) * 1e3,
+                     'gl': float(gl_times.mean()) * 1e3,
+                     'swap': float(swaps.mean()) * 1e3},
+        'split_fraction': {'python': float(python.sum() / total),
+                           'gl': float(gl_times.sum() / total),
+                           'swap': float(swaps.sum() / total)},
+    }, clean.renderer
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame times of the chapter scripts")
+    parser.add_argument('scenes', nargs='*', help="scene names, e.g. 6.4-Shaders (default: all)")
+    parser.add_argument('--frames', type=int, default=500, help="frames measured per scene")
+    parser.add_argument('--warmup', type=int, default=20, help="frames run before measuring")
+    parser.add_argument('--output', help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    available = scenes()
+    selected = args.scenes or list(available)
+    for name in selected:
+        if name not in available:
+            parser.error("unknown scene " + name)
+
+    results = {'backend': learnopengl.BACKEND, 'frames': args.frames, 'warmup': args.warmup, 'scenes': {}}
+    for name in selected:
+        results['scenes'][name], results['renderer'] = measure(name, available[name], args.frames, args.warmup)
+        print("{:<22} p50 {:6.3f} ms  p99 {:6.3f} ms".format(
+            name, results['scenes'][name]['frame_ms']['p50'], results['scenes'][name]['frame_ms']['p99']),
+            file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+if __name__ == "__main__":
+    main()
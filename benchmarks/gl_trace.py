@@ -0,0 +1,98 @@
+'''
+What a GLTracer finds in a frame of N draws, and what tracing costs
+
+Draws N small triangles a frame two ways:
+    tutorial    every draw binds the program and vertex array and sets both
+                uniforms with gl calls, as the chapter scripts' draw() does
+    cached      binds through ShaderProgram.use and VAO.bind and sets the
+                uniforms with ShaderProgram.set, which skip what is already set
+Times a frame of each without and with the tracer installed, then prints the
+tracer's report for each.
+
+usage: python benchmarks/gl_trace.py [draw calls] [frames]
+'''
+
+import common
+
+import sys
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl import shader
+from learnopengl.buffers import EBO, VAO, VBO
+from learnopengl.shader import ShaderProgram
+from learnopengl.tracer import GLTracer
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+uniform float offset;
+void main()
+{
+   gl_Position = vec4(aPos.x + offset, aPos.y, aPos.z, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+uniform vec4 ourColor;
+void main()
+{
+    color = ourColor;
+}
+"""
+
+def main(count=100, frames=100):
+    window = common.create_context()
+    window.frames = None
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    vao = VAO()
+    buffers = (VBO(np.array([-0.1, -0.1, 0.0, 0.1, -0.1, 0.0, 0.0, 0.1, 0.0], dtype=np.float32)),
+               EBO(np.array([0, 1, 2], dtype=np.uint32)))
+    gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 12, None)
+    gl.glEnableVertexAttribArray(0)
+    offset = shaderProgram.uniforms['offset'].location
+    color = shaderProgram.uniforms['ourColor'].location
+    offsets = np.linspace(-0.9, 0.9, count).tolist()
+
+    def tutorial():
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        for x in offsets:
+            gl.glUseProgram(shaderProgram.Program)
+            gl.glBindVertexArray(vao._vao)
+            gl.glUniform1f(offset, x)
+            gl.glUniform4f(color, 1.0, 0.5, 0.2, 1.0)
+            gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+        window.swap_buffers()
+
+    def cached():
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        for x in offsets:
+            shaderProgram.use()
+            vao.bind()
+            shaderProgram.set('offset', x)
+            shaderProgram.set('ourColor', 1.0, 0.5, 0.2, 1.0)
+            gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+        window.swap_buffers()
+
+    print("{} draw calls per frame".format(count))
+    for name, frame in [('tutorial', tutorial), ('cached', cached)]:
+        common.report(name, common.time_frames(frame, frames))
+        tracer = window.tracer = GLTracer()
+        tracer.install()
+        # the frames look gl up in this module, the program has resolved its uniform setters already
+        shaderProgram._setters = shader._uniform_setters()
+
+        def traced():
+            tracer.begin_frame()
+            frame()
+        common.report(name + ', traced', common.time_frames(traced, frames))
+        print(tracer.report(10))
+        tracer.uninstall()
+        window.tracer = None
+        shaderProgram._setters = shader._uniform_setters()
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
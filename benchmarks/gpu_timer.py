@@ -0,0 +1,84 @@
+'''
+GPU time per pass from timer queries, and what timing costs the CPU
+
+Each frame clears, draws N small triangles with one glDrawElements each and
+swaps, with every pass in a GPUTimer scope and each draw call a 'draw' scope
+of its own inside 'scene'. Prints the CPU time of a frame without and with the
+timer, then the per pass GPU times and how many frames late they came back.
+
+usage: python benchmarks/gpu_timer.py [draw calls] [frames]
+'''
+
+import common
+
+import json
+import sys
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.buffers import EBO, VAO, VBO
+from learnopengl.gpu_timer import GPUTimer
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, 0.5, 0.2, 1.0);
+}
+"""
+
+def main(count=100, frames=200):
+    window = common.create_context()
+    window.frames = None
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    shaderProgram.use()
+
+    vao = VAO()
+    buffers = (VBO(np.array([-0.5, -0.5, 0.0, 0.5, -0.5, 0.0, 0.0, 0.5, 0.0], dtype=np.float32)),
+               EBO(np.array([0, 1, 2], dtype=np.uint32)))
+    gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 12, None)
+    gl.glEnableVertexAttribArray(0)
+
+    timer = GPUTimer()
+    if not timer.enabled:
+        print("no GL_TIMESTAMP queries in this context")
+        return
+
+    def untimed():
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        for _ in range(count):
+            gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+        window.swap_buffers()
+
+    def timed():
+        with timer.scope('clear'):
+            gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        with timer.scope('scene'):
+            for _ in range(count):
+                with timer.scope('draw'):
+                    gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+        with timer.scope('swap'):
+            window.swap_buffers()
+        timer.end_frame()
+
+    print("{} draw calls per frame".format(count))
+    common.report('untimed', common.time_frames(untimed, frames))
+    common.report('timed', common.time_frames(timed, frames))
+    timer.collect()
+    print("results {} frames behind".format(timer.frames_behind))
+    print(json.dumps(timer.summary(), indent=1))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,62 @@
+'''
+Time and memory of many GL handles, generated one by one against from a pool
+
+Creates N vertex arrays two ways
+    one by one  a wrapper with a __dict__ holding a ctypes GLuint, each name
+                from its own glGenVertexArrays(1, ...), as VAO used to
+    pooled      VAO, with __slots__ and a plain int name taken from the
+                registry's NamePool, which generates names a block at a time
+and prints the time to create them and the Python memory they hold, measured
+with tracemalloc.
+
+usage: python benchmarks/handle_pool.py [handles]
+'''
+
+import common
+
+import sys
+import time
+import tracemalloc
+
+from OpenGL import GL as gl
+
+from learnopengl import resources
+from learnopengl import state
+from learnopengl.buffers import VAO
+
+class OldVAO:
+    def __init__(self):
+        self._registry = resources.current
+        self._vao = gl.GLuint()
+        gl.glGenVertexArrays(1, self._vao)
+        self.bind()
+        self._registry.created('vertex array', self._vao)
+
+    def bind(self):
+        state.bind_vertex_array(self._vao)
+
+def measure(name, create, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    handles = [create() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<28} {:8.1f} ms   {:6.1f} bytes per handle".format(name, elapsed * 1e3, size / count))
+    return handles
+
+def main(count=100000):
+    window = common.create_context()
+    print("{} vertex arrays".format(count))
+    for name, create in [('one by one', OldVAO), ('pooled', VAO)]:
+        handles = measure(name, create, count)
+        # the registry deletes them all at once, the old ones included
+        for handle in handles:
+            window.resources.release('vertex array', handle._vao)
+            handle._vao = None
+        del handles
+        window.resources.collect()
+    print(window.resources.stats())
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
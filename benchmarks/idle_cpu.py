@@ -0,0 +1,51 @@
+'''
+CPU used by an idle window, rendering continuously against on demand
+
+Runs the render loop of 4.6 (clear and swap) for a few seconds in which
+nothing happens, in each render mode, and prints the process CPU time as a
+share of one core, and the frames drawn. On demand is also run with the
+animation clock at 60 frames a second, as 6.4 uses it.
+
+Runs headless like the other benchmarks. With LEARNOPENGL_BACKEND=glfw it uses a
+real window, which on demand sleeps in glfw.wait_events.
+
+usage: python benchmarks/idle_cpu.py [seconds]
+'''
+
+import common
+
+import sys
+import threading
+import time
+
+from OpenGL import GL as gl
+
+from learnopengl.window import create_window
+
+def idle(render_mode, seconds, animation_interval=None):
+    window = create_window(800, 600, 'idle', render_mode=render_mode)
+    # headless windows close after 100 frames, run until the timer closes it instead
+    window.frames = None
+    window.animate(animation_interval)
+    timer = threading.Timer(seconds, window.close)
+
+    start, start_cpu = time.perf_counter(), time.process_time()
+    timer.start()
+    while window.next_frame():
+        gl.glClearColor(0.2, 0.3, 0.3, 1.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        window.swap_buffers()
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - start_cpu
+
+    window.terminate()
+    return cpu / elapsed, window.frame
+
+def main(seconds=3.0):
+    for name, render_mode, interval in [('continuous', 'continuous', None),
+                                        ('on demand', 'on_demand', None),
+                                        ('on demand, 60 fps clock', 'on_demand', 1.0 / 60)]:
+        cpu, frames = idle(render_mode, float(seconds), interval)
+        print("{:<28} {:6.1f} % CPU   {:6d} frames in {} s".format(name, cpu * 100, frames, seconds))
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,101 @@
+'''
+N shifted copies of a triangle: an offset uniform per copy against instancing
+
+    uniform per copy  set the offset uniform and draw, once per copy, as 6.8.2
+                      moves its one triangle
+    instanced         write all offsets, colours and scales to an
+                      InstanceBuffer from numpy and draw_instanced() once
+
+The offsets move every frame in both.
+
+usage: python benchmarks/instancing.py [copies] [frames]
+'''
+
+import common
+
+import sys
+
+import numpy as np
+
+from learnopengl.arena import MeshArena
+from learnopengl.instancing import InstanceBuffer, draw_instanced
+from learnopengl.shader import ShaderProgram
+
+uniformVertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+uniform vec2 offset;
+void main()
+{
+   gl_Position = vec4(aPos.xy * 0.02 + offset, aPos.z, 1.0);
+}
+"""
+
+uniformFragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, 0.5, 0.2, 1.0);
+}
+"""
+
+instancedVertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+layout (location = 1) in vec2 aOffset;
+layout (location = 2) in vec3 aColor;
+layout (location = 3) in float aScale;
+out vec3 ourColor;
+void main()
+{
+   gl_Position = vec4(aPos.xy * aScale + aOffset, aPos.z, 1.0);
+   ourColor = aColor;
+}
+"""
+
+instancedFragmentShaderSource = """
+#version 330 core
+out vec4 color;
+in vec3 ourColor;
+void main()
+{
+    color = vec4(ourColor, 1.0);
+}
+"""
+
+instance_format = np.dtype([('aOffset', np.float32, 2), ('aColor', np.float32, 3), ('aScale', np.float32)])
+
+def main(copies=50000, frames=10):
+    common.create_context()
+    arena = MeshArena(np.dtype((np.float32, 3)))
+    triangle = arena.add(np.array([-0.5, -0.5, 0.0, 0.5, -0.5, 0.0, 0.0, 0.5, 0.0], dtype=np.float32), [0, 1, 2])
+
+    rng = np.random.default_rng(0)
+    instances = np.zeros(copies, instance_format)
+    instances['aOffset'] = rng.uniform(-1.0, 1.0, (copies, 2))
+    instances['aColor'] = rng.uniform(0.0, 1.0, (copies, 3))
+    instances['aScale'] = 0.02
+
+    uniformProgram = ShaderProgram(uniformVertexShaderSource, uniformFragmentShaderSource)
+    def uniform_per_copy():
+        instances['aOffset'] *= -1.0
+        uniformProgram.use()
+        for x, y in instances['aOffset'].tolist():
+            uniformProgram.set("offset", x, y)
+            triangle.draw()
+
+    instancedProgram = ShaderProgram(instancedVertexShaderSource, instancedFragmentShaderSource)
+    instanceBuffer = InstanceBuffer(instances, location=1)
+    def instanced():
+        instances['aOffset'] *= -1.0
+        instancedProgram.use()
+        instanceBuffer.write(instances)
+        draw_instanced(triangle, instanceBuffer)
+
+    print("{} copies".format(copies))
+    common.report("uniform per copy", common.time_frames(uniform_per_copy, frames))
+    common.report("instanced", common.time_frames(instanced, frames))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
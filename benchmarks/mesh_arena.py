@@ -0,0 +1,100 @@
+'''
+Drawing many small meshes: a VAO, VBO and EBO each against one MeshArena
+
+Both draw the same N quads, once per frame. With a vertex array per mesh every
+draw binds it first; from the arena every draw is a glDrawElementsBaseVertex
+on the one vertex array. Also times freeing every other mesh and adding them
+again as triangles, which leaves holes in the arena, and the defragment()
+that follows.
+
+usage: python benchmarks/mesh_arena.py [meshes] [frames]
+'''
+
+import common
+
+import sys
+import time
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.arena import MeshArena
+from learnopengl.buffers import EBO, VAO, VBO
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, 0.5, 0.2, 1.0);
+}
+"""
+
+indices = np.array([0, 1, 3, 1, 2, 3], dtype=np.uint32)
+
+def quads(count):
+    rng = np.random.default_rng(0)
+    corners = np.array([[0.01, 0.01, 0.0], [0.01, -0.01, 0.0], [-0.01, -0.01, 0.0], [-0.01, 0.01, 0.0]], dtype=np.float32)
+    centres = rng.uniform(-1.0, 1.0, (count, 1, 3)).astype(np.float32)
+    centres[..., 2] = 0.0
+    return corners + centres
+
+def main(count=2000, frames=100):
+    common.create_context()
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    shaderProgram.use()
+    meshes = quads(count)
+
+    separate = []
+    for vertices in meshes:
+        vao = VAO()
+        buffers = VBO(vertices), EBO(indices)
+        gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 12, None)
+        gl.glEnableVertexAttribArray(0)
+        separate.append((vao, buffers))
+
+    def draw_separate():
+        for vao, _ in separate:
+            vao.bind()
+            gl.glDrawElements(gl.GL_TRIANGLES, 6, gl.GL_UNSIGNED_INT, None)
+
+    arena = MeshArena(np.dtype((np.float32, 3)))
+    handles = [arena.add(vertices, indices) for vertices in meshes]
+
+    def draw_arena():
+        for mesh in handles:
+            arena.draw(mesh)
+
+    print("{} meshes".format(count))
+    common.report("VAO per mesh", common.time_frames(draw_separate, frames))
+    common.report("arena", common.time_frames(draw_arena, frames))
+
+    start = time.perf_counter()
+    for mesh in handles[::2]:
+        mesh.free()
+    handles[::2] = [arena.add(vertices[:3], indices[3:] - 1) for vertices in meshes[::2]]
+    churn = time.perf_counter() - start
+    fragmented = arena.stats()
+
+    start = time.perf_counter()
+    arena.defragment()
+    gl.glFinish()
+    defragment = time.perf_counter() - start
+
+    print("free {} meshes, add triangles: {:.2f} ms, {} free vertex blocks after".format(
+        count // 2 + count % 2, churn * 1e3, fragmented['vertex_free_blocks']))
+    print("defragment: {:.2f} ms, {} free vertex blocks after".format(
+        defragment * 1e3, arena.stats()['vertex_free_blocks']))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
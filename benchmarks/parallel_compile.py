@@ -0,0 +1,97 @@
+'''
+Start up time of 100 programs compiled one by one or as a batch
+
+Builds [programs] programs with different fragment shaders three ways:
+    one by one      ShaderProgram(), which waits for each compile and link
+    batch           compile_programs(warm=False), everything handed to the
+                    driver first, then wait() on each
+    batch, warm     compile_programs(), which also draws once with each
+and then draws a first frame using every program. Prints the time to hand the
+programs to the driver, until all were ready, and the first frame. The program
+binary cache and Mesa's shader cache are off, so every compile is a real one.
+
+usage: python benchmarks/parallel_compile.py [programs]
+'''
+
+import os
+
+os.environ.setdefault('MESA_SHADER_CACHE_DISABLE', 'true')
+
+import common
+
+import sys
+import time
+
+from OpenGL import GL as gl
+
+from learnopengl import shader_cache
+from learnopengl.buffers import VAO
+from learnopengl.shader import ShaderProgram, compile_programs
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+out vec3 position;
+void main()
+{
+    position = aPos;
+    gl_Position = vec4(aPos, 1.0);
+}
+"""
+
+# a little lighting, so compiling takes a while
+fragmentShaderSource = """
+#version 330 core
+in vec3 position;
+out vec4 color;
+uniform vec3 lightPositions[4];
+void main()
+{
+    vec3 normal = normalize(vec3(position.xy, 1.0));
+    vec3 light = vec3(0.0);
+    for (int i = 0; i < 4; i++) {
+        vec3 direction = normalize(lightPositions[i] - position);
+        float diffuse = max(dot(normal, direction), 0.0);
+        float specular = pow(max(dot(reflect(-direction, normal), vec3(0.0, 0.0, 1.0)), 0.0), %d.0);
+        light += vec3(diffuse + specular) / (1.0 + length(lightPositions[i] - position));
+    }
+    color = vec4(light * vec3(1.0, %f, 0.2), 1.0);
+}
+"""
+
+def main(programs=100):
+    window = common.create_context()
+    window.frames = None
+    ShaderProgram.cache = None
+    vao = VAO()
+    print("{} programs, parallel shader compile: {}".format(programs, shader_cache.current().parallel()))
+
+    def first_frame(shaderPrograms):
+        start = time.perf_counter()
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        vao.bind()
+        for shaderProgram in shaderPrograms:
+            shaderProgram.use()
+            gl.glDrawArrays(gl.GL_TRIANGLES, 0, 3)
+        window.swap_buffers()
+        return time.perf_counter() - start
+
+    for run, name in enumerate(['one by one', 'batch', 'batch, warm']):
+        # sources no earlier run compiled
+        sources = [(vertexShaderSource, fragmentShaderSource % (8 + run, i / programs)) for i in range(programs)]
+        start = time.perf_counter()
+        if name == 'one by one':
+            shaderPrograms = [ShaderProgram(*arguments) for arguments in sources]
+        else:
+            shaderPrograms = compile_programs(sources, warm=name == 'batch, warm')
+        submitted = time.perf_counter() - start
+        for shaderProgram in shaderPrograms:
+            shaderProgram.wait()
+        ready = time.perf_counter() - start
+        print("{:<12} handed over {:8.1f} ms   ready {:8.1f} ms   first frame {:8.1f} ms".format(
+            name, submitted * 1e3, ready * 1e3, first_frame(shaderPrograms) * 1e3))
+        for shaderProgram in shaderPrograms:
+            shaderProgram.delete()
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,50 @@
+'''
+Uploading edits to a large mesh: the whole array against flush()
+
+Edits a few rows of an N vertex mesh every frame, as an interactive editor
+would, and uploads them either by re-sending the whole array with
+glBufferSubData or with the dirty ranges a keep=True VBO recorded. Prints the
+time per frame and the glBufferSubData calls flush() merged the edits into.
+
+usage: python benchmarks/partial_updates.py [vertices] [frames]
+'''
+
+import common
+
+import sys
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.buffers import VBO
+
+def main(count=1000000, frames=100):
+    common.create_context()
+    rng = np.random.default_rng(0)
+    vertices = rng.uniform(-1.0, 1.0, (count, 3)).astype(np.float32)
+
+    edits = {
+        '3 vertices': lambda: rng.integers(count, size=3),
+        '1000 scattered': lambda: rng.integers(count, size=1000),
+        '10000 block': lambda: slice(*(lambda start: (start, start + 10000))(int(rng.integers(count - 10000)))),
+    }
+
+    print("{} vertices ({:.1f} MB), {} frames".format(count, vertices.nbytes / 1e6, frames))
+    for name, rows in edits.items():
+        whole = VBO(vertices, gl.GL_DYNAMIC_DRAW)
+        def upload_whole():
+            vertices[rows()] += 0.001
+            whole.update(vertices)
+        common.report(name + ", whole", common.time_frames(upload_whole, frames))
+
+        partial = VBO(vertices, gl.GL_DYNAMIC_DRAW, keep=True)
+        calls = []
+        def upload_edited():
+            edited = rows()
+            partial[edited] = partial.data[edited] + 0.001
+            calls.append(partial.flush())
+        common.report(name + ", flush", common.time_frames(upload_edited, frames))
+        print("{:<28} {:.1f} glBufferSubData calls per frame".format("", np.mean(calls)))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
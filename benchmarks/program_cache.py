@@ -0,0 +1,73 @@
+'''
+Start up time of many ShaderPrograms with and without the program binary cache
+
+Builds [programs] variants of the 5.8.3 shaders three times in a headless Mesa
+context: with the cache off, into an empty cache (misses, binaries written) and
+from the filled cache (hits). Mesa only offers program binaries while its own
+shader cache is on, so that cache is pointed at an empty directory and the first
+two runs use different variants to keep it from serving their compiles.
+
+usage: python benchmarks/program_cache.py [programs]
+'''
+
+import os
+import tempfile
+
+os.environ.setdefault('MESA_SHADER_CACHE_DIR', tempfile.mkdtemp())
+
+import common
+
+import sys
+import time
+
+from learnopengl import resources
+from learnopengl.program_cache import ProgramBinaryCache
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 position;
+void main()
+{
+    gl_Position = vec4(position.x, position.y, position.z, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, %f, %f, 1.0);
+}
+"""
+
+def build(programs, variant):
+    start = time.perf_counter()
+    shaderPrograms = [ShaderProgram(vertexShaderSource, fragmentShaderSource % (variant, i / programs))
+                      for i in range(programs)]
+    elapsed = time.perf_counter() - start
+    for shaderProgram in shaderPrograms:
+        shaderProgram.delete()
+    resources.current.collect()
+    return elapsed
+
+def main(programs=100):
+    common.create_context()
+
+    with tempfile.TemporaryDirectory() as directory:
+        ShaderProgram.cache = None
+        print("{:<12} {:8.1f} ms".format("no cache", build(programs, 0.0) * 1e3))
+
+        for run in ("cold cache", "warm cache"):
+            ShaderProgram.cache = ProgramBinaryCache(directory)
+            if not ShaderProgram.cache.supported():
+                print("driver offers no program binary formats")
+                break
+            elapsed = build(programs, 0.5)
+            print("{:<12} {:8.1f} ms   {}".format(run, elapsed * 1e3, ShaderProgram.cache.stats()))
+
+    return 0
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
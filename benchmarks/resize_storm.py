@@ -0,0 +1,105 @@
+'''
+Frames rendered while the window is being resized
+
+Replays a drag-resize: every time round the render loop, poll_events delivers
+a burst of resize events with a new size each. Counts the frames rendered and
+the time taken for the same number of loop iterations, with
+    per event   what the scripts did before: glViewport and a full draw(),
+                swap included, inside the callback for every event
+    coalesced   window.resize() records the size, next_frame() resizes the
+                offscreen framebuffer and calls the size callback once per burst
+
+usage: python benchmarks/resize_storm.py [iterations] [events per iteration]
+'''
+
+import common
+
+import itertools
+import sys
+import time
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.buffers import VAO, VBO
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, 0.5, 0.2, 1.0);
+}
+"""
+
+def storm(coalesced, iterations, events):
+    window = common.create_context()
+    window.frames = None
+
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    vao = VAO()
+    vbo = VBO(np.array([0.5, -0.5, 0.0, -0.5, -0.5, 0.0, 0.0, 0.5, 0.0], dtype=np.float32))
+    gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 12, None)
+    gl.glEnableVertexAttribArray(0)
+
+    def draw():
+        gl.glClearColor(0.2, 0.3, 0.3, 1.0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        shaderProgram.use()
+        vao.bind()
+        gl.glDrawArrays(gl.GL_TRIANGLES, 0, 3)
+        window.swap_buffers()
+
+    target_resizes = [0]
+    resize_framebuffer = window.framebuffer.resize
+    def counted_resize(width, height):
+        target_resizes[0] += 1
+        resize_framebuffer(width, height)
+    window.framebuffer.resize = counted_resize
+
+    if coalesced:
+        window.set_window_size_callback(lambda window, width, height: gl.glViewport(0, 0, width, height))
+        emit = window.resize
+    else:
+        def emit(width, height):
+            gl.glViewport(0, 0, width, height)
+            draw()
+
+    # a drag from 800x600 to 1000x750 and back
+    sizes = itertools.cycle([(800 + 4 * i, 600 + 3 * i) for i in list(range(50)) + list(range(50, 0, -1))])
+    poll_events = window.poll_events
+    def stormy_poll_events():
+        poll_events()
+        for _ in range(events):
+            emit(*next(sizes))
+    window.poll_events = stormy_poll_events
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        window.next_frame()
+        draw()
+    elapsed = time.perf_counter() - start
+
+    del vbo, vao
+    window.terminate()
+    return window.frame, target_resizes[0], elapsed
+
+def main(iterations=200, events=20):
+    print("{} loop iterations, {} resize events each".format(iterations, events))
+    for name, coalesced in [('per event', False), ('coalesced', True)]:
+        frames, resizes, elapsed = storm(coalesced, iterations, events)
+        print("{:<12} {:6d} frames rendered   {:5d} render target resizes   {:8.1f} ms".format(
+            name, frames, resizes, elapsed * 1e3))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,60 @@
+'''
+Deleting buffers one by one against once per frame in bulk
+
+Every frame creates N small VBOs and drops them again, as a scene streaming
+meshes in and out would. Times the deletions
+    one by one  glDeleteBuffers(1, ...) for each buffer as it is dropped, as
+                VBO.__del__ used to
+    batched     the ResourceRegistry queue, deleted with one
+                glDeleteBuffers(n, ...) by swap_buffers
+and prints the registry's live counts at the end.
+
+usage: python benchmarks/resource_churn.py [buffers per frame] [frames]
+'''
+
+import common
+
+import sys
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl import state
+from learnopengl.buffers import VBO
+
+def main(count=1000, frames=50):
+    window = common.create_context()
+    window.frames = None
+    vertices = np.zeros(9, dtype=np.float32)
+
+    # created outside the timed part, only the deletions are compared
+    def one_by_one():
+        buffers = [VBO(vertices) for _ in range(count)]
+        def delete():
+            for vbo in buffers:
+                gl.glDeleteBuffers(1, np.array([vbo._vbo], dtype=np.uint32))
+                state.current.deleted_buffer(vbo._vbo)
+                # keep the registry from deleting it again
+                window.resources.live['buffer'].pop(vbo._vbo)
+                vbo._vbo = None
+        return delete
+
+    def batched():
+        buffers = [VBO(vertices) for _ in range(count)]
+        def delete():
+            for vbo in buffers:
+                vbo.delete()
+            window.resources.collect()
+        return delete
+
+    print("{} buffers per frame".format(count))
+    for name, setup in [('one by one', one_by_one), ('batched', batched)]:
+        times = []
+        for _ in range(frames):
+            delete = setup()
+            times += common.time_frames(delete, 1)
+        common.report(name, times)
+    print(window.resources.stats())
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
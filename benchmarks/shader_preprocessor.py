@@ -0,0 +1,135 @@
+'''
+Shader variants made by the preprocessor: all permutations, lazily, or warmed
+
+One vertex shader covers 6.8.1 (UPSIDE_DOWN), 6.8.2 (the offset, compiled in
+as the constant 0.3) and 6.8.3 (POSITION_AS_COLOR), with the colour output in
+an #include. Three switches make 8 permutations, of which a scene drawing the
+three 6.8 triangles uses 3:
+    eager       all 8 made up front
+    lazy        the 3 made by ShaderVariants.get() as the first frame needs them
+    manifest    the 3 the lazy run asked for, from its manifest, compiled as a
+                batch and warmed up by warm() with the scene's vertex array
+                before the first frame
+Prints the time to make the variants, the first frame drawing the 3, and
+what preprocessing one variant costs. Every run uses sources of its own, so
+none gets the stages or programs of another.
+
+usage: python benchmarks/shader_preprocessor.py [manifest file]
+'''
+
+import os
+
+os.environ.setdefault('MESA_SHADER_CACHE_DISABLE', 'true')
+
+import common
+
+import itertools
+import sys
+import tempfile
+import time
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.buffers import EBO, VAO, VBO
+from learnopengl.preprocessor import ShaderVariants
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+// run %d
+layout (location = 0) in vec3 aPos;
+layout (location = 1) in vec3 aColor;
+out vec3 ourColor;
+uniform float offset;
+void main()
+{
+#ifdef UPSIDE_DOWN
+    gl_Position = vec4(aPos.x + offset, -aPos.y, aPos.z, 1.0);
+#else
+    gl_Position = vec4(aPos.x + offset, aPos.y, aPos.z, 1.0);
+#endif
+#ifdef POSITION_AS_COLOR
+    ourColor = aPos;
+#else
+    ourColor = aColor;
+#endif
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+#include "color.glsl"
+"""
+
+includes = {'color.glsl': """
+out vec4 color;
+in vec3 ourColor;
+void main()
+{
+    color = vec4(ourColor, 1.0);
+}
+"""}
+
+# (defines, constants) of the variants the scene draws: 6.8.1, 6.8.2 and 6.8.3
+SCENE = [({'UPSIDE_DOWN': None}, {'offset': 0.0}),
+         ({}, {'offset': 0.3}),
+         ({'POSITION_AS_COLOR': None}, {'offset': 0.0})]
+
+def permutations():
+    for upside_down, position_as_color, offset in itertools.product([False, True], [False, True], [0.0, 0.3]):
+        defines = {}
+        if upside_down:
+            defines['UPSIDE_DOWN'] = None
+        if position_as_color:
+            defines['POSITION_AS_COLOR'] = None
+        yield defines, {'offset': offset}
+
+def main(manifest=None):
+    window = common.create_context()
+    window.frames = None
+    ShaderProgram.cache = None
+    vao = VAO()
+    buffers = (VBO(np.array([[0.5, -0.5, 0.0, 1.0, 0.0, 0.0],
+                             [-0.5, -0.5, 0.0, 0.0, 1.0, 0.0],
+                             [0.0, 0.5, 0.0, 0.0, 0.0, 1.0]], dtype=np.float32)),
+               EBO(np.array([0, 1, 2], dtype=np.uint32)))
+    gl.glVertexAttribPointer(0, 3, gl.GL_FLOAT, gl.GL_FALSE, 24, gl.ctypes.c_void_p(0))
+    gl.glEnableVertexAttribArray(0)
+    gl.glVertexAttribPointer(1, 3, gl.GL_FLOAT, gl.GL_FALSE, 24, gl.ctypes.c_void_p(12))
+    gl.glEnableVertexAttribArray(1)
+    manifest = manifest or os.path.join(tempfile.mkdtemp(), 'variants.json')
+
+    def first_frame(variants):
+        start = time.perf_counter()
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        vao.bind()
+        for defines, constants in SCENE:
+            variants.get(defines, constants).use()
+            gl.glDrawElements(gl.GL_TRIANGLES, 3, gl.GL_UNSIGNED_INT, None)
+        window.swap_buffers()
+        return time.perf_counter() - start
+
+    for run, name in enumerate(['eager', 'lazy', 'manifest']):
+        variants = ShaderVariants(vertexShaderSource % run, fragmentShaderSource, includes=includes)
+        start = time.perf_counter()
+        if name == 'eager':
+            for defines, constants in permutations():
+                variants.get(defines, constants).wait()
+        elif name == 'manifest':
+            variants.warm(manifest, vao)
+        made = time.perf_counter() - start
+        frame = first_frame(variants)
+        # lazy ones are made in the first frame
+        print("{:<10} {} variants made in {:8.1f} ms   first frame {:8.1f} ms".format(
+            name, len(variants.programs), made * 1e3, frame * 1e3))
+        if name == 'lazy':
+            variants.save_manifest(manifest)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        variants.sources(*SCENE[1])
+    print("preprocessing one variant {:8.1f} us".format((time.perf_counter() - start) / 100 * 1e6))
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
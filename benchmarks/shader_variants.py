@@ -0,0 +1,72 @@
+'''
+Start up time of many materials made from a few shader variants
+
+Builds [programs] ShaderPrograms from one vertex shader and [variants] fragment
+shaders, program i using variant i % variants, the way a scene gives many
+materials a few shaders. Stages and programs are shared within the context, so
+this compiles variants + 1 stages and links variants programs. For comparison
+the same number of programs is built again with a comment making every source
+unique, which is what each program cost before stages were shared. The program
+binary cache and Mesa's shader cache are off, so every compile is a real one.
+
+usage: python benchmarks/shader_variants.py [programs] [variants]
+'''
+
+import os
+
+os.environ.setdefault('MESA_SHADER_CACHE_DISABLE', 'true')
+
+import common
+
+import sys
+import time
+
+from learnopengl import resources
+from learnopengl import shader_cache
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 position;
+void main()
+{
+    gl_Position = vec4(position.x, position.y, position.z, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, %f, 0.2, 1.0);
+}
+"""
+
+def build(sources):
+    shaders = shader_cache.current()
+    before = shaders.stats()
+    start = time.perf_counter()
+    shaderPrograms = [ShaderProgram(vertex, fragment) for vertex, fragment in sources]
+    elapsed = time.perf_counter() - start
+    after = shaders.stats()
+    for shaderProgram in shaderPrograms:
+        shaderProgram.delete()
+    resources.current.collect()
+    return elapsed, after['compiled'] - before['compiled'], after['linked'] - before['linked']
+
+def main(programs=200, variants=8):
+    common.create_context()
+    ShaderProgram.cache = None
+
+    shared = [(vertexShaderSource, fragmentShaderSource % ((i % variants) / variants)) for i in range(programs)]
+    unique = [(vertex + "// program %d\n" % i, fragment + "// program %d\n" % i)
+              for i, (vertex, fragment) in enumerate(shared)]
+    print("{} programs, {} fragment shader variants".format(programs, variants))
+    for name, sources in [('shared stages', shared), ('unique sources', unique)]:
+        elapsed, compiled, linked = build(sources)
+        print("{:<16} {:8.1f} ms   {:4d} stages compiled   {:4d} programs linked".format(
+            name, elapsed * 1e3, compiled, linked))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
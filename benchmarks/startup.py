@@ -0,0 +1,43 @@
+'''
+Time from import to the first frame, in production and debug mode
+
+Runs a chapter script for one frame in a fresh interpreter, as a short-lived
+render job would, with LEARNOPENGL_DEBUG off and on, and reports the median of
+the stages window.startup measures (import, context, first_frame, total) and
+the wall time of the whole process, interpreter start and exit included.
+
+usage: python benchmarks/startup.py [runs] [script]
+'''
+
+import common
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+def run(script, debug):
+    env = dict(os.environ, LEARNOPENGL_FRAMES='1', LEARNOPENGL_STARTUP_REPORT='1',
+               LEARNOPENGL_DEBUG='1' if debug else '0')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, script], env=env, cwd=os.path.dirname(script),
+                            capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    stages = {stage: float(ms) for stage, ms in re.findall(r'(\w+) ([\d.]+) ms', result.stderr)}
+    stages['process'] = wall * 1e3
+    return stages
+
+def main(runs=10, script='Chapter6/6.5-Shaders.py'):
+    script = os.path.abspath(os.path.join(ROOT, script))
+    print("{}, {} runs, median ms".format(os.path.basename(script), runs))
+    for name, debug in [('production', False), ('debug', True)]:
+        results = [run(script, debug) for _ in range(runs)]
+        print("{:<12}".format(name) + "   ".join("{} {:6.1f}".format(stage, statistics.median(r[stage] for r in results))
+                                              for stage in results[0]))
+
+if __name__ == "__main__":
+    main(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]])
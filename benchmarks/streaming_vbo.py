@@ -0,0 +1,99 @@
+'''
+Vertices uploaded per second for geometry that changes every frame
+
+Each frame rewrites a vertex array of N points and draws them, through
+    bufferdata  glBufferData on a plain VBO, as the chapter scripts would
+    orphan      StreamingVBO orphaning the buffer every frame
+    mapped      StreamingVBO writing into a fenced ring of mapped regions
+and prints the vertices per second each manages, frames included. Mapped also
+prints how many writes had to wait on a fence.
+
+usage: python benchmarks/streaming_vbo.py [vertices] [frames]
+'''
+
+import common
+
+import sys
+import time
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.buffers import VAO, VBO, StreamingVBO
+from learnopengl.shader import ShaderProgram
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec2 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 0.0, 1.0);
+}
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+void main()
+{
+    color = vec4(1.0, 0.5, 0.2, 1.0);
+}
+"""
+
+def attribute(offset):
+    gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 8, gl.GLvoidp(offset))
+    gl.glEnableVertexAttribArray(0)
+
+def bufferdata(vertices):
+    vao = VAO()
+    vbo = VBO(vertices)
+    attribute(0)
+
+    def frame():
+        vbo.bind()
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, vertices, gl.GL_STATIC_DRAW)
+        vao.bind()
+        gl.glDrawArrays(gl.GL_POINTS, 0, len(vertices))
+    return frame, None
+
+def streaming(vertices, orphan):
+    vao = VAO()
+    vbo = StreamingVBO(vertices.nbytes, orphan=orphan)
+    attribute(0)
+
+    def frame():
+        offset = vbo.write(vertices)
+        vao.bind()
+        # one attribute pointer for the whole ring, the region is picked with first
+        gl.glDrawArrays(gl.GL_POINTS, offset // 8, len(vertices))
+        vbo.fence()
+    return frame, vbo
+
+def main(count=100000, frames=200):
+    common.create_context()
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+    shaderProgram.use()
+
+    rng = np.random.default_rng(0)
+    vertices = rng.uniform(-1.0, 1.0, (count, 2)).astype(np.float32)
+
+    print("{} vertices per frame, {} frames".format(count, frames))
+    for name, setup in [('bufferdata', bufferdata),
+                        ('orphan', lambda vertices: streaming(vertices, True)),
+                        ('mapped', lambda vertices: streaming(vertices, False))]:
+        frame, vbo = setup(vertices)
+        # the vertices change every frame, like the geometry being streamed
+        def changed():
+            vertices[:, 1] *= -1.0
+            frame()
+        common.time_frames(changed, 10)
+
+        start = time.perf_counter()
+        common.time_frames(changed, frames)
+        elapsed = time.perf_counter() - start
+        print("{:<12} {:8.2f} M vertices/s   {:7.3f} ms/frame{}".format(
+            name, count * frames / elapsed / 1e6, elapsed / frames * 1e3,
+            "   {} stalls".format(vbo.stalls) if vbo is not None and not vbo.orphan else ""))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
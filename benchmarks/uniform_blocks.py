@@ -0,0 +1,87 @@
+'''
+Per-frame data for several programs: a uniform per program against one uniform buffer
+
+Every frame the colour changes, as greenValue does in the Chapter6 scripts, and
+each of N programs needs it:
+    uniform per program  use() and set("ourColor", ...) on each program
+    uniform buffer       write the colour to one UniformBuffer, flush() once,
+                         then use() each program
+
+usage: python benchmarks/uniform_blocks.py [programs] [frames]
+'''
+
+import common
+
+import sys
+
+import numpy as np
+
+from learnopengl.shader import ShaderProgram
+from learnopengl.uniform_buffer import UniformBuffer, std140
+
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+}
+"""
+
+uniformFragmentShaderSource = """
+#version 330 core
+out vec4 color;
+uniform vec4 ourColor;
+void main()
+{
+    color = ourColor * %d.0;
+}
+"""
+
+blockFragmentShaderSource = """
+#version 330 core
+out vec4 color;
+layout (std140) uniform Frame
+{
+    float time;
+    vec4 ourColor;
+};
+void main()
+{
+    color = ourColor * %d.0;
+}
+"""
+
+def main(programs=10, frames=1000):
+    common.create_context()
+    # the factor keeps the programs apart in the program cache
+    uniformPrograms = [ShaderProgram(vertexShaderSource, uniformFragmentShaderSource % i) for i in range(programs)]
+    blockPrograms = [ShaderProgram(vertexShaderSource, blockFragmentShaderSource % i) for i in range(programs)]
+
+    frame = std140([('time', 'float'), ('ourColor', 'vec4')])
+    ubo = UniformBuffer(frame, binding=0)
+    for shaderProgram in blockPrograms:
+        shaderProgram.bind_block('Frame', ubo)
+
+    times = iter(np.arange(2 * frames) / 60.0)
+
+    def uniform_per_program():
+        greenValue = np.sin(next(times)) / 2.0 + 0.5
+        for shaderProgram in uniformPrograms:
+            shaderProgram.use()
+            shaderProgram.set("ourColor", 0.0, greenValue, 0.0, 1.0)
+
+    def uniform_buffer():
+        timeValue = next(times)
+        ubo['time'] = timeValue
+        ubo['ourColor'] = (0.0, np.sin(timeValue) / 2.0 + 0.5, 0.0, 1.0)
+        ubo.flush()
+        for shaderProgram in blockPrograms:
+            shaderProgram.use()
+
+    print("{} programs".format(programs))
+    common.report("uniform per program", common.time_frames(uniform_per_program, frames))
+    common.report("uniform buffer", common.time_frames(uniform_buffer, frames))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,69 @@
+'''
+Per-frame CPU time of the chapter 6 uniform updates
+
+before: glGetUniformLocation + glUniform* every frame, as the scripts used to do
+after:  ShaderProgram.set with the locations cached at link time
+
+usage: python benchmarks/uniform_locations.py [frames]
+'''
+
+import common
+
+import sys
+
+from OpenGL import GL as gl
+import numpy as np
+
+from learnopengl.shader import ShaderProgram
+
+# 6.8.2's shaders, with the 6.4 colour uniform so both uniforms are active
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+uniform float offset;
+void main()
+{
+   gl_Position = vec4(aPos.x + offset, aPos.y, aPos.z, 1.0);
+};
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+uniform vec4 ourColor;
+void main()
+{
+    color = ourColor;
+}
+"""
+
+def main(frames=10000):
+    common.create_context()
+
+    shaderProgram = ShaderProgram(vertexShaderSource, fragmentShaderSource)
+
+    def before():
+        shaderProgram.use()
+        greenValue = np.sin(0.5) / 2.0 + 0.5
+        vertexColorLocation = gl.glGetUniformLocation(shaderProgram.Program, "ourColor")
+        vertexOffsetLocation = gl.glGetUniformLocation(shaderProgram.Program, "offset")
+        gl.glUniform4f(vertexColorLocation, 0.0, greenValue, 0.0, 1.0)
+        gl.glUniform1f(vertexOffsetLocation, 0.3)
+
+    def after():
+        shaderProgram.use()
+        greenValue = np.sin(0.5) / 2.0 + 0.5
+        shaderProgram.set("ourColor", 0.0, greenValue, 0.0, 1.0)
+        shaderProgram.set("offset", 0.3)
+
+    # warm up PyOpenGL's lazily loaded entry points
+    common.time_frames(before, 100)
+    common.time_frames(after, 100)
+
+    common.report("glGetUniformLocation", common.time_frames(before, frames))
+    common.report("ShaderProgram.set", common.time_frames(after, frames))
+
+    return 0
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
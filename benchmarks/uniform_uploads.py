@@ -0,0 +1,92 @@
+'''
+Uniform uploads issued, skipped and dropped per frame
+
+Runs the draw() uniform updates of 6.4 (colour changes every frame) and 6.8.2
+(constant offset, plus the ourColor update its shaders have no uniform for)
+and prints ShaderProgram.uploads for each frame.
+
+usage: python benchmarks/uniform_uploads.py [frames]
+'''
+
+import common
+
+import sys
+
+import numpy as np
+
+from learnopengl.shader import ShaderProgram
+
+# 6.4
+vertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+void main()
+{
+   gl_Position = vec4(aPos, 1.0);
+};
+"""
+
+fragmentShaderSource = """
+#version 330 core
+out vec4 color;
+uniform vec4 ourColor;
+void main()
+{
+    color = ourColor;
+}
+"""
+
+# 6.8.2
+offsetVertexShaderSource = """
+#version 330 core
+layout (location = 0) in vec3 aPos;
+layout (location = 1) in vec3 aColor;
+out vec3 ourColor;
+uniform float offset;
+void main()
+{
+   gl_Position = vec4(aPos.x + offset, aPos.y, aPos.z, 1.0);
+   ourColor = aColor;
+};
+"""
+
+offsetFragmentShaderSource = """
+#version 330 core
+out vec4 color;
+in vec3 ourColor;
+void main()
+{
+    color = vec4(ourColor, 1.0);
+}
+"""
+
+def run(name, shaderProgram, frames):
+    totals = np.zeros(3, dtype=np.int64)
+    times = []
+
+    for frame in range(frames):
+        def draw():
+            shaderProgram.use()
+            greenValue = np.sin(frame / 60.0) / 2.0 + 0.5
+            shaderProgram.set("ourColor", 0.0, greenValue, 0.0, 1.0)
+            shaderProgram.set("offset", 0.3)
+
+        times += common.time_frames(draw, 1)
+        counts = shaderProgram.uploads.reset()
+        totals += counts
+        if frame < 3:
+            print("{} frame {}: issued {} skipped {} dropped {}".format(name, frame, *counts))
+
+    print("{} per frame: issued {:.2f} skipped {:.2f} dropped {:.2f}".format(name, *(totals / frames)))
+    common.report(name, times)
+
+def main(frames=1000):
+    common.create_context()
+
+    run("6.4", ShaderProgram(vertexShaderSource, fragmentShaderSource), frames)
+    run("6.8.2", ShaderProgram(offsetVertexShaderSource, offsetFragmentShaderSource), frames)
+
+    return 0
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
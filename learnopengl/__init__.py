@@ -0,0 +1,47 @@
+'''
+Helper classes shared by the chapter scripts
+
+Mirrors the includes/learnopengl directory of https://learnopengl.com/ so the
+chapters can reuse one shader class instead of each carrying its own copy.
+
+Importing the package configures PyOpenGL, which only reads its flags when
+OpenGL.GL is first imported. By default it runs in production mode: no
+glGetError after every call, no logging of failed calls, no check for a current
+context and no array size checks, so each GL call costs less. Set
+$LEARNOPENGL_DEBUG=1 for the error, context and array size checks, along with
+the state cache checks of state.py. A PYOPENGL_<FLAG> environment variable
+still wins over either mode.
+'''
+
+import os
+import time
+
+# when the package was first imported, startup times in window.py count from here
+IMPORTED = time.perf_counter()
+
+DEBUG = os.environ.get('LEARNOPENGL_DEBUG') == '1'
+
+# window/context backend, see window.py
+BACKEND = os.environ.get('LEARNOPENGL_BACKEND', 'glfw')
+
+# PyOpenGL picks its platform the first time OpenGL is imported, so the headless
+# backends have to be selected here, before any of the modules import it
+if BACKEND in ('egl', 'osmesa'):
+    os.environ.setdefault('PYOPENGL_PLATFORM', BACKEND)
+
+# importing the OpenGL package alone loads no GL functions yet
+import OpenGL
+
+# flag -> value in debug mode, production turns them all off. ERROR_LOGGING
+# stays off in debug too, it logs the errors PyOpenGL causes and handles itself,
+# like querying GL_EXTENSIONS from a core profile context
+_DEBUG_FLAGS = {
+    'ERROR_CHECKING': True,
+    'ERROR_LOGGING': False,
+    'CONTEXT_CHECKING': True,
+    'ARRAY_SIZE_CHECKING': True,
+}
+
+for flag, value in _DEBUG_FLAGS.items():
+    if 'PYOPENGL_' + flag not in os.environ:
+        setattr(OpenGL, flag, DEBUG and value)
@@ -0,0 +1,294 @@
+'''
+Mesh storage shared by many meshes
+
+A MeshArena keeps the vertices and indices of many meshes in one vertex buffer
+and one element buffer behind one vertex array, so drawing another mesh needs
+no bind. add() finds room for a mesh in each buffer with a first fit free list
+and returns a Mesh holding its base vertex and first index, which is what
+glDrawElementsBaseVertex takes: indices stay relative to the mesh's own
+vertices wherever those end up.
+
+When a free list has no block big enough the arena is rebuilt. Live meshes are
+copied next to each other into new buffers, twice as large as before if
+compacting alone would not make room, and their Mesh handles are updated.
+
+A Batch draws many meshes of one arena with a single
+glMultiDrawElementsBaseVertex, instead of one call per mesh from Python.
+'''
+
+import bisect
+from operator import attrgetter
+
+from OpenGL import GL as gl
+import numpy as np
+
+from .buffers import EBO, VAO, VBO, vertex_attributes
+
+INDEX_SIZE = np.dtype(np.uint32).itemsize
+
+class FreeList:
+    '''First fit allocator of ranges in [0, capacity), freed neighbours are merged'''
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # free blocks, sorted by offset
+        self.offsets = [0] if capacity else []
+        self.sizes = [capacity] if capacity else []
+
+    def allocate(self, size):
+        '''Returns the offset of size free units, None if no free block is big enough'''
+        if size == 0:
+            return 0
+        for i, free in enumerate(self.sizes):
+            if free >= size:
+                offset = self.offsets[i]
+                if free == size:
+                    del self.offsets[i], self.sizes[i]
+                else:
+                    self.offsets[i] += size
+                    self.sizes[i] -= size
+                return offset
+        return None
+
+    def free(self, offset, size):
+        if size == 0:
+            return
+        i = bisect.bisect(self.offsets, offset)
+        if i < len(self.offsets) and offset + size == self.offsets[i]:
+            size += self.sizes[i]
+            del self.offsets[i], self.sizes[i]
+        if i > 0 and self.offsets[i - 1] + self.sizes[i - 1] == offset:
+            self.sizes[i - 1] += size
+        else:
+            self.offsets.insert(i, offset)
+            self.sizes.insert(i, size)
+
+    def available(self):
+        return sum(self.sizes)
+
+    def largest(self):
+        return max(self.sizes, default=0)
+
+class Mesh:
+    '''Where one mesh lives in its arena, kept up to date when the arena moves it'''
+    __slots__ = ('arena', 'base_vertex', 'vertex_count', 'first_index', 'index_count')
+
+    def __init__(self, arena, base_vertex, vertex_count, first_index, index_count):
+        self.arena = arena
+        self.base_vertex = base_vertex
+        self.vertex_count = vertex_count
+        self.first_index = first_index
+        self.index_count = index_count
+
+    def draw(self, mode=gl.GL_TRIANGLES):
+        self.arena.draw(self, mode)
+
+    def free(self):
+        if self.arena is not None:
+            self.arena.free(self)
+
+class MeshArena:
+    '''
+    Vertex and element buffers for many meshes whose vertices all have
+    vertex_format, a numpy dtype. Each field of a structured dtype is an
+    attribute, at locations 0, 1, ... in field order, e.g.
+        np.dtype([('aPos', np.float32, 3), ('aColor', np.float32, 3)])
+    '''
+
+    def __init__(self, vertex_format, vertex_capacity=65536, index_capacity=196608):
+        self.vertex_format = np.dtype(vertex_format)
+        self.meshes = set()
+        self.rebuilds = 0
+        self.generation = 0     # bumped whenever meshes come, go or move, for Batch to notice
+
+        self.vao = VAO()
+        self.vao.label("MeshArena")
+        self._vertices = FreeList(vertex_capacity)
+        self._indices = FreeList(index_capacity)
+        self.vbo = VBO(np.empty(vertex_capacity * self.vertex_format.itemsize, np.uint8), gl.GL_DYNAMIC_DRAW)
+        self.ebo = EBO(np.empty(index_capacity * INDEX_SIZE, np.uint8), gl.GL_DYNAMIC_DRAW)
+        self._label_buffers()
+        self._attributes()
+
+    def add(self, vertices, indices):
+        '''
+        Copies a mesh into the arena and returns its Mesh. vertices are rows of
+        vertex_format or anything with the same bytes, like the flat float32
+        arrays of the chapter scripts, indices count from the mesh's first vertex
+        '''
+        vertices = np.ascontiguousarray(vertices).reshape(-1).view(np.uint8)
+        indices = np.ascontiguousarray(indices, dtype=np.uint32).reshape(-1)
+        if vertices.nbytes % self.vertex_format.itemsize:
+            raise Exception("ERROR::ARENA::VERTEX_FORMAT\n{} bytes are not whole {} byte vertices".format(
+                vertices.nbytes, self.vertex_format.itemsize))
+        vertex_count = vertices.nbytes // self.vertex_format.itemsize
+        if indices.size and indices.max() >= vertex_count:
+            raise Exception("ERROR::ARENA::INDEX_OUT_OF_RANGE\nindex {} of a mesh with {} vertices".format(
+                indices.max(), vertex_count))
+
+        base_vertex, first_index = self._allocate(vertex_count, indices.size)
+        if base_vertex is None:
+            self._make_room(vertex_count, indices.size)
+            base_vertex, first_index = self._allocate(vertex_count, indices.size)
+
+        mesh = Mesh(self, base_vertex, vertex_count, first_index, indices.size)
+        self.meshes.add(mesh)
+        self.generation += 1
+        if vertex_count:
+            self.vbo.update(vertices, base_vertex * self.vertex_format.itemsize)
+        if indices.size:
+            # the element buffer only binds with the arena's vertex array
+            self.vao.bind()
+            self.ebo.update(indices, first_index * INDEX_SIZE)
+        return mesh
+
+    def free(self, mesh):
+        '''Gives the mesh's room back, freeing it again does nothing'''
+        if mesh.arena is None:
+            return
+        if mesh.arena is not self:
+            raise Exception("ERROR::ARENA::FOREIGN_MESH\nthe mesh belongs to another arena")
+        self.meshes.remove(mesh)
+        self._vertices.free(mesh.base_vertex, mesh.vertex_count)
+        self._indices.free(mesh.first_index, mesh.index_count)
+        mesh.arena = None
+        self.generation += 1
+
+    def draw(self, mesh, mode=gl.GL_TRIANGLES):
+        self.vao.bind()
+        gl.glDrawElementsBaseVertex(mode, mesh.index_count, gl.GL_UNSIGNED_INT,
+                                    gl.GLvoidp(mesh.first_index * INDEX_SIZE), mesh.base_vertex)
+
+    def defragment(self):
+        '''Moves all meshes next to each other, leaving one free block at the end of each buffer'''
+        self._rebuild(self._vertices.capacity, self._indices.capacity)
+
+    def stats(self):
+        return {'meshes': len(self.meshes),
+                'vertices': self._vertices.capacity - self._vertices.available(),
+                'vertex_capacity': self._vertices.capacity,
+                'vertex_free_blocks': len(self._vertices.sizes),
+                'indices': self._indices.capacity - self._indices.available(),
+                'index_capacity': self._indices.capacity,
+                'index_free_blocks': len(self._indices.sizes),
+                'rebuilds': self.rebuilds}
+
+    def _allocate(self, vertex_count, index_count):
+        base_vertex = self._vertices.allocate(vertex_count)
+        first_index = self._indices.allocate(index_count)
+        if base_vertex is None or first_index is None:
+            if base_vertex is not None:
+                self._vertices.free(base_vertex, vertex_count)
+            if first_index is not None:
+                self._indices.free(first_index, index_count)
+            return None, None
+        return base_vertex, first_index
+
+    def _make_room(self, vertex_count, index_count):
+        vertex_capacity, index_capacity = self._vertices.capacity, self._indices.capacity
+        vertices_needed = vertex_capacity - self._vertices.available() + vertex_count
+        indices_needed = index_capacity - self._indices.available() + index_count
+        while vertex_capacity < vertices_needed:
+            vertex_capacity = max(2 * vertex_capacity, 1)
+        while index_capacity < indices_needed:
+            index_capacity = max(2 * index_capacity, 1)
+        self._rebuild(vertex_capacity, index_capacity)
+
+    def _rebuild(self, vertex_capacity, index_capacity):
+        self.vao.bind()
+        vbo = VBO(np.empty(vertex_capacity * self.vertex_format.itemsize, np.uint8), gl.GL_DYNAMIC_DRAW)
+        # replaces the old element buffer in the vertex array
+        ebo = EBO(np.empty(index_capacity * INDEX_SIZE, np.uint8), gl.GL_DYNAMIC_DRAW)
+
+        vertices = _compact(self.meshes, 'base_vertex', 'vertex_count',
+                            self.vbo, vbo, self.vertex_format.itemsize)
+        indices = _compact(self.meshes, 'first_index', 'index_count',
+                           self.ebo, ebo, INDEX_SIZE)
+
+        self.vbo, self.ebo = vbo, ebo
+        self._label_buffers()
+        self._vertices = FreeList(vertex_capacity)
+        self._vertices.allocate(vertices)
+        self._indices = FreeList(index_capacity)
+        self._indices.allocate(indices)
+        self._attributes()
+        self.rebuilds += 1
+        self.generation += 1
+
+    def _attributes(self):
+        # the vertex array keeps pointing at the old vertex buffer until told otherwise
+        self.vao.bind()
+        self.vbo.bind()
+        vertex_attributes(self.vertex_format)
+
+    def _label_buffers(self):
+        self.vbo.label("MeshArena vertices")
+        self.ebo.label("MeshArena indices")
+
+def _compact(meshes, offset_name, count_name, source, target, unit_size):
+    '''Copies each mesh's range from source to the start of target, one after the other, returns the units used'''
+    offset_of, count_of = attrgetter(offset_name), attrgetter(count_name)
+    runs = []   # [read, write, count], ranges next to each other in source move together
+    used = 0
+    for mesh in sorted(meshes, key=offset_of):
+        start, count = offset_of(mesh), count_of(mesh)
+        if count == 0:
+            setattr(mesh, offset_name, 0)
+            continue
+        if runs and runs[-1][0] + runs[-1][2] == start:
+            runs[-1][2] += count
+        else:
+            runs.append([start, used, count])
+        setattr(mesh, offset_name, used)
+        used += count
+    for read, write, count in runs:
+        source.copy_to(target, count * unit_size, read * unit_size, write * unit_size)
+    return used
+
+class Batch:
+    '''
+    Meshes of one arena drawn with a single glMultiDrawElementsBaseVertex. The
+    count, offset and base vertex arrays are built once and rebuilt only when
+    meshes are added to or removed from the batch or the arena; drawing a batch
+    holding a freed mesh raises
+    '''
+
+    def __init__(self, arena, meshes=()):
+        self.arena = arena
+        self.meshes = list(meshes)
+        self._arrays = None
+        self._generation = None
+
+    def add(self, mesh):
+        self.meshes.append(mesh)
+        self._arrays = None
+
+    def remove(self, mesh):
+        self.meshes.remove(mesh)
+        self._arrays = None
+
+    def clear(self):
+        self.meshes = []
+        self._arrays = None
+
+    def draw(self, mode=gl.GL_TRIANGLES):
+        if not self.meshes:
+            return
+        if self._arrays is None or self._generation != self.arena.generation:
+            self._arrays = self._build()
+            self._generation = self.arena.generation
+        counts, offsets, base_vertices = self._arrays
+        self.arena.vao.bind()
+        gl.glMultiDrawElementsBaseVertex(mode, counts, gl.GL_UNSIGNED_INT, offsets, len(counts), base_vertices)
+
+    def _build(self):
+        if any(mesh.arena is None for mesh in self.meshes):
+            raise Exception("ERROR::ARENA::FREED_MESH\nremove meshes from their batches before freeing them")
+        if any(mesh.arena is not self.arena for mesh in self.meshes):
+            raise Exception("ERROR::ARENA::FOREIGN_MESH\nbatched meshes must stay in the batch's arena")
+        count = len(self.meshes)
+        counts = np.fromiter((mesh.index_count for mesh in self.meshes), np.int32, count)
+        # byte offsets into the element buffer, passed as an array of pointers
+        offsets = np.fromiter((mesh.first_index for mesh in self.meshes), np.uintp, count) * INDEX_SIZE
+        base_vertices = np.fromiter((mesh.base_vertex for mesh in self.meshes), np.int32, count)
+        return counts, offsets, base_vertices
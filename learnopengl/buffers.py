@@ -0,0 +1,315 @@
+'''
+Vertex buffer, element buffer and vertex array classes used from chapter 6 on
+
+Binding goes through the state cache in state.py, so binding what is already
+bound costs no GL call. Objects are registered with the context's
+ResourceRegistry, see resources.py, and deleted through it: delete() or
+dropping the object queues the deletion for the end of the frame.
+
+StreamingVBO is for vertices that change every frame: it keeps a ring of
+regions in one buffer and writes each frame into the next region, so the GPU
+can still be reading the previous frames while the CPU writes.
+
+A VBO created with keep=True keeps a host copy of its data. Rows assigned with
+vbo[rows] = values are remembered, and flush() uploads them with as few
+glBufferSubData calls as the edited ranges allow.
+
+vertex_attributes() sets up the attribute pointers for the fields of a numpy
+dtype, for vertices and per-instance data alike.
+
+While a debug layer is on, see debug.py, buffers and vertex arrays are labelled
+with their class name, label() gives them a better one.
+'''
+
+import ctypes
+
+from OpenGL import GL as gl
+import numpy as np
+
+from . import debug
+from . import resources
+from . import state
+
+class VBO:
+    __slots__ = ('data', '_dirty', '_registry', '_vbo')
+
+    _buffer_type = gl.GL_ARRAY_BUFFER
+
+    # edited ranges less than this many bytes apart are uploaded as one, a
+    # glBufferSubData call from Python costs about as much as copying that much
+    MERGE_GAP = 65536
+
+    def __init__(self, data, usage=gl.GL_STATIC_DRAW, keep=False):
+        self.data = None    # the host copy, if kept
+        if keep:
+            self.data = np.array(data, order='C')
+            data = self.data
+        self._dirty = []    # (starts, stops) byte offsets of edited rows, not uploaded yet
+
+        self._registry = resources.current
+        self._vbo = self._registry.generate('buffer')
+        self.bind()
+        gl.glBufferData(self._buffer_type, data, usage)
+        self._registry.created('buffer', self._vbo, np.asarray(data).nbytes)
+        self.label(type(self).__name__)
+
+    def __del__(self):
+        self.delete()
+
+    def delete(self):
+        '''Queues the buffer for deletion at the end of the frame, the VBO cannot be used after'''
+        # no _vbo when __init__ failed early
+        if getattr(self, '_vbo', None) is not None:
+            self._registry.release('buffer', self._vbo)
+            self._vbo = None
+
+    def label(self, text):
+        '''Names the buffer in debug messages and tools'''
+        debug.label(gl.GL_BUFFER, self._vbo, text)
+
+    def bind(self):
+        state.bind_buffer(self._buffer_type, self._vbo)
+
+    def unbind(self):
+        state.bind_buffer(self._buffer_type, 0)
+
+    def update(self, data, offset=0):
+        '''Uploads data to the buffer at byte offset right away'''
+        data = np.ascontiguousarray(data)
+        if self.data is not None:
+            self._bytes()[offset:offset + data.nbytes] = data.reshape(-1).view(np.uint8)
+        self.bind()
+        gl.glBufferSubData(self._buffer_type, offset, data.nbytes, data)
+
+    def __setitem__(self, rows, values):
+        '''Edits rows of the host copy, they reach the buffer with the next flush()'''
+        if self.data is None:
+            raise Exception("ERROR::BUFFER::NO_HOST_COPY\nCreate the VBO with keep=True to edit it in place")
+        mask = rows[0] if isinstance(rows, tuple) and rows else rows
+        if isinstance(mask, np.ndarray) and mask.dtype == bool and mask.shape != self.data.shape[:mask.ndim]:
+            raise Exception("ERROR::BUFFER::MASK_SHAPE\nMask of shape {} for data of shape {}".format(
+                mask.shape, self.data.shape))
+        self.data[rows] = values
+
+        count = len(self.data)
+        if isinstance(rows, tuple):
+            # only the first index picks rows, the rest stays within them
+            rows = rows[0] if rows else Ellipsis
+        if rows is Ellipsis:
+            first, last = np.array([0]), np.array([count])
+        elif isinstance(rows, slice):
+            touched = range(*rows.indices(count))
+            if not touched:
+                return
+            # a stepped slice counts as its whole span
+            first, last = np.array([min(touched)]), np.array([max(touched) + 1])
+        else:
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                # a mask over whole elements, not only rows, picks a row with any of them
+                rows = np.flatnonzero(rows.reshape(count, -1).any(axis=1))
+            else:
+                rows = np.unique(rows.reshape(-1) % count)
+            if not rows.size:
+                return
+            # runs of consecutive rows
+            breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+            first = rows[np.r_[0, breaks]]
+            last = rows[np.r_[breaks - 1, rows.size - 1]] + 1
+
+        row_bytes = self.data.strides[0]
+        self._dirty.append((first * row_bytes, last * row_bytes))
+
+    def flush(self):
+        '''Uploads the rows edited since the last flush, returns the number of glBufferSubData calls'''
+        if self.data is None or not self._dirty:
+            return 0
+        starts = np.concatenate([starts for starts, _ in self._dirty])
+        stops = np.concatenate([stops for _, stops in self._dirty])
+        self._dirty = []
+
+        order = np.argsort(starts, kind='stable')
+        starts, stops = starts[order], stops[order]
+        reach = np.maximum.accumulate(stops)
+        # a range starts a new upload when it begins past everything before it, plus the gap
+        new = np.flatnonzero(starts[1:] > reach[:-1] + self.MERGE_GAP) + 1
+        firsts = starts[np.r_[0, new]]
+        lasts = reach[np.r_[new - 1, starts.size - 1]]
+
+        self.bind()
+        data = self._bytes()
+        for start, stop in zip(firsts.tolist(), lasts.tolist()):
+            gl.glBufferSubData(self._buffer_type, start, stop - start, data[start:stop])
+        return len(firsts)
+
+    def copy_to(self, other, size, read_offset=0, write_offset=0):
+        '''Copies size bytes from this buffer into other on the GPU, host copies are left as they are'''
+        state.bind_buffer(gl.GL_COPY_READ_BUFFER, self._vbo)
+        state.bind_buffer(gl.GL_COPY_WRITE_BUFFER, other._vbo)
+        gl.glCopyBufferSubData(gl.GL_COPY_READ_BUFFER, gl.GL_COPY_WRITE_BUFFER, read_offset, write_offset, size)
+
+    def _bytes(self):
+        return self.data.reshape(-1).view(np.uint8)
+
+class StreamingVBO(VBO):
+    '''
+    Ring of region_size byte regions written with glMapBufferRange, one region
+    per write(). Each region is fenced once drawn from and write() waits on the
+    fence before reusing it. With orphan=True, or if mapping fails, every write
+    orphans the whole buffer with glBufferData instead and writes to its start.
+    '''
+
+    __slots__ = ('region_size', 'regions', 'orphan', 'region', 'stalls', '_fences')
+
+    # nanoseconds per glClientWaitSync, waits repeat until the fence is signalled
+    WAIT_TIMEOUT = 1000000
+
+    def __init__(self, region_size, regions=3, orphan=False):
+        self.data = None
+        self._dirty = []
+        self.region_size = region_size
+        self.regions = regions
+        self.orphan = orphan
+        self.region = regions - 1   # the first write goes to region 0
+        self.stalls = 0             # writes that had to wait for the GPU
+        self._fences = [None] * regions
+
+        self._registry = resources.current
+        self._vbo = self._registry.generate('buffer')
+        self.bind()
+        gl.glBufferData(self._buffer_type, region_size * regions, None, gl.GL_STREAM_DRAW)
+        self._registry.created('buffer', self._vbo, region_size * regions)
+        self.label(type(self).__name__)
+
+    def delete(self):
+        if getattr(self, '_vbo', None) is not None:
+            for fence in self._fences:
+                if fence is not None:
+                    self._registry.release('sync', fence)
+            self._fences = [None] * self.regions
+        super().delete()
+
+    def write(self, data):
+        '''Uploads data into the next region and returns its byte offset in the buffer'''
+        data = np.ascontiguousarray(data)
+        if data.nbytes > self.region_size:
+            raise Exception("ERROR::BUFFER::STREAM_OVERFLOW\n{} bytes do not fit a {} byte region".format(
+                data.nbytes, self.region_size))
+        self.bind()
+
+        if not self.orphan:
+            region = (self.region + 1) % self.regions
+            self._wait(region)
+            offset = region * self.region_size
+            pointer = gl.glMapBufferRange(self._buffer_type, offset, data.nbytes,
+                                          gl.GL_MAP_WRITE_BIT | gl.GL_MAP_UNSYNCHRONIZED_BIT |
+                                          gl.GL_MAP_INVALIDATE_RANGE_BIT)
+            if pointer:
+                ctypes.memmove(pointer, data.ctypes.data, data.nbytes)
+                # unmapping fails if the store was lost meanwhile, the region then holds garbage for one frame
+                gl.glUnmapBuffer(self._buffer_type)
+                self.region = region
+                return offset
+            # no mapping on this driver, stay with orphaning from now on
+            self.orphan = True
+            self._clear_fences()
+
+        # a fresh store, the old one lives on until the GPU is done with it
+        gl.glBufferData(self._buffer_type, self.region_size * self.regions, None, gl.GL_STREAM_DRAW)
+        gl.glBufferSubData(self._buffer_type, 0, data.nbytes, data)
+        self.region = 0
+        return 0
+
+    def fence(self):
+        '''Call after the draw calls reading the region last written'''
+        if self.orphan:
+            return
+        if self._fences[self.region] is not None:
+            gl.glDeleteSync(self._fences[self.region])
+        self._fences[self.region] = gl.glFenceSync(gl.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    def _wait(self, region):
+        fence = self._fences[region]
+        if fence is None:
+            return
+        status = gl.glClientWaitSync(fence, 0, 0)
+        if status == gl.GL_TIMEOUT_EXPIRED:
+            self.stalls += 1
+            # the first wait flushes, else the fence may never reach the GPU
+            flags = gl.GL_SYNC_FLUSH_COMMANDS_BIT
+            while status == gl.GL_TIMEOUT_EXPIRED:
+                status = gl.glClientWaitSync(fence, flags, self.WAIT_TIMEOUT)
+                flags = 0
+        if status == gl.GL_WAIT_FAILED:
+            raise Exception("ERROR::BUFFER::FENCE_WAIT_FAILED")
+        gl.glDeleteSync(fence)
+        self._fences[region] = None
+
+    def _clear_fences(self):
+        for region, fence in enumerate(self._fences):
+            if fence is not None:
+                gl.glDeleteSync(fence)
+                self._fences[region] = None
+
+class EBO(VBO):
+    __slots__ = ()
+
+    _buffer_type = gl.GL_ELEMENT_ARRAY_BUFFER
+
+class VAO:
+    __slots__ = ('instances', '_registry', '_vao')
+
+    def __init__(self):
+        self.instances = None   # the InstanceBuffer whose attributes the vertex array reads, see instancing.py
+        self._registry = resources.current
+        self._vao = self._registry.generate('vertex array')
+        self.bind()
+        self._registry.created('vertex array', self._vao)
+        self.label(type(self).__name__)
+
+    def __del__(self):
+        self.delete()
+
+    def delete(self):
+        '''Queues the vertex array for deletion at the end of the frame'''
+        if getattr(self, '_vao', None) is not None:
+            self._registry.release('vertex array', self._vao)
+            self._vao = None
+
+    def label(self, text):
+        '''Names the vertex array in debug messages and tools'''
+        debug.label(gl.GL_VERTEX_ARRAY, self._vao, text)
+
+    def bind(self):
+        state.bind_vertex_array(self._vao)
+
+    def unbind(self):
+        state.bind_vertex_array(0)
+
+def vertex_attributes(vertex_format, location=0, divisor=0):
+    '''
+    Points attributes location, location + 1, ... of the bound vertex array at
+    the fields of vertex_format, a numpy dtype, in the bound array buffer. A
+    dtype without fields is a single attribute. divisor 1 makes them advance
+    once per instance instead of once per vertex
+    '''
+    vertex_format = np.dtype(vertex_format)
+    if vertex_format.names is None:
+        fields = [(vertex_format, 0)]
+    else:
+        fields = [vertex_format.fields[name][:2] for name in vertex_format.names]
+    for location, (field, offset) in enumerate(fields, location):
+        components = int(np.prod(field.shape))
+        if components > 4:
+            raise Exception("ERROR::BUFFER::VERTEX_FORMAT\nan attribute has at most 4 components, not " + str(components))
+        if field.base == np.float32:
+            gl.glVertexAttribPointer(location, components, gl.GL_FLOAT, gl.GL_FALSE,
+                                     vertex_format.itemsize, gl.GLvoidp(offset))
+        elif field.base in (np.int32, np.uint32):
+            gl.glVertexAttribIPointer(location, components,
+                                      gl.GL_INT if field.base == np.int32 else gl.GL_UNSIGNED_INT,
+                                      vertex_format.itemsize, gl.GLvoidp(offset))
+        else:
+            raise Exception("ERROR::BUFFER::VERTEX_FORMAT\nno attribute type for " + str(field.base))
+        gl.glEnableVertexAttribArray(location)
+        gl.glVertexAttribDivisor(location, divisor)
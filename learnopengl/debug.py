@@ -0,0 +1,161 @@
+'''
+Driver messages through KHR_debug
+
+With PyOpenGL's per-call error checks off, see __init__.py, a failing call goes
+unnoticed. A DebugLayer registers glDebugMessageCallback instead, so the driver
+reports errors, and also what glGetError never would: performance warnings
+like buffer stalls or shader recompiles, deprecated or undefined behaviour.
+Messages below the layer's severity or from other sources are turned off in
+the driver, the rest are kept as DebugMessage records and logged to the
+'learnopengl.gl' logger with the message's fields as extra attributes.
+
+create_window() adds a layer, window.debug, when $LEARNOPENGL_DEBUG_OUTPUT is
+set to the lowest severity wanted (high, medium, low or notification, 1 means
+low) or $LEARNOPENGL_DEBUG=1, and asks for a debug context, without which some
+drivers stay quiet. While a layer is on, label() names objects with
+glObjectLabel, so messages and tools like RenderDoc show "MeshArena vertices"
+instead of "buffer 7".
+'''
+
+from collections import Counter, deque, namedtuple
+import ctypes
+import logging
+
+from OpenGL import GL as gl
+
+log = logging.getLogger('learnopengl.gl')
+
+SOURCES = {
+    gl.GL_DEBUG_SOURCE_API: 'api',
+    gl.GL_DEBUG_SOURCE_WINDOW_SYSTEM: 'window_system',
+    gl.GL_DEBUG_SOURCE_SHADER_COMPILER: 'shader_compiler',
+    gl.GL_DEBUG_SOURCE_THIRD_PARTY: 'third_party',
+    gl.GL_DEBUG_SOURCE_APPLICATION: 'application',
+    gl.GL_DEBUG_SOURCE_OTHER: 'other',
+}
+
+TYPES = {
+    gl.GL_DEBUG_TYPE_ERROR: 'error',
+    gl.GL_DEBUG_TYPE_DEPRECATED_BEHAVIOR: 'deprecated',
+    gl.GL_DEBUG_TYPE_UNDEFINED_BEHAVIOR: 'undefined',
+    gl.GL_DEBUG_TYPE_PORTABILITY: 'portability',
+    gl.GL_DEBUG_TYPE_PERFORMANCE: 'performance',
+    gl.GL_DEBUG_TYPE_MARKER: 'marker',
+    gl.GL_DEBUG_TYPE_PUSH_GROUP: 'push_group',
+    gl.GL_DEBUG_TYPE_POP_GROUP: 'pop_group',
+    gl.GL_DEBUG_TYPE_OTHER: 'other',
+}
+
+# most severe first
+SEVERITIES = {
+    gl.GL_DEBUG_SEVERITY_HIGH: 'high',
+    gl.GL_DEBUG_SEVERITY_MEDIUM: 'medium',
+    gl.GL_DEBUG_SEVERITY_LOW: 'low',
+    gl.GL_DEBUG_SEVERITY_NOTIFICATION: 'notification',
+}
+
+# severity -> logging level
+_LEVELS = {
+    'high': logging.ERROR,
+    'medium': logging.WARNING,
+    'low': logging.INFO,
+    'notification': logging.DEBUG,
+}
+
+DebugMessage = namedtuple('DebugMessage', ['source', 'type', 'id', 'severity', 'message'])
+
+# set while a DebugLayer is on, labels cost a GL call each and only show up in debug output
+_labels = False
+
+def supported():
+    '''Whether the current context has KHR_debug, core since OpenGL 4.3'''
+    if not gl.glDebugMessageCallback:
+        return False
+    version = (gl.glGetIntegerv(gl.GL_MAJOR_VERSION), gl.glGetIntegerv(gl.GL_MINOR_VERSION))
+    if version >= (4, 3):
+        return True
+    return any(gl.glGetStringi(gl.GL_EXTENSIONS, i) == b'GL_KHR_debug'
+               for i in range(gl.glGetIntegerv(gl.GL_NUM_EXTENSIONS)))
+
+def label(identifier, name, text):
+    '''Names object name of kind identifier, e.g. GL_BUFFER, in debug messages, while a layer is on'''
+    if _labels and name is not None:
+        gl.glObjectLabel(identifier, name, -1, text.encode())
+
+class DebugLayer:
+    '''
+    Receives the context's debug messages of at least severity, from sources
+    (names from SOURCES, None for all), and keeps the last capacity of them.
+    synchronous makes the driver report a message from inside the call that
+    caused it, so a traceback points at it, at the cost of slower GL calls
+    '''
+
+    def __init__(self, severity='low', sources=None, synchronous=False, capacity=1000):
+        if severity not in _LEVELS:
+            raise Exception("ERROR::DEBUG::SEVERITY\nnot one of " + ", ".join(_LEVELS) + ": " + str(severity))
+        unknown = set(sources or ()) - set(SOURCES.values())
+        if unknown:
+            raise Exception("ERROR::DEBUG::SOURCE\nnot one of " + ", ".join(SOURCES.values()) + ": " + ", ".join(unknown))
+        self.severity = severity
+        self.sources = None if sources is None else set(sources)
+        self.synchronous = synchronous
+        self.messages = deque(maxlen=capacity)
+        self.counts = Counter()     # (source, type) -> messages received
+        self.enabled = False
+        self._callback = None       # the ctypes callback, which GL only holds a pointer to
+
+    def enable(self):
+        '''Starts receiving messages in the current context, returns False when it has no KHR_debug'''
+        global _labels
+        if not supported():
+            return False
+
+        self._callback = gl.GLDEBUGPROC(self._receive)
+        gl.glDebugMessageCallback(self._callback, None)
+        # filter in the driver, so unwanted messages are never even formatted
+        gl.glDebugMessageControl(gl.GL_DONT_CARE, gl.GL_DONT_CARE, gl.GL_DONT_CARE, 0, None, gl.GL_TRUE)
+        wanted = list(_LEVELS).index(self.severity)
+        for severity, name in SEVERITIES.items():
+            if list(_LEVELS).index(name) > wanted:
+                gl.glDebugMessageControl(gl.GL_DONT_CARE, gl.GL_DONT_CARE, severity, 0, None, gl.GL_FALSE)
+        if self.sources is not None:
+            for source, name in SOURCES.items():
+                if name not in self.sources:
+                    gl.glDebugMessageControl(source, gl.GL_DONT_CARE, gl.GL_DONT_CARE, 0, None, gl.GL_FALSE)
+
+        gl.glEnable(gl.GL_DEBUG_OUTPUT)
+        if self.synchronous:
+            gl.glEnable(gl.GL_DEBUG_OUTPUT_SYNCHRONOUS)
+        self.enabled = _labels = True
+        return True
+
+    def disable(self):
+        '''Stops receiving messages, call while the context is still current'''
+        global _labels
+        if not self.enabled:
+            return
+        gl.glDisable(gl.GL_DEBUG_OUTPUT)
+        gl.glDisable(gl.GL_DEBUG_OUTPUT_SYNCHRONOUS)
+        gl.glDebugMessageCallback(gl.GLDEBUGPROC(), None)
+        self.enabled = _labels = False
+
+    def insert(self, text, severity='notification'):
+        '''Sends an application message through the driver, e.g. to mark a frame in a capture'''
+        if self.enabled:
+            severity = next(value for value, name in SEVERITIES.items() if name == severity)
+            gl.glDebugMessageInsert(gl.GL_DEBUG_SOURCE_APPLICATION, gl.GL_DEBUG_TYPE_MARKER, 0,
+                                    severity, -1, text.encode())
+
+    def _receive(self, source, message_type, message_id, severity, length, message, user_param):
+        # runs inside whichever GL call the driver reports from, raising here would unwind through C
+        record = DebugMessage(SOURCES.get(source, 'other'), TYPES.get(message_type, 'other'), message_id,
+                              SEVERITIES.get(severity, 'notification'),
+                              ctypes.string_at(message, length).decode(errors='replace'))
+        self.messages.append(record)
+        self.counts[record.source, record.type] += 1
+        log.log(_LEVELS[record.severity], "GL %s %s %d (%s): %s", record.source, record.type, record.id,
+                record.severity, record.message, extra={'gl_' + field: value for field, value in record._asdict().items()})
+
+    def stats(self):
+        '''Messages received by source and type'''
+        return {'{} {}'.format(*key): count for key, count in self.counts.items()}
@@ -0,0 +1,48 @@
+'''
+Offscreen render target
+
+Framebuffer object with a colour and a depth/stencil renderbuffer, used in place
+of the window's default framebuffer by the headless backends.
+'''
+
+from OpenGL import GL as gl
+import numpy as np
+
+class Framebuffer:
+    def __init__(self, width, height):
+        self._fbo = gl.GLuint()
+        gl.glGenFramebuffers(1, self._fbo)
+        self._color = gl.GLuint()
+        gl.glGenRenderbuffers(1, self._color)
+        self._depth_stencil = gl.GLuint()
+        gl.glGenRenderbuffers(1, self._depth_stencil)
+
+        self.bind()
+        self.resize(width, height)
+        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_RENDERBUFFER, self._color)
+        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_DEPTH_STENCIL_ATTACHMENT, gl.GL_RENDERBUFFER, self._depth_stencil)
+        if gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER) != gl.GL_FRAMEBUFFER_COMPLETE:
+            raise Exception("ERROR::FRAMEBUFFER::INCOMPLETE")
+
+    def delete(self):
+        gl.glDeleteRenderbuffers(1, self._color)
+        gl.glDeleteRenderbuffers(1, self._depth_stencil)
+        gl.glDeleteFramebuffers(1, self._fbo)
+
+    def bind(self):
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self._fbo)
+
+    def resize(self, width, height):
+        self.width, self.height = width, height
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self._color)
+        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_RGBA8, width, height)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self._depth_stencil)
+        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_DEPTH24_STENCIL8, width, height)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, 0)
+
+    def read_pixels(self):
+        '''Returns the colour attachment as a (height, width, 4) uint8 array, bottom row first'''
+        self.bind()
+        pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        gl.glReadPixels(0, 0, self.width, self.height, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, pixels)
+        return pixels
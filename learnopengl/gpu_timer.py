@@ -0,0 +1,178 @@
+'''
+GPU time of each pass of a frame, from timer queries
+
+The CPU only queues GL commands, so timing draw() with perf_counter says
+nothing about how long the GPU takes to run them. A GPUTimer brackets each pass
+with two GL_TIMESTAMP queries instead, written by the GPU when it gets there:
+
+    timer = GPUTimer()
+    ...
+    with timer.scope('clear'):
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+    with timer.scope('draw'):
+        gl.glDrawElements(gl.GL_TRIANGLES, 6, gl.GL_UNSIGNED_INT, None)
+    with timer.scope('swap'):
+        window.swap_buffers()
+    timer.end_frame()
+
+Timestamps rather than GL_TIME_ELAPSED queries, as only one of those can be
+running at a time, so scopes could not nest. Asking for a result before the
+GPU has written it would wait for the GPU, so results are only read once
+GL_QUERY_RESULT_AVAILABLE says they are there, usually a few frames later, and
+the queries then go back to a pool for reuse. A pass timed more than once in
+a frame, like each draw call, adds up to one time per frame.
+'''
+
+from collections import deque
+import ctypes
+
+from OpenGL import GL as gl
+# unwrapped, the wrapped glGetQueryObjectiv costs several times as much and
+# the wrapped glGetQueryObjectui64v fails for want of a 64 bit array type
+from OpenGL.raw.GL.VERSION.GL_1_5 import glGetQueryObjectiv
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v
+import numpy as np
+
+from . import resources
+
+def supported():
+    '''Whether the current context's GL_TIMESTAMP queries count anything'''
+    return gl.glGetQueryiv(gl.GL_TIMESTAMP, gl.GL_QUERY_COUNTER_BITS) > 0
+
+class PassTimes:
+    '''GPU time of one pass in each of the last capacity frames it ran in'''
+
+    def __init__(self, capacity=1000):
+        self.times = np.zeros(capacity)     # milliseconds
+        self.count = 0
+
+    def add(self, ms):
+        self.times[self.count % len(self.times)] = ms
+        self.count += 1
+
+    def summary(self):
+        times = self.times[:min(self.count, len(self.times))]
+        p50, p95, p99 = np.percentile(times, [50, 95, 99])
+        return {'frames': self.count, 'mean_ms': float(times.mean()), 'p50_ms': float(p50),
+                'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': float(times.max())}
+
+class GPUTimer:
+    '''
+    Times named scopes on the GPU and keeps PassTimes per name for the last
+    capacity frames. Does nothing when the context has no timestamps, or
+    while enabled is False
+    '''
+
+    # query names generated at a time when the pool runs dry
+    BLOCK = 64
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.passes = {}            # scope name -> PassTimes
+        self.enabled = supported()
+        self.frames_behind = 0      # frames between timing and reading back, for the last frame read
+
+        self._registry = resources.current
+        self._free = []             # query names ready for reuse
+        self._open = []             # (name, begin query) of the scopes entered and not left yet
+        self._frame = []            # (name, begin query, end query) of the frame being timed
+        self._pending = deque()     # (frame number, timed scopes) of frames not read back yet
+        self._frames = 0
+        self._result = gl.GLuint64()
+        self._available = gl.GLint()
+
+    def scope(self, name):
+        '''Context manager timing what runs inside it as pass name'''
+        return _Scope(self, name)
+
+    def begin(self, name):
+        if not self.enabled:
+            return
+        query = self._query()
+        gl.glQueryCounter(query, gl.GL_TIMESTAMP)
+        self._open.append((name, query))
+
+    def end(self):
+        '''Ends the scope begun last'''
+        if not self.enabled or not self._open:
+            return
+        name, begin = self._open.pop()
+        query = self._query()
+        gl.glQueryCounter(query, gl.GL_TIMESTAMP)
+        self._frame.append((name, begin, query))
+
+    def end_frame(self):
+        '''Call once per frame, after the last scope, reads back whatever frames the GPU has finished'''
+        if self._frame:
+            self._pending.append((self._frames, self._frame))
+            self._frame = []
+        self._frames += 1
+        self.collect()
+
+    def collect(self):
+        '''Reads back the frames whose queries are written, oldest first, without waiting; returns how many'''
+        count = 0
+        while self._pending:
+            number, scopes = self._pending[0]
+            # the GPU writes queries in order, the last one there means all of them are
+            glGetQueryObjectiv(scopes[-1][2], gl.GL_QUERY_RESULT_AVAILABLE, ctypes.byref(self._available))
+            if not self._available.value:
+                break
+            self._pending.popleft()
+            self._read(scopes)
+            self.frames_behind = self._frames - number
+            count += 1
+        return count
+
+    def _read(self, scopes):
+        totals = {}
+        for name, begin, end in scopes:
+            totals[name] = totals.get(name, 0) - self._timestamp(begin) + self._timestamp(end)
+            self._free += (begin, end)
+        for name, ns in totals.items():
+            if name not in self.passes:
+                self.passes[name] = PassTimes(self.capacity)
+            self.passes[name].add(ns * 1e-6)
+
+    def _timestamp(self, query):
+        glGetQueryObjectui64v(query, gl.GL_QUERY_RESULT, ctypes.byref(self._result))
+        return self._result.value
+
+    def _query(self):
+        if not self._free:
+            names = np.empty(self.BLOCK, dtype=np.uint32)
+            gl.glGenQueries(self.BLOCK, names)
+            self._free = names.tolist()
+            for name in self._free:
+                self._registry.created('query', name)
+        return self._free.pop()
+
+    def summary(self):
+        '''PassTimes.summary() of every pass, in the order they were first timed'''
+        return {name: times.summary() for name, times in self.passes.items()}
+
+    def delete(self):
+        '''Queues the queries for deletion, results not read back yet are lost'''
+        queries = list(self._free)
+        for scopes in [self._frame] + [scopes for _, scopes in self._pending]:
+            for _, begin, end in scopes:
+                queries += (begin, end)
+        queries += [begin for _, begin in self._open]
+        for query in queries:
+            self._registry.release('query', query)
+        self._free, self._frame, self._open = [], [], []
+        self._pending.clear()
+        self.enabled = False
+
+class _Scope:
+    __slots__ = ('timer', 'name')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer.begin(self.name)
+
+    def __exit__(self, *exc_info):
+        self.timer.end()
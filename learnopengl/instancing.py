@@ -0,0 +1,64 @@
+'''
+Instanced drawing
+
+An InstanceBuffer holds one row of a numpy structured array per instance,
+e.g. an offset, colour and scale, which the vertex shader reads as attributes
+that advance once per instance (glVertexAttribDivisor). draw_instanced() then
+draws every instance of a mesh in one call, where setting a uniform and
+drawing once per copy would take two calls from Python per copy.
+'''
+
+from OpenGL import GL as gl
+import numpy as np
+
+from .arena import INDEX_SIZE
+from .buffers import VBO, vertex_attributes
+
+class InstanceBuffer(VBO):
+    '''
+    Per-instance attributes at locations location, location + 1, ... in the
+    field order of data's dtype, e.g.
+        np.dtype([('aOffset', np.float32, 2), ('aColor', np.float32, 3), ('aScale', np.float32)])
+    '''
+    __slots__ = ('instance_format', 'location', 'usage', 'count', 'capacity')
+
+    def __init__(self, data, location, usage=gl.GL_DYNAMIC_DRAW, keep=False):
+        data = np.ascontiguousarray(data)
+        self.instance_format = data.dtype
+        self.location = location
+        self.usage = usage
+        self.count = self.capacity = len(data)
+        super().__init__(data, usage, keep)
+
+    def write(self, data):
+        '''Replaces the data of all instances, there may be more or fewer of them than before'''
+        data = np.ascontiguousarray(data, dtype=self.instance_format)
+        if len(data) > self.capacity:
+            # vertex arrays point at the buffer, not its storage, so they need no update
+            if self.data is not None:
+                self.data = np.array(data)
+                self._dirty = []
+            self.bind()
+            gl.glBufferData(self._buffer_type, data, self.usage)
+            self._registry.resized('buffer', self._vbo, data.nbytes)
+            self.capacity = len(data)
+        else:
+            self.update(data)
+        self.count = len(data)
+
+    def attach(self, vao):
+        '''Makes vao read its instance attributes from this buffer'''
+        vao.bind()
+        self.bind()
+        vertex_attributes(self.instance_format, self.location, divisor=1)
+        vao.instances = self
+
+def draw_instanced(mesh, instances, mode=gl.GL_TRIANGLES):
+    '''Draws instances.count copies of mesh, a Mesh from a MeshArena, in one call'''
+    vao = mesh.arena.vao
+    if vao.instances is not instances:
+        instances.attach(vao)
+    vao.bind()
+    gl.glDrawElementsInstancedBaseVertex(mode, mesh.index_count, gl.GL_UNSIGNED_INT,
+                                         gl.GLvoidp(mesh.first_index * INDEX_SIZE),
+                                         instances.count, mesh.base_vertex)
@@ -0,0 +1,124 @@
+'''
+Frame pacing for the render loop
+
+A Scheduler runs a window's render loop with a time budget. Game state moves
+on in update(dt) at a fixed timestep, however fast frames are drawn, and
+render(alpha) draws it, alpha being how far the present lies between the last
+update and the next, to interpolate by. With fps set, the time a frame does
+not need is slept away: time.sleep up to a little before the frame is due,
+then a short spin on perf_counter for the rest, as sleeping alone wakes up
+late. FrameStats keeps the time of the last frames for percentiles.
+
+    scheduler = Scheduler(window, render, update, fps=60)
+    scheduler.run()
+    print(scheduler.stats.summary())
+'''
+
+import time
+
+import numpy as np
+
+class FrameStats:
+    '''Frame intervals and the time spent in each frame, for the last capacity frames'''
+
+    def __init__(self, capacity=1000):
+        self.intervals = np.zeros(capacity)  # seconds from one frame's start to the next
+        self.work = np.zeros(capacity)       # seconds spent updating and rendering
+        self.count = 0
+
+    def add(self, interval, work):
+        i = self.count % len(self.intervals)
+        self.intervals[i] = interval
+        self.work[i] = work
+        self.count += 1
+
+    def summary(self, budget=None):
+        '''Frame times in ms, and the frames over 1.5 budgets when given the seconds a frame may take'''
+        n = min(self.count, len(self.intervals))
+        if n == 0:
+            return {}
+        intervals, work = self.intervals[:n], self.work[:n]
+        p50, p95, p99 = np.percentile(intervals, [50, 95, 99]) * 1e3
+        summary = {'frames': self.count,
+                   'fps': float(1.0 / intervals.mean()),
+                   'interval_ms': {'mean': float(intervals.mean() * 1e3), 'p50': float(p50),
+                                   'p95': float(p95), 'p99': float(p99), 'max': float(intervals.max() * 1e3)},
+                   'work_ms': {'mean': float(work.mean() * 1e3), 'max': float(work.max() * 1e3)}}
+        if budget is not None:
+            summary['late'] = int((intervals > 1.5 * budget).sum())
+        return summary
+
+class Scheduler:
+    '''
+    Calls update(dt) every timestep seconds of elapsed time and render(alpha)
+    once per frame, at most fps frames a second when fps is set. No more
+    than max_updates updates run per frame, a slower machine falls behind
+    instead of spending every frame catching up. swap_interval, when given,
+    is passed to the window
+    '''
+
+    # seconds before a frame is due that sleeping stops and spinning starts
+    SPIN = 0.0005
+
+    def __init__(self, window, render, update=None, timestep=1.0 / 60, fps=None,
+                 swap_interval=None, max_updates=5):
+        self.window = window
+        self.render = render
+        self.update = update
+        self.timestep = timestep
+        self.fps = fps
+        self.max_updates = max_updates
+        self.stats = FrameStats()
+        self.time = 0.0     # game time advanced by update
+
+        if swap_interval is not None:
+            window.set_swap_interval(swap_interval)
+
+        self._accumulator = 0.0
+        self._last = None
+        self._deadline = None
+
+    def run(self):
+        while self.window.next_frame():
+            self.frame()
+
+    def frame(self):
+        start = time.perf_counter()
+        if self._last is None:
+            self._last = self._deadline = start
+        interval = start - self._last
+        self._last = start
+
+        if self.update is not None:
+            self._accumulator += interval
+            updates = 0
+            while self._accumulator >= self.timestep and updates < self.max_updates:
+                self.update(self.timestep)
+                self.time += self.timestep
+                self._accumulator -= self.timestep
+                updates += 1
+            if updates == self.max_updates:
+                # too far behind to catch up, drop the rest
+                self._accumulator = min(self._accumulator, self.timestep)
+            alpha = self._accumulator / self.timestep
+        else:
+            alpha = 1.0
+        self.render(alpha)
+        work = time.perf_counter() - start
+
+        if interval:
+            self.stats.add(interval, work)
+        if self.fps:
+            self._wait()
+
+    def _wait(self):
+        self._deadline += 1.0 / self.fps
+        now = time.perf_counter()
+        if now > self._deadline:
+            # a late frame moves the schedule instead of making the next ones hurry
+            self._deadline = now
+            return
+        if self._deadline - now > self.SPIN:
+            time.sleep(self._deadline - now - self.SPIN)
+        while time.perf_counter() < self._deadline:
+            pass
@@ -0,0 +1,241 @@
+'''
+GLSL preprocessing in front of ShaderProgram
+
+The chapter scripts carry every shader whole, so a variant, like 6.8.2's
+offset or 6.8.3's position as colour, is a copy with a line changed.
+preprocess() makes variants from one source instead:
+    #include "name"     replaced by the source of name, from the includes
+                        given or a file next to the including file or in
+                        include_dirs, each included once
+    defines             {name: value} written as #define lines after
+                        #version, for #ifdef and #if in the source
+    constants           {name: value} turning a declaration like
+                        "uniform float offset;" into
+                        "const float offset = 0.3;", which the compiler folds
+Included sources are source strings of their own, numbered by #line
+directives, so compile errors point at the line in the file it came from:
+ShaderSource.files lists the files by source string number.
+
+ShaderVariants keeps the programs of one set of sources by their defines and
+constants, and makes each the first time get() asks for it, so permutations
+that are never drawn are never compiled. save_manifest() writes the variants
+asked for; given to warm() on the next run, they are compiled as a batch and
+warmed up before the first frame, see compile_programs().
+'''
+
+from collections import namedtuple
+import json
+import os
+import re
+
+import numpy as np
+
+from .shader import ShaderProgram, compile_programs
+
+# a preprocessed stage: its source code, the file of each source string number, the constants it declares
+ShaderSource = namedtuple('ShaderSource', ['text', 'files', 'constants'])
+
+_INCLUDE = re.compile(r'^\s*#\s*include\s+["<]([^">]+)[">]\s*$')
+_VERSION = re.compile(r'^\s*#\s*version\b')
+_UNIFORM = re.compile(r'^(\s*)uniform\s+(\w+)\s+(\w+)\s*;')
+
+def _float(value):
+    # GLSL float literals need a point or an exponent, repr gives one
+    return repr(float(value))
+
+def _literal(glsl_type, value):
+    '''value as a GLSL literal of glsl_type, e.g. vec3(1.0, 0.5, 0.2)'''
+    if glsl_type == 'bool':
+        return 'true' if value else 'false'
+    if glsl_type == 'int':
+        return str(int(value))
+    if glsl_type == 'uint':
+        return str(int(value)) + 'u'
+    if glsl_type in ('float', 'double'):
+        return _float(value)
+    if 'mat' in glsl_type:
+        # matN() fills column by column, set() uploads numpy's rows as rows
+        value = np.asarray(value).T
+    components = np.ravel(value).tolist()
+    if glsl_type.startswith('b'):
+        items = ['true' if item else 'false' for item in components]
+    elif glsl_type.startswith('i'):
+        items = [str(int(item)) for item in components]
+    elif glsl_type.startswith('u'):
+        items = [str(int(item)) + 'u' for item in components]
+    else:
+        items = [_float(item) for item in components]
+    return '{}({})'.format(glsl_type, ', '.join(items))
+
+def _define(name, value):
+    # None for a plain #define, True and False as 1 and 0 for #if
+    if value is None:
+        return '#define ' + name
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, float):
+        value = _float(value)
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        value = 'vec{}({})'.format(len(np.ravel(value)), ', '.join(_float(item) for item in np.ravel(value)))
+    return '#define {} {}'.format(name, value)
+
+def preprocess(source, defines=None, constants=None, includes=None, include_dirs=(), path=None):
+    '''
+    Returns the ShaderSource of source with its #includes resolved, defines
+    injected and constants compiled in. includes maps names to source code and
+    is looked in before the files; path is the file source came from, if any
+    '''
+    files = [path or '<source>']
+    lines = _resolve(source, path, 0, files, includes or {}, include_dirs, {path} if path else set())
+
+    declared = []
+    for i, line in enumerate(lines):
+        match = _UNIFORM.match(line)
+        if match and constants and match.group(3) in constants:
+            indent, glsl_type, name = match.groups()
+            lines[i] = '{}const {} {} = {};'.format(indent, glsl_type, name, _literal(glsl_type, constants[name])) + line[match.end():]
+            declared.append(name)
+
+    if defines:
+        version = next((i for i, line in enumerate(lines) if _VERSION.match(line)), None)
+        injected = [_define(name, value) for name, value in defines.items()]
+        if version is None:
+            lines[:0] = injected + ['#line 1 0']
+        else:
+            # #version comes first, before any #include, so the line after it is line version + 2 of source string 0
+            lines[version + 1:version + 1] = injected + ['#line {} 0'.format(version + 2)]
+    return ShaderSource('\n'.join(lines) + '\n', files, declared)
+
+def _resolve(source, path, number, files, includes, include_dirs, seen):
+    lines = []
+    for line_number, line in enumerate(source.split('\n'), 1):
+        match = _INCLUDE.match(line)
+        if not match:
+            lines.append(line)
+            continue
+        name = match.group(1)
+        included, included_path = _find(name, path, includes, include_dirs)
+        key = included_path or name
+        if key in seen:
+            # included already, like a header with an include guard
+            lines.append('')
+            continue
+        seen.add(key)
+        files.append(included_path or name)
+        included_number = len(files) - 1
+        lines.append('#line 1 {}'.format(included_number))
+        lines += _resolve(included, included_path, included_number, files, includes, include_dirs, seen)
+        lines.append('#line {} {}'.format(line_number + 1, number))
+    return lines
+
+def _find(name, path, includes, include_dirs):
+    '''(source code, file path or None) of include name'''
+    if name in includes:
+        return includes[name], None
+    directories = ([os.path.dirname(path)] if path else []) + list(include_dirs)
+    for directory in directories:
+        candidate = os.path.join(directory, name)
+        try:
+            with open(candidate) as fh:
+                return fh.read(), fh.name
+        except (FileNotFoundError, OSError) as e:
+            pass
+    raise Exception("ERROR::SHADER::INCLUDE::NOT_FOUND\n" + name + " from " + (path or '<source>'))
+
+def _read(source):
+    # (source code, file path or None) of a stage given as source code or a file name
+    try:
+        with open(source) as fh:
+            return fh.read(), fh.name
+    except (FileNotFoundError, OSError) as e:
+        return source, None
+
+def _plain(value):
+    # numpy arrays and tuples as lists, numpy scalars as Python ones, which is how they come back from JSON;
+    # a matrix keeps its rows, _literal() needs them to order its columns
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return np.asarray(value).tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class ShaderVariants:
+    '''
+    The ShaderPrograms made from one set of stage sources, given as source
+    code or file names, by the defines and constants they were preprocessed with
+    '''
+
+    def __init__(self, vertex_source, fragment_source, geometry_source=None, includes=None, include_dirs=()):
+        self.stages = [_read(source) for source in (vertex_source, fragment_source, geometry_source) if source]
+        self.includes = includes or {}
+        self.include_dirs = include_dirs
+        self.programs = {}      # variant key -> ShaderProgram
+        self.used = {}          # variant key -> (defines, constants) of the variants get() asked for
+
+    def _key(self, defines, constants):
+        # defines by their text, 1 and 1.0 are different defines; constants by value, their declaration has the type
+        return (tuple(sorted(_define(name, value) for name, value in (defines or {}).items())),
+                tuple(sorted((name, repr(_plain(value))) for name, value in (constants or {}).items())))
+
+    def sources(self, defines=None, constants=None):
+        '''The preprocessed ShaderSource of each stage of the variant'''
+        sources = [preprocess(source, defines, constants, self.includes, self.include_dirs, path)
+                   for source, path in self.stages]
+        missing = set(constants or ()) - {name for source in sources for name in source.constants}
+        if missing:
+            raise Exception("ERROR::SHADER::CONSTANT::NOT_FOUND\nno uniform declared as " + ", ".join(sorted(missing)))
+        return sources
+
+    def get(self, defines=None, constants=None):
+        '''
+        The program of the variant with defines and constants, made the first time
+        it is asked for. Cheap after that, but keep it rather than asking every frame
+        '''
+        key = self._key(defines, constants)
+        program = self.programs.get(key)
+        if program is None:
+            program = self.programs[key] = ShaderProgram(*[source.text for source in self.sources(defines, constants)])
+            self._label(program, defines, constants)
+        if key not in self.used:
+            self.used[key] = (dict(defines or {}), dict(constants or {}))
+        return program
+
+    def _label(self, program, defines, constants):
+        names = [os.path.basename(path) for _, path in self.stages if path] or ['ShaderVariants']
+        program.label(" + ".join(names) + "".join(" " + name for name in sorted({**(defines or {}), **(constants or {})})))
+
+    def manifest(self):
+        '''The variants get() asked for, as warm() takes them'''
+        return [{'defines': {name: _plain(value) for name, value in defines.items()},
+                 'constants': {name: _plain(value) for name, value in constants.items()}}
+                for defines, constants in self.used.values()]
+
+    def save_manifest(self, path):
+        with open(path, 'w') as fh:
+            json.dump(self.manifest(), fh, indent=1)
+
+    def warm(self, manifest, vertex_array=None):
+        '''
+        Compiles the variants of manifest, a list like manifest() returns or the
+        file save_manifest() wrote, as one batch and warms them up drawing
+        vertex_array, see compile_programs(). A manifest file that is not there
+        warms nothing. Returns how many variants were compiled
+        '''
+        if isinstance(manifest, str):
+            try:
+                with open(manifest) as fh:
+                    manifest = json.load(fh)
+            except FileNotFoundError as e:
+                return 0
+        variants = {}
+        for variant in manifest:
+            defines, constants = variant.get('defines'), variant.get('constants')
+            key = self._key(defines, constants)
+            if key not in self.programs:
+                variants[key] = (defines, constants)
+        programs = compile_programs([[source.text for source in self.sources(*variant)]
+                                     for variant in variants.values()], vertex_array=vertex_array)
+        for (key, variant), program in zip(variants.items(), programs):
+            self.programs[key] = program
+            self._label(program, *variant)
+        return len(programs)
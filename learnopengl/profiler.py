@@ -0,0 +1,157 @@
+'''
+CPU time of the stages of a frame
+
+A Profiler times named scopes with time.perf_counter_ns. Scopes nest, and
+every scope left is one record in preallocated numpy ring buffers, so a
+running profiler allocates no memory per frame; the oldest records are
+overwritten once capacity is reached.
+
+    with profiler.scope('uniforms'):
+        shader.set("ourColor", 0.0, greenValue, 0.0, 1.0)
+
+The window times its own stages, 'poll_events', 'wait_events' when rendering
+on demand and 'swap_buffers', and ends each frame in swap_buffers.
+summary() gives the time per stage as a dict, write_json() saves it, and
+write_chrome_trace() saves every record in the trace event format that
+chrome://tracing and https://ui.perfetto.dev show as a timeline.
+
+profiler.current is off unless $LEARNOPENGL_PROFILE=1; while off, scope()
+returns one shared scope whose enter and exit do nothing.
+'''
+
+import json
+import os
+import time
+
+import numpy as np
+
+class Profiler:
+    '''Records the last capacity scopes timed while enabled'''
+
+    # deepest nesting of scopes
+    MAX_DEPTH = 64
+
+    def __init__(self, capacity=100000, enabled=False):
+        self.enabled = enabled
+        self.names = []                 # scope name by id
+        self.frame = 0                  # frames ended so far
+        self.count = 0                  # records written so far, the ring holds the last capacity
+        self._scopes = {}               # name -> its _Scope, made once
+
+        self.capacity = capacity
+        self._ids = np.zeros(capacity, dtype=np.int32)
+        self._starts = np.zeros(capacity, dtype=np.int64)        # perf_counter_ns
+        self._durations = np.zeros(capacity, dtype=np.int64)     # nanoseconds
+        self._frames = np.zeros(capacity, dtype=np.int32)
+        # the same memory, setting one item through a memoryview costs half as much
+        self._record = (memoryview(self._ids), memoryview(self._starts),
+                        memoryview(self._durations), memoryview(self._frames))
+        # the scopes entered and not left yet
+        self._open_ids = [0] * self.MAX_DEPTH
+        self._open_starts = [0] * self.MAX_DEPTH
+        self._depth = 0
+
+    def scope(self, name):
+        '''Context manager timing what runs inside it as stage name'''
+        if not self.enabled:
+            return _OFF
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self, len(self.names))
+            self.names.append(name)
+        return scope
+
+    def end_frame(self):
+        self.frame += 1
+
+    def clear(self):
+        self.count = 0
+        self.frame = 0
+        self._depth = 0
+
+    def _begin(self, id):
+        depth = self._depth
+        if depth == self.MAX_DEPTH:
+            raise Exception("ERROR::PROFILER::TOO_DEEP\nscopes nest at most {} deep".format(self.MAX_DEPTH))
+        self._open_ids[depth] = id
+        self._depth = depth + 1
+        # last, so the bookkeeping above is not timed
+        self._open_starts[depth] = time.perf_counter_ns()
+
+    def _end(self):
+        end = time.perf_counter_ns()
+        depth = self._depth = self._depth - 1
+        start = self._open_starts[depth]
+        i = self.count % self.capacity
+        ids, starts, durations, frames = self._record
+        ids[i] = self._open_ids[depth]
+        starts[i] = start
+        durations[i] = end - start
+        frames[i] = self.frame
+        self.count += 1
+
+    def records(self):
+        '''(ids, starts, durations, frames) of the records kept, oldest first'''
+        n = min(self.count, self.capacity)
+        order = (np.arange(n) + self.count - n) % self.capacity
+        return self._ids[order], self._starts[order], self._durations[order], self._frames[order]
+
+    def summary(self):
+        '''Per stage: times timed, total and per frame milliseconds, and percentiles of one timing in microseconds'''
+        ids, _, durations, frames = self.records()
+        if not ids.size:
+            return {}
+        frame_count = int(frames.max() - frames.min()) + 1
+        summary = {}
+        for id, name in enumerate(self.names):
+            times = durations[ids == id] * 1e-3
+            if not times.size:
+                continue
+            p50, p95, p99 = np.percentile(times, [50, 95, 99])
+            summary[name] = {'count': int(times.size), 'total_ms': float(times.sum() * 1e-3),
+                             'per_frame_ms': float(times.sum() * 1e-3 / frame_count),
+                             'mean_us': float(times.mean()), 'p50_us': float(p50), 'p95_us': float(p95),
+                             'p99_us': float(p99), 'max_us': float(times.max())}
+        return summary
+
+    def write_json(self, path):
+        with open(path, 'w') as fh:
+            json.dump({'frames': self.frame, 'stages': self.summary()}, fh, indent=1)
+
+    def write_chrome_trace(self, path):
+        '''Saves the records as complete ('X') trace events, in microseconds from the first'''
+        ids, starts, durations, frames = self.records()
+        origin = starts.min() if starts.size else 0
+        events = [{'name': self.names[id], 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                   'ts': (start - origin) * 1e-3, 'dur': duration * 1e-3, 'args': {'frame': frame}}
+                  for id, start, duration, frame in zip(ids.tolist(), starts.tolist(),
+                                                        durations.tolist(), frames.tolist())]
+        with open(path, 'w') as fh:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fh)
+
+class _Scope:
+    __slots__ = ('profiler', 'id')
+
+    def __init__(self, profiler, id):
+        self.profiler = profiler
+        self.id = id
+
+    def __enter__(self):
+        self.profiler._begin(self.id)
+
+    def __exit__(self, *exc_info):
+        self.profiler._end()
+
+class _OffScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+_OFF = _OffScope()
+
+# the profiler the window and scripts record into
+current = Profiler(enabled=os.environ.get('LEARNOPENGL_PROFILE') == '1')
@@ -0,0 +1,126 @@
+'''
+On-disk cache of linked shader program binaries
+
+ShaderProgram compiles and links every stage from source, which dominates start
+up once there are more than a handful of programs. The linked program is saved
+with glGetProgramBinary and later loaded with glProgramBinary instead.
+
+Binaries only work on the driver that wrote them, so entries are keyed on the
+stage sources together with the GL vendor, renderer and version strings. A
+binary the driver still rejects (e.g. after a driver update that kept the
+version string) is deleted and the program is compiled from source again.
+
+The cache directory is $LEARNOPENGL_PROGRAM_CACHE, or learnopengl/programs in
+the user cache directory when that is not set. An empty value turns it off;
+one that cannot be written to leaves programs compiled from source.
+'''
+
+import ctypes
+import hashlib
+import os
+
+from OpenGL import GL as gl
+from OpenGL.error import GLError
+import numpy as np
+
+class ProgramBinaryCache:
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0       # programs loaded from a binary
+        self.misses = 0     # no binary yet, compiled from source
+        self.rejected = 0   # binary refused by the driver, compiled from source
+        self._driver = None
+        self._supported = None
+
+    def supported(self):
+        '''True when the current context can save and load program binaries'''
+        if self._supported is None:
+            self._supported = (bool(gl.glGetProgramBinary) and
+                               gl.glGetIntegerv(gl.GL_NUM_PROGRAM_BINARY_FORMATS) > 0)
+        return self._supported
+
+    def key(self, *sources):
+        if self._driver is None:
+            self._driver = b'\0'.join(gl.glGetString(name) or b''
+                                      for name in (gl.GL_VENDOR, gl.GL_RENDERER, gl.GL_VERSION))
+        digest = hashlib.sha256(self._driver)
+        for source in sources:
+            digest.update(b'\0')
+            digest.update((source or '').encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.bin')
+
+    def load(self, key):
+        '''Returns a linked program made from the binary stored under key, or None'''
+        try:
+            with open(self._path(key), 'rb') as fh:
+                data = fh.read()
+        except (FileNotFoundError, OSError) as e:
+            self.misses += 1
+            return None
+        if len(data) <= 4:
+            # empty or cut short, no format and binary to hand the driver
+            self.rejected += 1
+            self.discard(key)
+            return None
+
+        binary = np.frombuffer(data, dtype=np.uint8, offset=4)
+        binary_format = int(np.frombuffer(data, dtype=np.uint32, count=1)[0])
+
+        program = gl.glCreateProgram()
+        try:
+            gl.glProgramBinary(program, binary_format, binary, binary.size)
+            linked = gl.glGetProgramiv(program, gl.GL_LINK_STATUS)
+        except GLError as e:
+            linked = False
+        if not linked:
+            gl.glDeleteProgram(program)
+            self.rejected += 1
+            self.discard(key)
+            return None
+
+        self.hits += 1
+        return program
+
+    def store(self, key, program):
+        '''Saves the binary of a program linked with GL_PROGRAM_BINARY_RETRIEVABLE_HINT set'''
+        length = gl.glGetProgramiv(program, gl.GL_PROGRAM_BINARY_LENGTH)
+        if not length:
+            return
+
+        binary = np.empty(4 + length, dtype=np.uint8)
+        written, binary_format = gl.GLsizei(), gl.GLenum()
+        gl.glGetProgramBinary(program, length, ctypes.byref(written), ctypes.byref(binary_format), binary[4:])
+        binary[:4] = np.frombuffer(np.uint32(binary_format.value).tobytes(), dtype=np.uint8)
+
+        # write to a temporary file first so a crash never leaves a truncated entry behind
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + '.tmp', 'wb') as fh:
+                fh.write(binary[:4 + written.value].tobytes())
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            # a directory we cannot write to only costs the next run a compile
+            try:
+                os.remove(path + '.tmp')
+            except OSError:
+                pass
+
+    def discard(self, key):
+        try:
+            os.remove(self._path(key))
+        except (FileNotFoundError, OSError) as e:
+            pass
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'rejected': self.rejected}
+
+def default_cache():
+    directory = os.environ.get('LEARNOPENGL_PROGRAM_CACHE')
+    if directory is None:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        directory = os.path.join(cache_home, 'learnopengl', 'programs')
+    return ProgramBinaryCache(directory) if directory else None
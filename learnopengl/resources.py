@@ -0,0 +1,159 @@
+'''
+GL objects owned by the current context
+
+Buffers, vertex arrays, shaders, programs and queries register here when
+created. Dropping the Python wrapper does not delete the GL object on the spot,
+whenever the garbage collector gets to it, possibly mid-frame or with no
+context current: it is
+queued, and collect() deletes the queue once per frame from swap_buffers, with
+one glDeleteBuffers/glDeleteVertexArrays call for all objects of a kind.
+teardown() deletes whatever is still alive before the window destroys its
+context; wrappers outliving the context then delete nothing.
+
+Names for new buffers and vertex arrays come from a NamePool per kind, which
+generates them in blocks with one glGenBuffers(n)/glGenVertexArrays(n) call.
+
+Each new context gets a new registry, new_context() is called by
+create_window, and wrappers keep the registry they were created in, so an
+object of an old context is never deleted in a new one.
+'''
+
+from OpenGL import GL as gl
+import numpy as np
+
+from . import state
+
+def _delete_buffers(names):
+    gl.glDeleteBuffers(len(names), np.array(names, dtype=np.uint32))
+    state.current.deleted_buffers(names)
+
+def _delete_vertex_arrays(names):
+    gl.glDeleteVertexArrays(len(names), np.array(names, dtype=np.uint32))
+    for name in names:
+        state.current.deleted_vertex_array(name)
+
+def _delete_programs(names):
+    # a program in use stays current until another is used, so the state cache stays right
+    for name in names:
+        gl.glDeleteProgram(name)
+
+def _delete_shaders(names):
+    # shaders still attached to a program go with the program
+    for name in names:
+        gl.glDeleteShader(name)
+
+def _delete_queries(names):
+    gl.glDeleteQueries(len(names), np.array(names, dtype=np.uint32))
+
+def _delete_syncs(syncs):
+    for sync in syncs:
+        gl.glDeleteSync(sync)
+
+# kind -> deletes a list of objects of that kind
+_DELETERS = {
+    'buffer': _delete_buffers,
+    'vertex array': _delete_vertex_arrays,
+    'shader': _delete_shaders,
+    'program': _delete_programs,
+    'query': _delete_queries,
+    'sync': _delete_syncs,
+}
+
+class NamePool:
+    '''Names generated a block at a time and handed out one by one, blocks double up to MAX_BLOCK'''
+    __slots__ = ('generate', 'block', 'names', 'next')
+
+    MAX_BLOCK = 4096
+
+    def __init__(self, generate, block=64):
+        self.generate = generate    # glGen* taking a count and a uint32 array to fill
+        self.block = block
+        self.names = np.empty(0, dtype=np.uint32)
+        self.next = 0
+
+    def take(self):
+        if self.next == len(self.names):
+            self.names = np.empty(self.block, dtype=np.uint32)
+            self.generate(self.block, self.names)
+            self.next = 0
+            self.block = min(2 * self.block, self.MAX_BLOCK)
+        name = int(self.names[self.next])
+        self.next += 1
+        return name
+
+    def unused(self):
+        return self.names[self.next:].tolist()
+
+class ResourceRegistry:
+    def __init__(self):
+        self.live = {kind: {} for kind in _DELETERS}    # kind -> {name: bytes}
+        self.queued = {kind: [] for kind in _DELETERS}
+        self.pools = {'buffer': NamePool(gl.glGenBuffers),
+                      'vertex array': NamePool(gl.glGenVertexArrays)}
+        self.deleted = 0
+        self.closed = False
+
+    def generate(self, kind):
+        '''A new name for an object of kind, from the kind's pool'''
+        return self.pools[kind].take()
+
+    def created(self, kind, name, size=0):
+        '''Records a new object of kind with size bytes of storage'''
+        self.live[kind][state._name(name)] = size
+
+    def resized(self, kind, name, size):
+        name = state._name(name)
+        if name in self.live[kind]:
+            self.live[kind][name] = size
+
+    def release(self, kind, name):
+        '''Queues an object for deletion by the next collect()'''
+        if self.closed:
+            # the context, and the object with it, is gone already
+            return
+        name = state._name(name)
+        self.live[kind].pop(name, None)
+        self.queued[kind].append(name)
+
+    def collect(self):
+        '''Deletes the queued objects, returns how many'''
+        count = 0
+        for kind, names in self.queued.items():
+            if names:
+                self.queued[kind] = []
+                _DELETERS[kind](names)
+                count += len(names)
+        self.deleted += count
+        return count
+
+    def teardown(self):
+        '''Deletes every object still alive or queued, call while the context is still current'''
+        if self.closed:
+            return
+        for kind, objects in self.live.items():
+            self.queued[kind].extend(objects)
+            objects.clear()
+        # names generated but never handed out
+        for kind, pool in self.pools.items():
+            self.queued[kind].extend(pool.unused())
+            pool.next = len(pool.names)
+        self.collect()
+        self.closed = True
+
+    def stats(self):
+        '''Live objects and their bytes by kind, and the objects waiting to be deleted'''
+        stats = {kind: {'count': len(objects), 'bytes': sum(objects.values())}
+                 for kind, objects in self.live.items() if kind != 'sync'}
+        stats['queued'] = sum(len(names) for names in self.queued.values())
+        stats['deleted'] = self.deleted
+        return stats
+
+# objects of the current context
+current = ResourceRegistry()
+
+def new_context():
+    '''Gives a newly created context its own registry and returns it'''
+    global current
+    current.closed = True
+    current = ResourceRegistry()
+    return current
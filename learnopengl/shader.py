@@ -0,0 +1,429 @@
+'''
+Translated from source code from https://learnopengl.com/
+
+Shader
+Shader program class used from chapter 6 on, with uniform locations cached at link time
+and uniform values shadowed so unchanged ones are not uploaded again
+Linked programs are kept in an on-disk binary cache, see program_cache.py
+Stages and programs made from the same sources are compiled and linked once per context, see shader_cache.py
+compile_programs() hands a batch of programs to the driver before checking any, to compile in parallel
+Uniform blocks read from uniform buffers shared between programs, see uniform_buffer.py
+Some differences exist between solution code, pdf description, and this code
+
+Original work Copyright (c) 2015 Joey de Vries
+Modified work Copyright (c) 2018 Julia Read
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+'''
+
+from collections import namedtuple
+
+from OpenGL import GL as gl
+import numpy as np
+
+from . import debug
+from .buffers import VAO
+from .framebuffer import Framebuffer
+from . import shader_cache
+from . import state
+from .program_cache import default_cache
+
+# an active uniform as reported by glGetActiveUniform after linking
+Uniform = namedtuple('Uniform', ['name', 'location', 'type', 'size'])
+
+def _matrix_setter(setter):
+    # glUniformMatrix*fv takes an extra transpose argument, numpy arrays are row major
+    return lambda location, count, value: setter(location, count, gl.GL_TRUE, value)
+
+# uniform type -> (single value setter, array setter, numpy dtype, components), setters by name
+_UNIFORM_SETTERS = {
+    gl.GL_FLOAT:             ('glUniform1f',  'glUniform1fv',  np.float32, 1),
+    gl.GL_FLOAT_VEC2:        ('glUniform2f',  'glUniform2fv',  np.float32, 2),
+    gl.GL_FLOAT_VEC3:        ('glUniform3f',  'glUniform3fv',  np.float32, 3),
+    gl.GL_FLOAT_VEC4:        ('glUniform4f',  'glUniform4fv',  np.float32, 4),
+    gl.GL_INT:               ('glUniform1i',  'glUniform1iv',  np.int32,   1),
+    gl.GL_INT_VEC2:          ('glUniform2i',  'glUniform2iv',  np.int32,   2),
+    gl.GL_INT_VEC3:          ('glUniform3i',  'glUniform3iv',  np.int32,   3),
+    gl.GL_INT_VEC4:          ('glUniform4i',  'glUniform4iv',  np.int32,   4),
+    gl.GL_UNSIGNED_INT:      ('glUniform1ui', 'glUniform1uiv', np.uint32,  1),
+    gl.GL_UNSIGNED_INT_VEC2: ('glUniform2ui', 'glUniform2uiv', np.uint32,  2),
+    gl.GL_UNSIGNED_INT_VEC3: ('glUniform3ui', 'glUniform3uiv', np.uint32,  3),
+    gl.GL_UNSIGNED_INT_VEC4: ('glUniform4ui', 'glUniform4uiv', np.uint32,  4),
+    gl.GL_BOOL:              ('glUniform1i',  'glUniform1iv',  np.int32,   1),
+    gl.GL_BOOL_VEC2:         ('glUniform2i',  'glUniform2iv',  np.int32,   2),
+    gl.GL_BOOL_VEC3:         ('glUniform3i',  'glUniform3iv',  np.int32,   3),
+    gl.GL_BOOL_VEC4:         ('glUniform4i',  'glUniform4iv',  np.int32,   4),
+    gl.GL_FLOAT_MAT2:        (None, 'glUniformMatrix2fv', np.float32, 4),
+    gl.GL_FLOAT_MAT3:        (None, 'glUniformMatrix3fv', np.float32, 9),
+    gl.GL_FLOAT_MAT4:        (None, 'glUniformMatrix4fv', np.float32, 16),
+    gl.GL_FLOAT_MAT2x3:      (None, 'glUniformMatrix2x3fv', np.float32, 6),
+    gl.GL_FLOAT_MAT2x4:      (None, 'glUniformMatrix2x4fv', np.float32, 8),
+    gl.GL_FLOAT_MAT3x2:      (None, 'glUniformMatrix3x2fv', np.float32, 6),
+    gl.GL_FLOAT_MAT3x4:      (None, 'glUniformMatrix3x4fv', np.float32, 12),
+    gl.GL_FLOAT_MAT4x2:      (None, 'glUniformMatrix4x2fv', np.float32, 8),
+    gl.GL_FLOAT_MAT4x3:      (None, 'glUniformMatrix4x3fv', np.float32, 12),
+    gl.GL_DOUBLE:            ('glUniform1d',  'glUniform1dv',  np.float64, 1),
+    gl.GL_DOUBLE_VEC2:       ('glUniform2d',  'glUniform2dv',  np.float64, 2),
+    gl.GL_DOUBLE_VEC3:       ('glUniform3d',  'glUniform3dv',  np.float64, 3),
+    gl.GL_DOUBLE_VEC4:       ('glUniform4d',  'glUniform4dv',  np.float64, 4),
+    gl.GL_DOUBLE_MAT2:       (None, 'glUniformMatrix2dv', np.float64, 4),
+    gl.GL_DOUBLE_MAT3:       (None, 'glUniformMatrix3dv', np.float64, 9),
+    gl.GL_DOUBLE_MAT4:       (None, 'glUniformMatrix4dv', np.float64, 16),
+    gl.GL_DOUBLE_MAT2x3:     (None, 'glUniformMatrix2x3dv', np.float64, 6),
+    gl.GL_DOUBLE_MAT2x4:     (None, 'glUniformMatrix2x4dv', np.float64, 8),
+    gl.GL_DOUBLE_MAT3x2:     (None, 'glUniformMatrix3x2dv', np.float64, 6),
+    gl.GL_DOUBLE_MAT3x4:     (None, 'glUniformMatrix3x4dv', np.float64, 12),
+    gl.GL_DOUBLE_MAT4x2:     (None, 'glUniformMatrix4x2dv', np.float64, 8),
+    gl.GL_DOUBLE_MAT4x3:     (None, 'glUniformMatrix4x3dv', np.float64, 12),
+}
+
+# samplers are set with the texture unit they read from
+for _sampler in (gl.GL_SAMPLER_1D, gl.GL_SAMPLER_2D, gl.GL_SAMPLER_3D, gl.GL_SAMPLER_CUBE,
+                 gl.GL_SAMPLER_1D_SHADOW, gl.GL_SAMPLER_2D_SHADOW, gl.GL_SAMPLER_CUBE_SHADOW,
+                 gl.GL_SAMPLER_1D_ARRAY, gl.GL_SAMPLER_2D_ARRAY, gl.GL_SAMPLER_CUBE_MAP_ARRAY,
+                 gl.GL_SAMPLER_1D_ARRAY_SHADOW, gl.GL_SAMPLER_2D_ARRAY_SHADOW, gl.GL_SAMPLER_CUBE_MAP_ARRAY_SHADOW,
+                 gl.GL_SAMPLER_2D_MULTISAMPLE, gl.GL_SAMPLER_2D_MULTISAMPLE_ARRAY,
+                 gl.GL_SAMPLER_2D_RECT, gl.GL_SAMPLER_2D_RECT_SHADOW, gl.GL_SAMPLER_BUFFER,
+                 gl.GL_INT_SAMPLER_1D, gl.GL_INT_SAMPLER_2D, gl.GL_INT_SAMPLER_3D, gl.GL_INT_SAMPLER_CUBE,
+                 gl.GL_INT_SAMPLER_1D_ARRAY, gl.GL_INT_SAMPLER_2D_ARRAY, gl.GL_INT_SAMPLER_CUBE_MAP_ARRAY,
+                 gl.GL_INT_SAMPLER_2D_MULTISAMPLE, gl.GL_INT_SAMPLER_2D_MULTISAMPLE_ARRAY,
+                 gl.GL_INT_SAMPLER_2D_RECT, gl.GL_INT_SAMPLER_BUFFER,
+                 gl.GL_UNSIGNED_INT_SAMPLER_1D, gl.GL_UNSIGNED_INT_SAMPLER_2D, gl.GL_UNSIGNED_INT_SAMPLER_3D,
+                 gl.GL_UNSIGNED_INT_SAMPLER_CUBE, gl.GL_UNSIGNED_INT_SAMPLER_1D_ARRAY,
+                 gl.GL_UNSIGNED_INT_SAMPLER_2D_ARRAY, gl.GL_UNSIGNED_INT_SAMPLER_CUBE_MAP_ARRAY,
+                 gl.GL_UNSIGNED_INT_SAMPLER_2D_MULTISAMPLE, gl.GL_UNSIGNED_INT_SAMPLER_2D_MULTISAMPLE_ARRAY,
+                 gl.GL_UNSIGNED_INT_SAMPLER_2D_RECT, gl.GL_UNSIGNED_INT_SAMPLER_BUFFER):
+    _UNIFORM_SETTERS[_sampler] = _UNIFORM_SETTERS[gl.GL_INT]
+
+# gl -> _UNIFORM_SETTERS with the functions it has
+_resolved = {}
+
+def _uniform_setters():
+    '''
+    _UNIFORM_SETTERS with functions, looked up on gl as it is now rather than at
+    import, so programs made after a GLTracer was installed upload through it
+    '''
+    setters = _resolved.get(gl)
+    if setters is None:
+        setters = _resolved[gl] = {}
+        for uniform_type, (setter, array_setter, dtype, components) in _UNIFORM_SETTERS.items():
+            array_setter = getattr(gl, array_setter)
+            if setter is None:
+                array_setter = _matrix_setter(array_setter)
+            setters[uniform_type] = (setter and getattr(gl, setter), array_setter, dtype, components)
+    return setters
+
+class UniformUploads:
+    '''Counts ShaderProgram.set calls by outcome, reset once per frame'''
+
+    def __init__(self):
+        self.issued = 0     # sent to GL
+        self.skipped = 0    # same value as last time
+        self.dropped = 0    # uniform not used by the program
+
+    def reset(self):
+        '''Returns (issued, skipped, dropped) since the last reset and starts counting again'''
+        counts = (self.issued, self.skipped, self.dropped)
+        self.issued = self.skipped = self.dropped = 0
+        return counts
+
+class ShaderProgram:
+    # linked program binaries saved across runs, set to None to always compile from source
+    cache = default_cache()
+
+    Program = None
+    _linked = None
+
+    def __init__(self, vertex_source, fragment_source, geometry_source=None, deferred=False):
+        '''
+        Compiles and links the program from the sources, given as source code or
+        file names. Deferred, whether that worked is only asked once the program
+        is used or waited for, see wait(), so the driver can work on it meanwhile
+        '''
+        # the files the program comes from, if it does, name it in debug messages
+        files = []
+
+        try:
+            with open(vertex_source) as fh:
+                vertex_source = fh.read()
+                files.append(fh.name)
+        except (FileNotFoundError, OSError) as e:
+            pass
+
+        try:
+            with open(fragment_source) as fh:
+                fragment_source = fh.read()
+                files.append(fh.name)
+        except (FileNotFoundError, OSError) as e:
+            pass
+
+        try:
+            if geometry_source:
+                with open(geometry_source) as fh:
+                    geometry_source = fh.read()
+                    files.append(fh.name)
+        except (FileNotFoundError, OSError) as e:
+            pass
+
+        stages = [(gl.GL_VERTEX_SHADER, vertex_source), (gl.GL_FRAGMENT_SHADER, fragment_source)]
+        if geometry_source:
+            stages.append((gl.GL_GEOMETRY_SHADER, geometry_source))
+        self._shaders = shader_cache.current()
+        keys = tuple(self._shaders.key(*stage) for stage in stages)
+        self._linked = self._shaders.program(keys)
+        # a program linked from the same stages already is shared, uniform values and all
+        if self._linked is None:
+            self._linked = self._link(stages, keys)
+            self.Program = self._linked.name
+            self.label(" + ".join(files) or "ShaderProgram")
+        self.Program = self._linked.name
+        self.uniforms = None    # set by wait()
+        # last value set on each uniform, so unchanged values are not uploaded again
+        self._values = self._linked.values
+        self.uploads = UniformUploads()
+        self._setters = _uniform_setters()
+
+        if not deferred:
+            self.use()
+
+    def wait(self):
+        '''
+        Waits for the driver to compile and link the program, raises if that
+        failed, and looks its uniforms up. Called by the first use() or set()
+        '''
+        linked = self._linked
+        if linked.uniforms is None:
+            if not linked.checked:
+                self._shaders.check(linked)
+            if linked.binary_key is not None:
+                self.cache.store(linked.binary_key, linked.name)
+                linked.binary_key = None
+            # look every uniform up once here instead of with glGetUniformLocation each frame
+            linked.uniforms = self._active_uniforms()
+        self.uniforms = linked.uniforms
+
+    def ready(self):
+        '''Whether wait() would return without waiting for the driver, see ShaderCache.completed()'''
+        return self.uniforms is not None or self._shaders.completed(self._linked)
+
+    def _link(self, stages, keys):
+        # load the linked program from the binary cache, compile it only when that fails
+        cache = self.cache if self.cache is not None and self.cache.supported() else None
+        if cache is not None:
+            key = cache.key(*(source for _, source in stages))
+            program = cache.load(key)
+            if program is not None:
+                return self._shaders.add(keys, program, checked=True)
+        linked = self._shaders.add(keys, self._compile(stages, keys, retrievable=cache is not None))
+        if cache is not None:
+            # the binary is only there once linking is done, wait() saves it
+            linked.binary_key = key
+        return linked
+
+    def _compile(self, stages, keys, retrievable=False):
+        # compiled stages are shared with the other programs using them, and kept
+        shaders = [self._shaders.stage(stage_type, source, key) for (stage_type, source), key in zip(stages, keys)]
+
+        program = gl.glCreateProgram()
+        for shader in shaders:
+            gl.glAttachShader(program, shader)
+        if retrievable:
+            gl.glProgramParameteri(program, gl.GL_PROGRAM_BINARY_RETRIEVABLE_HINT, gl.GL_TRUE)
+        # checked by wait(), asking now would wait for the compiles and the link
+        gl.glLinkProgram(program)
+        return program
+
+    def _active_uniforms(self):
+        uniforms = {}
+        for index in range(gl.glGetProgramiv(self.Program, gl.GL_ACTIVE_UNIFORMS)):
+            name, size, uniform_type = gl.glGetActiveUniform(self.Program, index)
+            name = name.decode()
+            # arrays are reported by their first element, e.g. "lights[0]"
+            if name.endswith('[0]'):
+                name = name[:-3]
+            location = gl.glGetUniformLocation(self.Program, name)
+            # members of uniform blocks have no location of their own
+            if location == -1:
+                continue
+            uniforms[name] = Uniform(name, location, int(uniform_type), int(size))
+        return uniforms
+
+    def __del__(self):
+        self.delete()
+
+    def delete(self):
+        '''Queues the program for deletion at the end of the frame'''
+        if self._linked is not None:
+            # the program itself goes once no ShaderProgram uses it
+            self._shaders.release(self._linked)
+            self._linked = None
+            self.Program = None
+
+    def label(self, text):
+        '''Names the program in debug messages and tools'''
+        debug.label(gl.GL_PROGRAM, self.Program, text)
+
+    def use(self):
+        if self.uniforms is None:
+            self.wait()
+        state.use_program(self.Program)
+
+    def bind_block(self, name, uniform_buffer):
+        '''
+        Makes uniform block name read from uniform_buffer's binding point
+        The block's layout as linked has to match uniform_buffer.block_format,
+        member by member, so a padding mistake raises here instead of drawing garbage
+        '''
+        if self.uniforms is None:
+            self.wait()
+        index = gl.glGetUniformBlockIndex(self.Program, name)
+        if index == gl.GL_INVALID_INDEX:
+            raise Exception("ERROR::SHADER::UNIFORM_BLOCK::NOT_FOUND\n" + name)
+        mismatches = self._block_mismatches(name, index, uniform_buffer.block_format)
+        if mismatches:
+            raise Exception("ERROR::SHADER::UNIFORM_BLOCK::LAYOUT_MISMATCH\n" + "\n".join(mismatches))
+        gl.glUniformBlockBinding(self.Program, index, uniform_buffer.binding)
+
+    def _block_mismatches(self, name, index, block_format):
+        mismatches = []
+        size = np.zeros(1, np.int32)
+        gl.glGetActiveUniformBlockiv(self.Program, index, gl.GL_UNIFORM_BLOCK_DATA_SIZE, size)
+        if size[0] > block_format.itemsize:
+            mismatches.append("{}: {} bytes in the program, {} in the buffer".format(name, size[0], block_format.itemsize))
+
+        count = np.zeros(1, np.int32)
+        gl.glGetActiveUniformBlockiv(self.Program, index, gl.GL_UNIFORM_BLOCK_ACTIVE_UNIFORMS, count)
+        indices = np.zeros(count[0], np.int32)
+        gl.glGetActiveUniformBlockiv(self.Program, index, gl.GL_UNIFORM_BLOCK_ACTIVE_UNIFORM_INDICES, indices)
+        layout = {}
+        for pname in (gl.GL_UNIFORM_OFFSET, gl.GL_UNIFORM_ARRAY_STRIDE, gl.GL_UNIFORM_MATRIX_STRIDE):
+            layout[pname] = np.zeros(count[0], np.int32)
+            gl.glGetActiveUniformsiv(self.Program, count[0], indices, pname, layout[pname])
+
+        for i, uniform_index in enumerate(indices):
+            member = gl.glGetActiveUniform(self.Program, int(uniform_index))[0].decode()
+            # members of blocks with an instance name are reported as "Block.member"
+            if member.startswith(name + '.'):
+                member = member[len(name) + 1:]
+            if member.endswith('[0]'):
+                member = member[:-3]
+            if member not in block_format.names:
+                mismatches.append("{}.{}: not in the buffer".format(name, member))
+                continue
+
+            field, offset = block_format.fields[member][:2]
+            if offset != layout[gl.GL_UNIFORM_OFFSET][i]:
+                mismatches.append("{}.{}: offset {} in the program, {} in the buffer".format(
+                    name, member, layout[gl.GL_UNIFORM_OFFSET][i], offset))
+            array_stride = layout[gl.GL_UNIFORM_ARRAY_STRIDE][i]
+            if array_stride and field.shape and field.itemsize // field.shape[0] != array_stride:
+                mismatches.append("{}.{}: array stride {} in the program, {} in the buffer".format(
+                    name, member, array_stride, field.itemsize // field.shape[0]))
+            matrix_stride = layout[gl.GL_UNIFORM_MATRIX_STRIDE][i]
+            if matrix_stride and field.shape and field.base.itemsize * field.shape[-1] != matrix_stride:
+                mismatches.append("{}.{}: matrix stride {} in the program, {} in the buffer".format(
+                    name, member, matrix_stride, field.base.itemsize * field.shape[-1]))
+        return mismatches
+
+    def set(self, name, *value):
+        '''
+        Sets uniform name on this program, which has to be in use
+        Values can be given one by one, set("offset", 0.3), or as a sequence or
+        numpy array, which is also how matrices and uniform arrays are passed
+        Uniforms keep their value in the program, so a value equal to the last one
+        set is not uploaded again, and names the program does not use are dropped
+        '''
+        if self.uniforms is None:
+            self.wait()
+        uniform = self.uniforms.get(name)
+        if uniform is None:
+            self.uploads.dropped += 1
+            return
+
+        setters = self._setters.get(uniform.type)
+        if setters is None:
+            # e.g. images, set with glUniform1i by hand
+            raise Exception("ERROR::SHADER::UNIFORM::UNSUPPORTED_TYPE\n{} has GL type 0x{:04X}".format(name, uniform.type))
+        setter, array_setter, dtype, components = setters
+        if len(value) == 1 and isinstance(value[0], (list, tuple, np.ndarray)):
+            value = np.ascontiguousarray(value[0], dtype=dtype).reshape(-1)
+            shadow = value.tobytes()
+        else:
+            shadow = value
+        if not len(value) or len(value) % components:
+            raise Exception("ERROR::SHADER::UNIFORM::WRONG_SIZE\n{} takes a multiple of {} values, got {}".format(
+                name, components, len(value)))
+
+        if self._values.get(name) == shadow:
+            self.uploads.skipped += 1
+            return
+        self._values[name] = shadow
+        self.uploads.issued += 1
+
+        if setter is not None and shadow is value and len(value) == components:
+            setter(uniform.location, *value)
+            return
+
+        value = np.ascontiguousarray(value, dtype=dtype).reshape(-1)
+        array_setter(uniform.location, value.size // components, value)
+
+# geometry shader input -> vertices drawn to warm a program up with
+_WARM_UP_PRIMITIVES = {
+    gl.GL_POINTS: 1,
+    gl.GL_LINES: 2,
+    gl.GL_LINES_ADJACENCY: 4,
+    gl.GL_TRIANGLES: 3,
+    gl.GL_TRIANGLES_ADJACENCY: 6,
+}
+
+def compile_programs(sources, warm=True, vertex_array=None):
+    '''
+    ShaderPrograms made from each tuple of ShaderProgram arguments in sources,
+    all handed to the driver before any is checked, so with parallel shader
+    compile they compile at the same time. With warm, they are then warmed up,
+    see warm_up(), otherwise each is waited for when first used
+    '''
+    shader_cache.current().parallel()
+    programs = [ShaderProgram(*arguments, deferred=True) for arguments in sources]
+    if warm:
+        warm_up(programs, vertex_array)
+    return programs
+
+def warm_up(programs, vertex_array=None):
+    '''
+    Waits for each program and draws once with it into a 1x1 offscreen target:
+    drivers may finish compiling a program for the state it is drawn with on
+    its first draw, which would otherwise stall the first frame. Some, like
+    llvmpipe, compile for the vertex layout too: given the VAO the programs
+    will draw, warming up draws with its attributes
+    '''
+    framebuffers = (gl.glGetIntegerv(gl.GL_DRAW_FRAMEBUFFER_BINDING), gl.glGetIntegerv(gl.GL_READ_FRAMEBUFFER_BINDING))
+    viewport = gl.glGetIntegerv(gl.GL_VIEWPORT)
+    target = Framebuffer(1, 1)
+    # without one, no attributes, the vertex shaders read their inputs' default values
+    vao = vertex_array or VAO()
+    try:
+        gl.glViewport(0, 0, 1, 1)
+        vao.bind()
+        for program in programs:
+            program.use()
+            primitive = gl.GL_POINTS
+            if any(stage_type == gl.GL_GEOMETRY_SHADER for stage_type, _ in program._linked.keys):
+                primitive = gl.glGetProgramiv(program.Program, gl.GL_GEOMETRY_INPUT_TYPE)
+            gl.glDrawArrays(primitive, 0, _WARM_UP_PRIMITIVES[primitive])
+    finally:
+        # also when a program failed to compile, wait() raising its error
+        if vertex_array is None:
+            vao.delete()
+        target.delete()
+        gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, framebuffers[0])
+        gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, framebuffers[1])
+        gl.glViewport(*viewport)
@@ -0,0 +1,179 @@
+'''
+Compiled shader stages and linked programs shared within a context
+
+5.8.3 makes two programs from the same vertex shader source, and a scene with
+many materials makes many programs from a handful of stages. A ShaderCache
+compiles each stage, keyed by its type and a hash of its source, once per
+context and keeps the shader object alive for every program that uses it,
+instead of compiling it anew for each program and deleting it after linking.
+
+Programs are shared too: a ShaderProgram made from the same stages as one
+still alive uses the same linked program, along with its uniform locations
+and the values last set on them, which belong to the GL program and not to
+either ShaderProgram. The program is deleted once no ShaderProgram uses it;
+stages stay until the context is torn down.
+
+Stages are compiled and programs linked without asking the driver how that
+went: querying GL_COMPILE_STATUS right after glCompileShader makes it finish
+that compile before the next one can start. check() asks once the program is
+needed. With GL_KHR_parallel_shader_compile, see parallel(), the driver
+compiles on threads of its own meanwhile and completed() says, without
+waiting, whether a program is done.
+
+current() is the cache of the current context, a new context gets a new one.
+'''
+
+import ctypes
+import hashlib
+
+from OpenGL import GL as gl
+from OpenGL.GL.ARB.parallel_shader_compile import glMaxShaderCompilerThreadsARB
+from OpenGL.GL.KHR.parallel_shader_compile import GL_COMPLETION_STATUS_KHR, glMaxShaderCompilerThreadsKHR
+# unwrapped, the wrapped glGetProgramiv does not know GL_COMPLETION_STATUS_KHR
+from OpenGL.raw.GL.VERSION.GL_2_0 import glGetProgramiv
+
+from . import resources
+
+# stage type -> name in error messages
+STAGES = {
+    gl.GL_VERTEX_SHADER: 'VERTEX',
+    gl.GL_FRAGMENT_SHADER: 'FRAGMENT',
+    gl.GL_GEOMETRY_SHADER: 'GEOMETRY',
+}
+
+class LinkedProgram:
+    '''A linked program and what the ShaderPrograms sharing it share'''
+    __slots__ = ('name', 'keys', 'checked', 'uniforms', 'values', 'users', 'binary_key')
+
+    def __init__(self, name, keys, checked=False):
+        self.name = name
+        self.keys = keys            # its stages' keys
+        self.checked = checked      # compiled and linked without errors, as far as check() knows
+        self.uniforms = None        # name -> Uniform, looked up once checked
+        self.values = {}            # uniform name -> value last set
+        self.users = 1
+        self.binary_key = None      # the program binary cache key to save it under once linked
+
+class ShaderCache:
+    def __init__(self, registry):
+        self.registry = registry
+        self.stages = {}            # (stage type, source hash) -> shader object
+        self.programs = {}          # stage keys -> LinkedProgram
+        self.compiled = 0           # stages compiled
+        self.stage_hits = 0         # stages found compiled already
+        self.linked = 0             # programs added, linked or loaded from a binary
+        self.program_hits = 0       # programs found linked already
+        self._unchecked = set()     # keys of the stages compiled and not checked yet
+        self._failed = {}           # keys of the stages that failed to compile -> their error
+        self._parallel = None
+
+    @staticmethod
+    def key(stage_type, source):
+        return stage_type, hashlib.sha256(source.encode()).hexdigest()
+
+    def parallel(self):
+        '''
+        Whether the driver compiles on threads of its own, with GL_KHR or
+        GL_ARB_parallel_shader_compile; the first call lets it use as many as it likes
+        '''
+        if self._parallel is None:
+            extensions = {gl.glGetStringi(gl.GL_EXTENSIONS, i) for i in range(gl.glGetIntegerv(gl.GL_NUM_EXTENSIONS))}
+            if b'GL_KHR_parallel_shader_compile' in extensions:
+                glMaxShaderCompilerThreadsKHR(0xFFFFFFFF)
+            elif b'GL_ARB_parallel_shader_compile' in extensions:
+                glMaxShaderCompilerThreadsARB(0xFFFFFFFF)
+            else:
+                self._parallel = False
+                return False
+            self._parallel = True
+        return self._parallel
+
+    def stage(self, stage_type, source, key=None):
+        '''The shader object of source as a stage_type stage, compiled the first time and checked by check()'''
+        key = key or self.key(stage_type, source)
+        shader = self.stages.get(key)
+        if shader is not None:
+            self.stage_hits += 1
+            return shader
+
+        shader = gl.glCreateShader(stage_type)
+        gl.glShaderSource(shader, source)
+        gl.glCompileShader(shader)
+        self.stages[key] = shader
+        self._unchecked.add(key)
+        self.registry.created('shader', shader)
+        self.compiled += 1
+        return shader
+
+    def completed(self, linked):
+        '''Whether checking linked would not wait for the driver, always True without parallel()'''
+        if linked.checked or not self.parallel():
+            return True
+        status = gl.GLint()
+        glGetProgramiv(linked.name, GL_COMPLETION_STATUS_KHR, ctypes.byref(status))
+        return bool(status.value)
+
+    def check(self, linked):
+        '''
+        Raises the errors compiling the stages of linked or linking it, waiting
+        for the driver to finish. A program that failed is no longer handed out,
+        and deleted once its users are
+        '''
+        try:
+            for key in linked.keys:
+                if key in self._unchecked:
+                    self._check_stage(key)
+                if key in self._failed:
+                    raise Exception(self._failed[key])
+            if not gl.glGetProgramiv(linked.name, gl.GL_LINK_STATUS):
+                infoLog = gl.glGetProgramInfoLog(linked.name).decode()
+                raise Exception("ERROR::SHADER::PROGRAM::LINKING_FAILED\n" + infoLog)
+        except Exception:
+            if self.programs.get(linked.keys) is linked:
+                del self.programs[linked.keys]
+            raise
+        linked.checked = True
+
+    def _check_stage(self, key):
+        self._unchecked.discard(key)
+        shader = self.stages[key]
+        if not gl.glGetShaderiv(shader, gl.GL_COMPILE_STATUS):
+            infoLog = gl.glGetShaderInfoLog(shader).decode()
+            # kept, every program linked with it raises this rather than failing to link
+            self._failed[key] = "ERROR::SHADER::" + STAGES[key[0]] + "::COMPILATION_FAILED\n" + infoLog
+
+    def program(self, keys):
+        '''The LinkedProgram of the stages with keys, counting one more user, or None'''
+        linked = self.programs.get(keys)
+        if linked is not None:
+            linked.users += 1
+            self.program_hits += 1
+        return linked
+
+    def add(self, keys, name, checked=False):
+        '''Registers program name, linked from the stages with keys, with its first user'''
+        linked = self.programs[keys] = LinkedProgram(name, keys, checked)
+        self.registry.created('program', name)
+        self.linked += 1
+        return linked
+
+    def release(self, linked):
+        '''One user less, the program is queued for deletion after the last'''
+        linked.users -= 1
+        if linked.users == 0:
+            if self.programs.get(linked.keys) is linked:
+                del self.programs[linked.keys]
+            self.registry.release('program', linked.name)
+
+    def stats(self):
+        return {'stages': len(self.stages), 'compiled': self.compiled, 'stage_hits': self.stage_hits,
+                'programs': len(self.programs), 'linked': self.linked, 'program_hits': self.program_hits}
+
+_current = None
+
+def current():
+    '''The ShaderCache of the current context'''
+    global _current
+    if _current is None or _current.registry is not resources.current:
+        _current = ShaderCache(resources.current)
+    return _current
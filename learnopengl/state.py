@@ -0,0 +1,175 @@
+'''
+Shadow copy of the GL bindings used in the draw path
+
+The chapter scripts bind the same program and vertex array every frame, and
+unbind them again afterwards only for the next frame to bind them once more.
+Binding through here remembers what is bound and skips the GL call when it
+would not change anything.
+
+The element array buffer binding belongs to the bound vertex array, so it is
+remembered per vertex array. Anything bound with gl.glBind* directly, behind
+the cache's back, has to be followed by invalidate().
+
+Indexed binding points, as bound by glBindBufferBase, are remembered too, but
+only once bound through here: what a fresh context has bound to them is taken
+as unknown.
+
+With LEARNOPENGL_STATE_DEBUG=1, the default with LEARNOPENGL_DEBUG=1, every
+call checks the shadow copy against glGetIntegerv and raises on a mismatch.
+'''
+
+import os
+
+from OpenGL import GL as gl
+
+from . import DEBUG
+
+# buffer target -> glGetIntegerv query for what is bound to it
+_BUFFER_BINDINGS = {
+    gl.GL_ARRAY_BUFFER: gl.GL_ARRAY_BUFFER_BINDING,
+    gl.GL_ELEMENT_ARRAY_BUFFER: gl.GL_ELEMENT_ARRAY_BUFFER_BINDING,
+    gl.GL_UNIFORM_BUFFER: gl.GL_UNIFORM_BUFFER_BINDING,
+    gl.GL_COPY_READ_BUFFER: gl.GL_COPY_READ_BUFFER_BINDING,
+    gl.GL_COPY_WRITE_BUFFER: gl.GL_COPY_WRITE_BUFFER_BINDING,
+}
+
+def _name(obj):
+    # GL object names come both as ints and as ctypes GLuints
+    return getattr(obj, 'value', obj)
+
+class GLState:
+    def __init__(self, debug=False):
+        self.debug = debug
+        self.issued = 0     # calls passed on to GL
+        self.skipped = 0    # calls that would not have changed anything
+        self.reset()
+
+    def reset(self):
+        '''State of a freshly created context, where nothing is bound'''
+        self.program = 0
+        self.vertex_array = 0
+        self.buffers = {target: 0 for target in _BUFFER_BINDINGS if target != gl.GL_ELEMENT_ARRAY_BUFFER}
+        self.element_buffers = {0: 0}   # vertex array -> its element array buffer
+        self.indexed_buffers = {}       # (target, index) -> buffer
+
+    def invalidate(self):
+        '''Forget everything, the next bind of each kind always reaches GL'''
+        self.program = None
+        self.vertex_array = None
+        self.buffers = {}
+        self.element_buffers = {}
+        self.indexed_buffers = {}
+
+    def use_program(self, program):
+        program = _name(program)
+        if program == self.program:
+            self.skipped += 1
+        else:
+            gl.glUseProgram(program)
+            self.program = program
+            self.issued += 1
+        if self.debug:
+            self.check()
+
+    def bind_vertex_array(self, vertex_array):
+        vertex_array = _name(vertex_array)
+        if vertex_array == self.vertex_array:
+            self.skipped += 1
+        else:
+            gl.glBindVertexArray(vertex_array)
+            self.vertex_array = vertex_array
+            self.issued += 1
+        if self.debug:
+            self.check()
+
+    def bind_buffer(self, target, buffer):
+        buffer = _name(buffer)
+        if target == gl.GL_ELEMENT_ARRAY_BUFFER:
+            bound = self.element_buffers.get(self.vertex_array)
+        else:
+            bound = self.buffers.get(target)
+
+        if buffer == bound:
+            self.skipped += 1
+        else:
+            gl.glBindBuffer(target, buffer)
+            if target != gl.GL_ELEMENT_ARRAY_BUFFER:
+                self.buffers[target] = buffer
+            elif self.vertex_array is not None:
+                self.element_buffers[self.vertex_array] = buffer
+            self.issued += 1
+        if self.debug:
+            self.check()
+
+    def bind_buffer_base(self, target, index, buffer):
+        '''glBindBufferBase, which binds buffer to target as well as to binding point index of target'''
+        buffer = _name(buffer)
+        if self.indexed_buffers.get((target, index)) == buffer and self.buffers.get(target) == buffer:
+            self.skipped += 1
+        else:
+            gl.glBindBufferBase(target, index, buffer)
+            self.indexed_buffers[target, index] = buffer
+            self.buffers[target] = buffer
+            self.issued += 1
+        if self.debug:
+            self.check()
+
+    def deleted_buffer(self, buffer):
+        '''Call after glDeleteBuffers, deleting a bound buffer unbinds it'''
+        self.deleted_buffers([buffer])
+
+    def deleted_buffers(self, buffers):
+        '''deleted_buffer for many buffers deleted at once'''
+        buffers = {_name(buffer) for buffer in buffers}
+        for target, bound in self.buffers.items():
+            if bound in buffers:
+                self.buffers[target] = 0
+        for vertex_array, bound in self.element_buffers.items():
+            if bound in buffers:
+                # only the bound vertex array lets go of it, others keep using the deleted name
+                self.element_buffers[vertex_array] = 0 if vertex_array == self.vertex_array else None
+        for binding, bound in list(self.indexed_buffers.items()):
+            if bound in buffers:
+                del self.indexed_buffers[binding]
+
+    def deleted_vertex_array(self, vertex_array):
+        '''Call after glDeleteVertexArrays, deleting the bound vertex array binds 0'''
+        vertex_array = _name(vertex_array)
+        self.element_buffers.pop(vertex_array, None)
+        if vertex_array == self.vertex_array:
+            self.vertex_array = 0
+
+    def check(self):
+        '''Raises if the shadow copy differs from what GL reports'''
+        actual = {'program': gl.glGetIntegerv(gl.GL_CURRENT_PROGRAM),
+                  'vertex array': gl.glGetIntegerv(gl.GL_VERTEX_ARRAY_BINDING),
+                  'element array buffer': gl.glGetIntegerv(gl.GL_ELEMENT_ARRAY_BUFFER_BINDING)}
+        expected = {'program': self.program,
+                    'vertex array': self.vertex_array,
+                    'element array buffer': self.element_buffers.get(self.vertex_array)}
+        for target, binding in _BUFFER_BINDINGS.items():
+            if target != gl.GL_ELEMENT_ARRAY_BUFFER:
+                actual[hex(target)] = gl.glGetIntegerv(binding)
+                expected[hex(target)] = self.buffers.get(target)
+        for (target, index), buffer in self.indexed_buffers.items():
+            actual['{} {}'.format(hex(target), index)] = gl.glGetIntegeri_v(_BUFFER_BINDINGS[target], index)
+            expected['{} {}'.format(hex(target), index)] = buffer
+
+        for what, value in expected.items():
+            # None means unknown, anything GL says is fine
+            if value is not None and value != actual[what]:
+                raise Exception("ERROR::STATE::MISMATCH\n{}: cached {}, bound {}".format(what, value, actual[what]))
+
+    def reset_counts(self):
+        '''Returns (issued, skipped) since the last call and starts counting again'''
+        counts = (self.issued, self.skipped)
+        self.issued = self.skipped = 0
+        return counts
+
+# bindings of the current context, reset by create_window for each new context
+current = GLState(debug=os.environ.get('LEARNOPENGL_STATE_DEBUG', '1' if DEBUG else '0') == '1')
+
+use_program = current.use_program
+bind_vertex_array = current.bind_vertex_array
+bind_buffer = current.bind_buffer
+bind_buffer_base = current.bind_buffer_base
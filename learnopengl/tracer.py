@@ -0,0 +1,280 @@
+'''
+Counts of the GL calls each frame makes, and which of them were wasted
+
+A GLTracer stands in for the OpenGL.GL module the scripts and helper classes
+import as gl. install() puts it in place of gl in every module that has
+imported it, and every gl* function it hands out counts its calls, per frame
+between begin_frame() and end_frame(), and the time spent in them.
+
+Calls that set state, binds, uniforms, glEnable and the like, are checked
+against what the tracer saw set before:
+    redundant   the same value was set before and nothing was drawn since,
+                the first call was for nothing
+    unchanged   the state already had that value, drawn with or not, the
+                call changed nothing (a superset of redundant)
+What the tracer saw is forgotten on glDelete* and glLinkProgram, so an object
+whose name is reused is not taken for the old one.
+
+report() lists the entry points with the most calls per frame, with an
+estimate of what PyOpenGL's Python wrapper adds to each call: the last call
+of each state setting or draw entry point is replayed through PyOpenGL and
+through the plain ctypes function underneath, which only works for arguments
+ctypes takes as they are.
+
+create_window() installs a tracer, window.tracer, when $LEARNOPENGL_TRACE=1,
+and terminate() prints the report of the top $LEARNOPENGL_TRACE_TOP (20)
+entry points to stderr.
+'''
+
+import ctypes
+import sys
+import time
+
+from OpenGL import GL as gl
+from OpenGL.platform.baseplatform import _NullFunctionPointer
+import numpy as np
+
+from . import state
+
+# entry point -> how many of its first arguments say which state it sets, the
+# rest of them are the value. Texture and element array buffer bindings, and
+# uniforms, also depend on the active texture unit, vertex array or program
+_STATE = {
+    'glUseProgram': 0,
+    'glBindVertexArray': 0,
+    'glBindBuffer': 1,
+    'glBindBufferBase': 2,
+    'glBindBufferRange': 2,
+    'glBindTexture': 1,
+    'glBindFramebuffer': 1,
+    'glBindRenderbuffer': 1,
+    'glActiveTexture': 0,
+    'glClearColor': 0,
+    'glClearDepth': 0,
+    'glViewport': 0,
+    'glBlendFunc': 0,
+    'glDepthFunc': 0,
+    'glDepthMask': 0,
+    'glCullFace': 0,
+    'glPolygonMode': 1,
+    'glLineWidth': 0,
+    'glPointSize': 0,
+}
+
+# the calls that use what state was set
+_DRAWS = ('glDraw', 'glMultiDraw', 'glClear', 'glBlitFramebuffer', 'glDispatchCompute')
+# the calls after which names can be reused or uniforms are reset
+_FORGET = ('glDelete', 'glLinkProgram')
+
+# calls of each entry point replayed for the wrapper overhead estimate
+REPLAYS = 200
+
+def _value(arg):
+    # something hashable that compares equal when arg sets the same state
+    if isinstance(arg, np.ndarray):
+        return arg.dtype.str, arg.tobytes()
+    if isinstance(arg, (list, tuple)):
+        return tuple(_value(item) for item in arg)
+    return getattr(arg, 'value', arg)
+
+def _raw(function):
+    '''The ctypes function underneath a PyOpenGL entry point, or None'''
+    while hasattr(function, 'wrappedOperation'):
+        function = function.wrappedOperation
+    if isinstance(function, _NullFunctionPointer):
+        return function.load()
+    return function if isinstance(function, ctypes._CFuncPtr) else None
+
+def _raw_arg(arg):
+    # numpy arrays as the C arrays ctypes takes for pointers, the rest as they are
+    if isinstance(arg, np.ndarray):
+        return np.ctypeslib.as_ctypes(np.ascontiguousarray(arg).reshape(-1))
+    return arg
+
+class EntryPoint:
+    '''What the tracer counted for one gl* function'''
+    __slots__ = ('name', 'function', 'calls', 'max_frame_calls', 'outside_frames',
+                 'redundant', 'unchanged', 'ns', 'last', 'pending')
+
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+        self.calls = 0              # in frames
+        self.max_frame_calls = 0
+        self.outside_frames = 0     # setup and teardown
+        self.redundant = 0
+        self.unchanged = 0
+        self.ns = 0                 # time spent in the calls made in frames
+        self.last = None            # (args, program, vertex array) of the last call
+        self.pending = 0            # calls since the last begin_frame() or end_frame()
+
+class GLTracer:
+    '''Stands in for the OpenGL.GL module, counting the calls made through it'''
+
+    def __init__(self):
+        self.entry_points = {}      # name -> EntryPoint
+        self.frames = 0
+        self._modules = []          # the modules install() put the tracer in
+        self._in_frame = False
+        self._pending_ns = {}       # name -> time spent since the last begin_frame() or end_frame()
+        self._values = {}           # state key -> the value last set
+        self._since_draw = set()    # state keys set since the last draw
+        self._program = 0
+        self._vertex_array = 0
+        self._unit = gl.GL_TEXTURE0
+
+    def __getattr__(self, name):
+        attr = getattr(gl, name)
+        if not (name.startswith('gl') and callable(attr)):
+            return attr
+        entry = self.entry_points[name] = EntryPoint(name, attr)
+        setter = _STATE.get(name)
+        if name.startswith('glUniform'):
+            setter = 'uniform'
+        elif name in ('glEnable', 'glDisable'):
+            setter = 'enable'
+        draw = name.startswith(_DRAWS)
+        forget = name.startswith(_FORGET)
+        pending_ns = self._pending_ns
+        pending_ns[name] = 0
+
+        def traced(*args, **kwargs):
+            entry.pending += 1
+            if setter is not None:
+                self._set(entry, setter, args)
+            elif draw:
+                entry.last = (args, self._program, self._vertex_array)
+                self._since_draw.clear()
+            elif forget:
+                self._values.clear()
+                self._since_draw.clear()
+            start = time.perf_counter_ns()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                pending_ns[name] += time.perf_counter_ns() - start
+        setattr(self, name, traced)
+        return traced
+
+    def _set(self, entry, setter, args):
+        name = entry.name
+        if setter == 'uniform':
+            key, value = (name, self._program, _value(args[0])), _value(args[1:])
+        elif setter == 'enable':
+            key, value = ('glEnable', _value(args[0])), name == 'glEnable'
+        else:
+            key, value = (name,) + tuple(_value(arg) for arg in args[:setter]), _value(args[setter:])
+            if name == 'glBindTexture':
+                key += (self._unit,)
+            elif name == 'glBindBuffer' and key[1] == gl.GL_ELEMENT_ARRAY_BUFFER:
+                key += (self._vertex_array,)
+        entry.last = (args, self._program, self._vertex_array)
+
+        if key in self._values and self._values[key] == value:
+            entry.unchanged += self._in_frame
+            entry.redundant += self._in_frame and key in self._since_draw
+        self._values[key] = value
+        self._since_draw.add(key)
+        if name == 'glUseProgram':
+            self._program = value[0]
+        elif name == 'glBindVertexArray':
+            self._vertex_array = value[0]
+        elif name == 'glActiveTexture':
+            self._unit = value[0]
+
+    def install(self):
+        '''Puts the tracer in place of gl in every module that imported OpenGL.GL as gl'''
+        # not this module, the tracer itself calls the real functions
+        self._modules = [module for module in list(sys.modules.values())
+                         if getattr(module, 'gl', None) is gl and module is not sys.modules[__name__]]
+        for module in self._modules:
+            module.gl = self
+
+    def uninstall(self):
+        for module in self._modules:
+            if module.gl is self:
+                module.gl = gl
+        self._modules = []
+
+    def begin_frame(self):
+        '''Calls from here to end_frame() count as the frame's, those before as setup'''
+        self._take(False)
+        self._in_frame = True
+
+    def end_frame(self):
+        self._take(True)
+        self._in_frame = False
+        self.frames += 1
+
+    def _take(self, in_frame):
+        for entry in self.entry_points.values():
+            if in_frame:
+                entry.calls += entry.pending
+                entry.max_frame_calls = max(entry.max_frame_calls, entry.pending)
+                entry.ns += self._pending_ns[entry.name]
+            else:
+                entry.outside_frames += entry.pending
+            entry.pending = self._pending_ns[entry.name] = 0
+
+    def wrapper_overhead(self, entry):
+        '''
+        Microseconds PyOpenGL adds to a call of entry, from replaying its last call,
+        or None when it is not replayed or ctypes does not take its arguments
+        '''
+        if entry.last is None:
+            return None
+        args, program, vertex_array = entry.last
+        raw = _raw(entry.function)
+        if raw is None:
+            return None
+        raw_args = [_raw_arg(arg) for arg in args]
+        try:
+            # what a uniform or draw call went to when it was made
+            gl.glUseProgram(program)
+            gl.glBindVertexArray(vertex_array)
+            start = time.perf_counter()
+            for _ in range(REPLAYS):
+                entry.function(*args)
+            wrapped = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(REPLAYS):
+                raw(*raw_args)
+            unwrapped = time.perf_counter() - start
+        except (ctypes.ArgumentError, TypeError, gl.GLError):
+            return None
+        finally:
+            # the replays bound behind the state cache's back
+            state.current.invalidate()
+        return max(wrapped - unwrapped, 0.0) / REPLAYS * 1e6
+
+    def summary(self, top=None):
+        '''
+        Per entry point called in frames, most calls first: calls per frame,
+        the most in one frame, redundant and unchanged calls per frame, calls
+        outside frames and microseconds per call
+        '''
+        frames = max(self.frames, 1)
+        entries = sorted((entry for entry in self.entry_points.values() if entry.calls),
+                         key=lambda entry: (-entry.calls, -entry.ns))[:top]
+        return {entry.name: {'per_frame': entry.calls / frames, 'max_per_frame': entry.max_frame_calls,
+                             'redundant_per_frame': entry.redundant / frames,
+                             'unchanged_per_frame': entry.unchanged / frames,
+                             'outside_frames': entry.outside_frames, 'us_per_call': entry.ns / entry.calls * 1e-3}
+                for entry in entries}
+
+    def report(self, top=20):
+        '''The top entry points by calls per frame as a table, call while the context is current'''
+        summary = self.summary(top)
+        calls = sum(entry.calls for entry in self.entry_points.values())
+        redundant = sum(entry.redundant for entry in self.entry_points.values())
+        lines = ["{} frames, {:.1f} GL calls per frame, {:.1f} redundant".format(
+                     self.frames, calls / max(self.frames, 1), redundant / max(self.frames, 1)),
+                 "{:<28} {:>9} {:>5} {:>9} {:>9} {:>8} {:>8}".format(
+                     'entry point', 'per frame', 'max', 'redundant', 'unchanged', 'us/call', 'wrapper')]
+        for name, stats in summary.items():
+            overhead = self.wrapper_overhead(self.entry_points[name])
+            lines.append("{:<28} {:9.1f} {:5d} {:9.1f} {:9.1f} {:8.2f} {:>8}".format(
+                name, stats['per_frame'], stats['max_per_frame'], stats['redundant_per_frame'],
+                stats['unchanged_per_frame'], stats['us_per_call'],
+                '-' if overhead is None else '{:.2f}'.format(overhead)))
+        return "\n".join(lines)
@@ -0,0 +1,124 @@
+'''
+Uniform buffers for data shared by several programs
+
+Values every program needs each frame, like the time or a colour, go in one
+uniform block declared with the std140 layout in each shader that uses them
+
+    layout (std140) uniform Frame
+    {
+        float time;
+        vec4 ourColor;
+    };
+
+std140() builds the numpy dtype with that block's layout, a UniformBuffer
+holds one such record and is bound to a binding point, and
+ShaderProgram.bind_block() checks a program's block against the dtype and
+points the block at the binding point. Setting a value then means one upload
+per frame for all programs instead of one glUniform call per program.
+'''
+
+from OpenGL import GL as gl
+import numpy as np
+
+from . import state
+from .buffers import VBO
+
+# GLSL type -> (numpy type, shape, std140 base alignment in bytes)
+# matrices are stored column by column, each column padded to a vec4
+_STD140_TYPES = {
+    'float': (np.float32, (), 4),
+    'vec2':  (np.float32, (2,), 8),
+    'vec3':  (np.float32, (3,), 16),
+    'vec4':  (np.float32, (4,), 16),
+    'int':   (np.int32, (), 4),
+    'ivec2': (np.int32, (2,), 8),
+    'ivec3': (np.int32, (3,), 16),
+    'ivec4': (np.int32, (4,), 16),
+    'uint':  (np.uint32, (), 4),
+    'uvec2': (np.uint32, (2,), 8),
+    'uvec3': (np.uint32, (3,), 16),
+    'uvec4': (np.uint32, (4,), 16),
+    'bool':  (np.int32, (), 4),
+    'bvec2': (np.int32, (2,), 8),
+    'bvec3': (np.int32, (3,), 16),
+    'bvec4': (np.int32, (4,), 16),
+    'mat2':  (np.float32, (2, 4), 16),
+    'mat3':  (np.float32, (3, 4), 16),
+    'mat4':  (np.float32, (4, 4), 16),
+}
+
+def _round_up(value, alignment):
+    return (value + alignment - 1) // alignment * alignment
+
+def std140(members):
+    '''
+    numpy dtype of a std140 uniform block with members, a list of
+    (name, GLSL type) or (name, GLSL type, array length) in declaration order.
+    Matrix fields hold the columns, so assign m.T for a row major numpy m. Arrays
+    pad every element to 16 bytes, which a numpy field can only show for
+    elements that fill 16 bytes already, so arrays have to be of 4 component
+    vectors or of matrices
+    '''
+    names, formats, offsets = [], [], []
+    offset = 0
+    for member in members:
+        name, glsl_type, length = (tuple(member) + (None,))[:3]
+        if glsl_type not in _STD140_TYPES:
+            raise Exception("ERROR::UNIFORM_BUFFER::LAYOUT\nno std140 layout for " + glsl_type)
+        base, shape, alignment = _STD140_TYPES[glsl_type]
+        size = np.dtype((base, shape)).itemsize
+        if length is not None:
+            if size % 16:
+                raise Exception("ERROR::UNIFORM_BUFFER::LAYOUT\n{} {}[{}]: std140 pads array elements "
+                                "to 16 bytes, use a vec4 array".format(glsl_type, name, length))
+            shape = (length,) + shape
+            size *= length
+            alignment = 16
+        offset = _round_up(offset, alignment)
+        names.append(name)
+        formats.append((base, shape) if shape else base)
+        offsets.append(offset)
+        offset += size
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets,
+                     'itemsize': _round_up(offset, 16)})
+
+class UniformBuffer(VBO):
+    '''
+    One uniform block's worth of data in block_format, e.g. from std140(), read
+    by every program whose block is bound to binding. Values are set by member,
+    ubo['time'] = t, and reach the buffer with flush()
+    '''
+    __slots__ = ('block_format', 'binding', 'uploads', '_uploaded')
+
+    _buffer_type = gl.GL_UNIFORM_BUFFER
+
+    def __init__(self, block_format, binding, usage=gl.GL_DYNAMIC_DRAW):
+        self.block_format = np.dtype(block_format)
+        self.binding = binding
+        self.uploads = 0
+        super().__init__(np.zeros(1, self.block_format), usage, keep=True)
+        # what the buffer holds, so an unchanged block is not uploaded again
+        self._uploaded = self.data.tobytes()
+        self.label("UniformBuffer binding {}".format(binding))
+        self.bind_base()
+
+    def __getitem__(self, name):
+        return self.data[0][name]
+
+    def __setitem__(self, name, value):
+        self.data[name] = value
+
+    def bind_base(self):
+        '''Binds the buffer to its binding point, needed again only if something else was bound there'''
+        state.bind_buffer_base(self._buffer_type, self.binding, self._vbo)
+
+    def flush(self):
+        '''Uploads the block if any value changed since the last flush, returns the number of uploads'''
+        block = self.data.tobytes()
+        if block == self._uploaded:
+            return 0
+        self.bind()
+        gl.glBufferSubData(self._buffer_type, 0, len(block), block)
+        self._uploaded = block
+        self.uploads += 1
+        return 1
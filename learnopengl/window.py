@@ -0,0 +1,486 @@
+'''
+Translated from source code from https://learnopengl.com/
+
+Window
+Creates the window and OpenGL 3.3 core context the chapter scripts render into
+Some differences exist between solution code, pdf description, and this code
+
+The backend is chosen with $LEARNOPENGL_BACKEND:
+    glfw    a GLFW window, as in the tutorial (default)
+    egl     headless, Mesa's surfaceless EGL platform
+    osmesa  headless, OSMesa software rendering
+The headless backends render into an offscreen framebuffer and close the window
+after $LEARNOPENGL_FRAMES frames (100 when not set), so the scripts can run on
+machines without a display or GPU, e.g. with llvmpipe. The GLFW backend only
+stops after a set number of frames when $LEARNOPENGL_FRAMES is given.
+
+window.startup holds the seconds startup took once the first frame is swapped:
+from importing learnopengl to create_window, creating the window and context,
+drawing the first frame, and all of it. $LEARNOPENGL_STARTUP_REPORT=1 prints
+them to stderr.
+
+$LEARNOPENGL_DEBUG_OUTPUT, or $LEARNOPENGL_DEBUG=1, gives the window a debug
+context and a DebugLayer, window.debug, see debug.py.
+
+Polling and waiting for events and swapping buffers are timed as stages of
+profiler.current, see profiler.py. $LEARNOPENGL_TRACE=1 counts the GL calls of
+each frame with a GLTracer, window.tracer, see tracer.py, and prints what it
+found on terminate().
+
+$LEARNOPENGL_RENDER_MODE picks how the render loop, `while window.next_frame()`,
+runs:
+    continuous  a frame every time round, as in the tutorial (default)
+    on_demand   sleep until input, a resize, invalidate() or the animation clock
+                set with animate() calls for a new frame, so an idle window
+                uses no CPU. Headless windows get no input, so only the
+                animation clock, invalidate() or close() wake them
+
+Original work Copyright (c) 2015 Joey de Vries
+Modified work Copyright (c) 2018 Julia Read
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+'''
+
+import ctypes
+import os
+import sys
+import threading
+import time
+
+from . import BACKEND
+from . import DEBUG
+from . import IMPORTED
+from . import debug
+from . import profiler
+from . import resources
+from . import state
+from . import tracer
+from .framebuffer import Framebuffer
+
+from OpenGL import GL as gl
+
+HEADLESS_FRAMES = 100
+
+RENDER_MODES = ('continuous', 'on_demand')
+
+class Window:
+    '''What the render loop needs from a window, whichever backend provides it'''
+
+    resources = None    # the context's ResourceRegistry, set by create_window
+    debug = None        # the context's DebugLayer, if create_window set one up
+    tracer = None       # the GLTracer counting GL calls, if create_window installed one
+
+    def __init__(self, width, height, frames=None):
+        self.width, self.height = width, height
+        self.frames = frames    # None: run until closed
+        self.frame = 0
+        self._start = time.perf_counter()
+        self.startup = None     # seconds per startup stage, set by the first swap_buffers
+        self._created = self._ready = self._start   # create_window knows better
+
+        self.render_mode = 'continuous'
+        self.dirty = True               # on demand: something changed since the last frame
+        self.animation_interval = None  # on demand: seconds between frames while animating
+        self._next_animation = None
+        self._closing = False
+        self._wake = threading.Event()
+
+        self.render_targets = []        # offscreen targets resized along with the window
+        self._resize_callback = None
+        self._pending_size = None       # latest framebuffer size not applied yet
+
+    def should_close(self):
+        return self._closing or (self.frames is not None and self.frame >= self.frames)
+
+    def close(self):
+        '''Makes the render loop stop, can be called from any thread'''
+        self._closing = True
+        self.wake()
+
+    def next_frame(self):
+        '''
+        Returns True when the next frame is to be drawn, False when the window should close
+        On demand this blocks until something calls for a frame
+        '''
+        if self.tracer is not None:
+            self.tracer.begin_frame()
+        with profiler.current.scope('poll_events'):
+            self.poll_events()
+        self._apply_resize()
+        if self.render_mode == 'on_demand':
+            while not self.should_close() and not self._frame_due():
+                with profiler.current.scope('wait_events'):
+                    self.wait_events(self._time_to_animation())
+                self._apply_resize()
+        self.dirty = False
+        return not self.should_close()
+
+    def resize(self, width, height):
+        '''
+        Records a new framebuffer size, which the next next_frame() applies: any
+        number of resizes between two frames cost one resize of the render targets
+        and one call of the window size callback
+        '''
+        self._pending_size = (width, height)
+        self.invalidate()
+
+    def add_render_target(self, target):
+        '''Resizes target, anything with resize(width, height), along with the window'''
+        self.render_targets.append(target)
+
+    def _apply_resize(self):
+        if self._pending_size is None:
+            return
+        (self.width, self.height), self._pending_size = self._pending_size, None
+        for target in self.render_targets:
+            target.resize(self.width, self.height)
+        if self._resize_callback is not None:
+            self._resize_callback(self._callback_window(), self.width, self.height)
+
+    def _callback_window(self):
+        # what callbacks get as their window argument
+        return self
+
+    def invalidate(self):
+        '''Asks for a new frame in on demand mode, can be called from any thread'''
+        self.dirty = True
+        self.wake()
+
+    def animate(self, interval):
+        '''Draw a frame at least every interval seconds in on demand mode, None to stop'''
+        self.animation_interval = interval
+        self._next_animation = None if interval is None else self.get_time()
+
+    def _frame_due(self):
+        if self.dirty:
+            return True
+        if self.animation_interval is not None:
+            now = self.get_time()
+            if now >= self._next_animation:
+                # late frames are not made up for
+                self._next_animation = max(self._next_animation + self.animation_interval, now)
+                return True
+        return False
+
+    def _time_to_animation(self):
+        if self.animation_interval is None:
+            return None
+        return max(self._next_animation - self.get_time(), 0.0)
+
+    def wait_events(self, timeout=None):
+        '''Sleeps until an event, wake() or timeout seconds, None for no limit'''
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def wake(self):
+        '''Ends a wait_events early'''
+        self._wake.set()
+
+    def swap_buffers(self):
+        with profiler.current.scope('swap_buffers'):
+            self._swap()
+        # objects dropped during the frame are deleted together
+        if self.resources is not None:
+            self.resources.collect()
+        if self.frame == 0:
+            self._first_frame()
+        self.frame += 1
+        profiler.current.end_frame()
+        if self.tracer is not None:
+            self.tracer.end_frame()
+
+    def _swap(self):
+        # shows the frame, done by the backend
+        pass
+
+    def _first_frame(self):
+        now = time.perf_counter()
+        self.startup = {'import': self._created - IMPORTED,
+                        'context': self._ready - self._created,
+                        'first_frame': now - self._ready,
+                        'total': now - IMPORTED}
+        if os.environ.get('LEARNOPENGL_STARTUP_REPORT') == '1':
+            print("startup: " + ", ".join("{} {:.1f} ms".format(stage, seconds * 1e3)
+                                          for stage, seconds in self.startup.items()), file=sys.stderr)
+
+    def poll_events(self):
+        pass
+
+    def get_time(self):
+        return time.perf_counter() - self._start
+
+    def get_framebuffer_size(self):
+        return self.width, self.height
+
+    def set_swap_interval(self, interval):
+        '''Screen refreshes swap_buffers waits for, 0 for none; headless windows never wait'''
+        pass
+
+    def set_key_callback(self, callback):
+        pass
+
+    def set_window_size_callback(self, callback):
+        '''
+        callback(window, width, height) runs from next_frame(), before a frame is
+        drawn, once the framebuffer size has changed, with the new framebuffer size
+        '''
+        self._resize_callback = callback
+
+    def terminate(self):
+        # while the context still exists
+        if self.tracer is not None:
+            print(self.tracer.report(int(os.environ.get('LEARNOPENGL_TRACE_TOP', 20))), file=sys.stderr)
+            self.tracer.uninstall()
+        if self.resources is not None:
+            self.resources.teardown()
+        if self.debug is not None:
+            self.debug.disable()
+
+class GLFWWindow(Window):
+    def __init__(self, width, height, title, frames=None, debug_context=False):
+        import glfw
+        self._glfw = glfw
+
+        super().__init__(width, height, frames)
+
+        # glfw: initialize and configure
+
+        glfw.init()
+
+        glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+        glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+        glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE) # No deprecated functions
+        glfw.window_hint(glfw.RESIZABLE, gl.GL_TRUE)
+
+        # checking if run on Mac OS X
+        if sys.platform == 'darwin':
+            glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, gl.GL_TRUE)
+        glfw.window_hint(glfw.OPENGL_DEBUG_CONTEXT, debug_context)
+
+        # glfw window creation
+        self.window = glfw.create_window(width, height, title, None, None)
+        if not self.window:
+            glfw.terminate()
+            raise Exception("ERROR: Failed to create GLFW window")
+
+        glfw.make_context_current(self.window)
+
+        # on demand rendering redraws once the window is uncovered, resizing is applied once per frame
+        glfw.set_window_refresh_callback(self.window, lambda window: self.invalidate())
+        glfw.set_framebuffer_size_callback(self.window, lambda window, width, height: self.resize(width, height))
+        self.width, self.height = glfw.get_framebuffer_size(self.window)
+
+    def should_close(self):
+        return self._glfw.window_should_close(self.window) or super().should_close()
+
+    def close(self):
+        self._glfw.set_window_should_close(self.window, True)
+        super().close()
+
+    def _swap(self):
+        self._glfw.swap_buffers(self.window)
+
+    def poll_events(self):
+        self._glfw.poll_events()
+
+    def wait_events(self, timeout=None):
+        if timeout is None:
+            self._glfw.wait_events()
+        else:
+            self._glfw.wait_events_timeout(timeout)
+
+    def wake(self):
+        self._glfw.post_empty_event()
+
+    def get_time(self):
+        return self._glfw.get_time()
+
+    def get_framebuffer_size(self):
+        return self._glfw.get_framebuffer_size(self.window)
+
+    def set_swap_interval(self, interval):
+        self._glfw.swap_interval(interval)
+
+    # callbacks get the GLFW window, so they can keep calling glfw functions on it,
+    # and input asks for a new frame when rendering on demand
+    def _callback_window(self):
+        return self.window
+
+    def set_key_callback(self, callback):
+        self._glfw.set_key_callback(self.window, self._invalidating(callback))
+
+    def _invalidating(self, callback):
+        def invalidating_callback(*args):
+            self.invalidate()
+            callback(*args)
+        return invalidating_callback
+
+    def terminate(self):
+        super().terminate()
+        self._glfw.terminate()
+
+class HeadlessWindow(Window):
+    '''Renders into an offscreen framebuffer, made current by the subclass first'''
+
+    def __init__(self, width, height, frames=None):
+        super().__init__(width, height, HEADLESS_FRAMES if frames is None else frames)
+        self.framebuffer = Framebuffer(width, height)
+        self.add_render_target(self.framebuffer)
+        # there is no default framebuffer to take the viewport size from
+        gl.glViewport(0, 0, width, height)
+
+    def _frame_due(self):
+        # nothing outside can call for a frame, a static scene would wait for ever and never reach the frame limit
+        if self.frames is not None:
+            return True
+        return super()._frame_due()
+
+    def _swap(self):
+        # wait for the frame like a blocking swap would, so frame times include the rendering
+        gl.glFinish()
+
+    def terminate(self):
+        super().terminate()
+        self.framebuffer.delete()
+
+class EGLWindow(HeadlessWindow):
+    EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+    EGL_CONTEXT_OPENGL_DEBUG = 0x31B0
+
+    def __init__(self, width, height, title, frames=None, debug_context=False):
+        EGL, eglGetPlatformDisplayEXT = _import_egl()
+        self._egl = EGL
+
+        self.display = eglGetPlatformDisplayEXT(self.EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+        if not EGL.eglInitialize(self.display, None, None):
+            raise Exception("ERROR: Failed to initialize EGL")
+
+        config_attribs = (EGL.EGLint * 5)(EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                                          EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                                          EGL.EGL_NONE)
+        config, num_configs = EGL.EGLConfig(), EGL.EGLint()
+        EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(num_configs))
+        if num_configs.value == 0:
+            EGL.eglTerminate(self.display)
+            raise Exception("ERROR: No EGL config supports desktop OpenGL")
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attribs = (EGL.EGLint * 9)(EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+                                           EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+                                           EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK,
+                                           EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                                           self.EGL_CONTEXT_OPENGL_DEBUG, int(debug_context),
+                                           EGL.EGL_NONE)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+        if not EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self.context):
+            EGL.eglTerminate(self.display)
+            raise Exception("ERROR: Failed to create EGL context")
+
+        super().__init__(width, height, frames)
+
+    def terminate(self):
+        super().terminate()
+        EGL = self._egl
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglTerminate(self.display)
+
+def _import_egl():
+    '''OpenGL.EGL and eglGetPlatformDisplayEXT, imported so they work with the PyOpenGL flags of either mode'''
+    from OpenGL import _configflags
+    # with CONTEXT_CHECKING the EGL error checker fails every call made before there is a context
+    context_checking, _configflags.CONTEXT_CHECKING = _configflags.CONTEXT_CHECKING, False
+    try:
+        from OpenGL.raw.EGL import _errors
+        if not hasattr(_errors, '_error_checker'):
+            # with ERROR_CHECKING off PyOpenGL defines no EGL error checker, but still looks it up
+            _errors._error_checker = None
+        from OpenGL import EGL
+        from OpenGL.EGL.EXT.platform_base import eglGetPlatformDisplayEXT
+    finally:
+        _configflags.CONTEXT_CHECKING = context_checking
+    return EGL, eglGetPlatformDisplayEXT
+
+class OSMesaWindow(HeadlessWindow):
+    # OSMesa has no debug contexts, debug output is on for any context there
+    def __init__(self, width, height, title, frames=None, debug_context=False):
+        from OpenGL import arrays
+        from OpenGL import osmesa
+        self._osmesa = osmesa
+
+        attribs = arrays.GLintArray.asArray([osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+                                             osmesa.OSMESA_DEPTH_BITS, 24,
+                                             osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+                                             osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3,
+                                             osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3,
+                                             0])
+        self.context = osmesa.OSMesaCreateContextAttribs(attribs, None)
+        if not self.context:
+            raise Exception("ERROR: Failed to create OSMesa context")
+
+        # OSMesa needs a buffer to make the context current with, drawing still goes to the framebuffer object
+        self._buffer = arrays.GLubyteArray.zeros((height, width, 4))
+        if not osmesa.OSMesaMakeCurrent(self.context, self._buffer, gl.GL_UNSIGNED_BYTE, width, height):
+            osmesa.OSMesaDestroyContext(self.context)
+            raise Exception("ERROR: Failed to make OSMesa context current")
+
+        super().__init__(width, height, frames)
+
+    def terminate(self):
+        super().terminate()
+        self._osmesa.OSMesaDestroyContext(self.context)
+
+BACKENDS = {
+    'glfw': GLFWWindow,
+    'egl': EGLWindow,
+    'osmesa': OSMesaWindow,
+}
+
+def create_window(width, height, title, backend=None, frames=None, render_mode=None, debug_output=None):
+    '''
+    Opens a window with a current OpenGL 3.3 core context using backend,
+    $LEARNOPENGL_BACKEND by default, which renders frames frames before closing
+    and renders in render_mode, $LEARNOPENGL_RENDER_MODE by default. With
+    debug_output, the lowest severity of driver messages to log,
+    $LEARNOPENGL_DEBUG_OUTPUT by default, the context gets a DebugLayer
+    '''
+    backend = backend or BACKEND
+    if backend not in BACKENDS:
+        raise Exception("ERROR: Unknown window backend " + backend)
+    render_mode = render_mode or os.environ.get('LEARNOPENGL_RENDER_MODE') or 'continuous'
+    if render_mode not in RENDER_MODES:
+        raise Exception("ERROR: Unknown render mode " + render_mode)
+    # PyOpenGL has to be loaded for the headless platform, see __init__.py
+    if backend != 'glfw' and os.environ.get('PYOPENGL_PLATFORM') != backend:
+        raise Exception("ERROR: Set LEARNOPENGL_BACKEND=" + backend + " before OpenGL is imported")
+
+    if frames is None and os.environ.get('LEARNOPENGL_FRAMES'):
+        frames = int(os.environ['LEARNOPENGL_FRAMES'])
+    debug_output = debug_output or os.environ.get('LEARNOPENGL_DEBUG_OUTPUT') or ('low' if DEBUG else None)
+    if debug_output == '1':
+        debug_output = 'low'
+
+    created = time.perf_counter()
+    window = BACKENDS[backend](width, height, title, frames, debug_context=debug_output is not None)
+    window.render_mode = render_mode
+    # nothing is bound in the new context, whatever the state cache saw before
+    state.current.reset()
+    window.resources = resources.new_context()
+    if debug_output is not None:
+        # synchronous while debugging, so a message comes from inside the call that caused it
+        window.debug = debug.DebugLayer(debug_output, synchronous=DEBUG)
+        if not window.debug.enable():
+            print("WARNING: No KHR_debug in this context, no debug output", file=sys.stderr)
+    if os.environ.get('LEARNOPENGL_TRACE') == '1':
+        window.tracer = tracer.GLTracer()
+        window.tracer.install()
+    window._created, window._ready = created, time.perf_counter()
+    return window